@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: blocking services vs the asyncio facade
+
+Usage: python benchmarks/bench_async_services.py [--doctors 20] [--slots 16]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time as timer
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config.database_config import DatabaseConfig
+from src.utils.database_manager import DatabaseManager
+from src.services.appointment_service import AppointmentService
+from src.services.schedule_service import ScheduleService
+from src.services.async_services import AsyncAppointmentService, AsyncScheduleService
+
+
+def next_weekday(start):
+    while start.weekday() >= 5:
+        start += timedelta(days=1)
+    return start
+
+
+def setup(db_path, doctors):
+    """Create a database with doctors working 08:00-17:00 and one patient"""
+    db_manager = DatabaseManager(DatabaseConfig(db_path))
+    schedule_service = ScheduleService(db_manager)
+    doctor_ids = []
+    for number in range(doctors):
+        doctor_id = db_manager.add_doctor(
+            f"Dr. Bench {number}", "Cardiology", f"bench{number}@hospital.com", "555-0000"
+        )
+        schedule_service.set_doctor_schedule(
+            doctor_id, next_weekday(date.today() + timedelta(days=1)).strftime('%A'),
+            time(8, 0), time(17, 0)
+        )
+        doctor_ids.append(doctor_id)
+    patient_id = db_manager.add_patient(
+        "MRN_BENCH", "Bench Patient", "bench@patient.com", "555-0001", date(1990, 1, 1)
+    )
+    return db_manager, doctor_ids, patient_id
+
+
+def requests_for(doctor_ids, slots):
+    return [
+        (doctor_id, time(8 + minutes // 60, minutes % 60))
+        for doctor_id in doctor_ids
+        for minutes in range(0, slots * 30, 30)
+    ]
+
+
+def run_sync(db_manager, doctor_ids, patient_id, target_date, slots):
+    appointment_service = AppointmentService(db_manager)
+    schedule_service = ScheduleService(db_manager)
+    start = timer.perf_counter()
+    for doctor_id, slot in requests_for(doctor_ids, slots):
+        appointment_service.book_appointment(patient_id, doctor_id, target_date, slot)
+        schedule_service.get_doctor_availability(doctor_id, target_date)
+    return timer.perf_counter() - start
+
+
+async def run_async(db_manager, doctor_ids, patient_id, target_date, slots):
+    appointment_service = AsyncAppointmentService(db_manager)
+    schedule_service = AsyncScheduleService(db_manager)
+
+    async def one(doctor_id, slot):
+        await appointment_service.book_appointment(patient_id, doctor_id, target_date, slot)
+        await schedule_service.get_doctor_availability(doctor_id, target_date)
+
+    start = timer.perf_counter()
+    await asyncio.gather(*(one(doctor_id, slot) for doctor_id, slot in requests_for(doctor_ids, slots)))
+    elapsed = timer.perf_counter() - start
+    appointment_service.executor.shutdown()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--doctors', type=int, default=20)
+    parser.add_argument('--slots', type=int, default=16)
+    args = parser.parse_args()
+
+    target_date = next_weekday(date.today() + timedelta(days=1))
+    operations = args.doctors * args.slots * 2
+    temp_dir = tempfile.mkdtemp()
+    try:
+        results = {}
+        for name in ('sync', 'async'):
+            db_path = os.path.join(temp_dir, f'{name}.db')
+            with contextlib.redirect_stdout(io.StringIO()):
+                db_manager, doctor_ids, patient_id = setup(db_path, args.doctors)
+                if name == 'sync':
+                    elapsed = run_sync(db_manager, doctor_ids, patient_id, target_date, args.slots)
+                else:
+                    elapsed = asyncio.run(
+                        run_async(db_manager, doctor_ids, patient_id, target_date, args.slots)
+                    )
+            db_manager.db_config.close_pool()
+            results[name] = elapsed
+
+        print(f"{operations} operations ({args.doctors} doctors x {args.slots} slots, book + availability)")
+        for name, elapsed in results.items():
+            print(f"  {name:<6} {elapsed:8.3f}s  {operations / elapsed:10.0f} ops/s")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Availability generation micro-benchmark: per-slot overlap loop vs sweep line
+
+Usage: python benchmarks/bench_availability_sweep.py [--slot 5] [--bookings 400] [--repeat 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, date, time, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.services.schedule_service import ScheduleService
+
+
+def legacy_slots(start_time, end_time, breaks, appointments, slot_duration=30):
+    """The original generator: every slot re-checks every break and appointment"""
+    current_time = datetime.combine(date.today(), start_time)
+    end_datetime = datetime.combine(date.today(), end_time)
+    available_slots = []
+
+    while current_time + timedelta(minutes=slot_duration) <= end_datetime:
+        slot_time = current_time.time()
+        slot_end = (current_time + timedelta(minutes=slot_duration)).time()
+        conflict = any(
+            busy_start < slot_end and busy_end > slot_time
+            for busy_start, busy_end in breaks
+        ) or any(
+            busy_start < slot_end and busy_end > slot_time
+            for busy_start, busy_end in appointments
+        )
+        if not conflict:
+            available_slots.append(slot_time)
+        current_time += timedelta(minutes=slot_duration)
+    return available_slots
+
+
+def minute_time(minute):
+    return time(minute // 60, minute % 60)
+
+
+def make_day(slot, bookings, seed=3):
+    """A 24-hour day with a lunch break and bookings packed on the slot grid"""
+    rng = random.Random(seed)
+    starts = sorted(rng.sample(range(0, 1440 - slot, slot), min(bookings, 1440 // slot - 1)))
+    breaks = [(720, 780)]
+    appointments = [(start, start + slot) for start in starts if not 720 <= start < 780]
+    return breaks, appointments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--slot', type=int, default=5)
+    parser.add_argument('--bookings', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    breaks, appointments = make_day(args.slot, args.bookings)
+    legacy_breaks = [(minute_time(s), minute_time(e)) for s, e in breaks]
+    legacy_appointments = [(minute_time(s), minute_time(min(e, 1439))) for s, e in appointments]
+    service = ScheduleService.__new__(ScheduleService)
+
+    print(f"00:00-23:59, {args.slot}-minute slots, {len(appointments)} bookings, {args.repeat} runs")
+    legacy = timeit.timeit(
+        lambda: legacy_slots(time(0, 0), time(23, 59), legacy_breaks, legacy_appointments, args.slot),
+        number=args.repeat
+    )
+    sweep = timeit.timeit(
+        lambda: service._generate_available_slots(0, 1439, breaks, appointments, args.slot),
+        number=args.repeat
+    )
+    print(f"  per-slot loop {legacy / args.repeat * 1000:8.3f} ms/day")
+    print(f"  sweep line    {sweep / args.repeat * 1000:8.3f} ms/day  ({legacy / sweep:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
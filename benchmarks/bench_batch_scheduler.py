@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Batch scheduler benchmark: one-pass batch placement vs first-come-first-served
+
+Usage: python benchmarks/bench_batch_scheduler.py [--requests 10000] [--doctors 100] [--days 10]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time as timer
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config.database_config import DatabaseConfig
+from src.utils.database_manager import DatabaseManager
+from src.utils.time_utils import to_minutes, from_minutes
+from src.services.appointment_service import AppointmentService
+from src.services.schedule_service import ScheduleService
+from src.services.batch_scheduler import BatchScheduler, BookingRequest
+
+SPECIALIZATIONS = ('Cardiology', 'Neurology', 'Pediatrics', 'Orthopedics', 'Dermatology')
+
+
+def setup(db_path, doctors):
+    """Create doctors working 09:00-17:00 on weekdays and one patient"""
+    db_manager = DatabaseManager(DatabaseConfig(db_path))
+    schedule_service = ScheduleService(db_manager)
+    doctor_ids = {}
+    for number in range(doctors):
+        specialization = SPECIALIZATIONS[number % len(SPECIALIZATIONS)]
+        doctor_id = db_manager.add_doctor(
+            f"Dr. Batch {number}", specialization, f"batch{number}@hospital.com", "555-0000"
+        )
+        for day in ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'):
+            schedule_service.set_doctor_schedule(doctor_id, day, time(9, 0), time(17, 0))
+        doctor_ids[doctor_id] = specialization
+    patient_id = db_manager.add_patient(
+        "MRN_BENCH", "Bench Patient", "bench@patient.com", "555-0001", date(1990, 1, 1)
+    )
+    return db_manager, doctor_ids, patient_id
+
+
+def make_requests(count, doctor_ids, patient_id, days, seed=7):
+    """Random requests: 30% for a named doctor, the rest for a specialization"""
+    rng = random.Random(seed)
+    first_day = date.today() + timedelta(days=1)
+    weekdays = [first_day + timedelta(days=offset) for offset in range(days * 2)
+                if (first_day + timedelta(days=offset)).weekday() < 5][:days]
+    requests = []
+    for _ in range(count):
+        window_start = rng.randrange(9 * 60, 15 * 60, 30)
+        window_end = window_start + rng.choice((60, 120, 180))
+        preferred = window_start + rng.randrange(0, window_end - window_start - 29, 30)
+        doctor_id = rng.choice(list(doctor_ids))
+        named = rng.random() < 0.3
+        requests.append(BookingRequest(
+            patient_id, rng.choice(weekdays), from_minutes(window_start), from_minutes(window_end),
+            doctor_id=doctor_id if named else None,
+            specialization=None if named else doctor_ids[doctor_id],
+            preferred_time=from_minutes(preferred)
+        ))
+    return requests
+
+
+def run_batch(db_manager, requests):
+    start = timer.perf_counter()
+    placements = BatchScheduler(db_manager).schedule(requests)
+    elapsed = timer.perf_counter() - start
+    deviations = [p.deviation_minutes for p in placements if p.appointment_id]
+    return elapsed, len(deviations), sum(deviations)
+
+
+def run_fcfs(db_manager, requests, doctor_ids):
+    """Book one request at a time with book_appointment, keeping only in-window slots"""
+    service = AppointmentService(db_manager)
+    by_specialization = {}
+    for doctor_id, specialization in doctor_ids.items():
+        by_specialization.setdefault(specialization, []).append(doctor_id)
+
+    placed, deviation = 0, 0
+    start = timer.perf_counter()
+    for request in requests:
+        candidates = ([request.doctor_id] if request.doctor_id
+                      else by_specialization[request.specialization])
+        for doctor_id in candidates:
+            slot = service._find_available_slot(doctor_id, request.appointment_date, request.preferred_time)
+            if slot is None or to_minutes(slot) + 30 > to_minutes(request.window_end):
+                continue
+            appointment_id, _ = db_manager.add_appointment(
+                request.patient_id, doctor_id, request.appointment_date, slot
+            )
+            if appointment_id:
+                placed += 1
+                deviation += abs(to_minutes(slot) - to_minutes(request.preferred_time))
+                break
+    return timer.perf_counter() - start, placed, deviation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--doctors', type=int, default=100)
+    parser.add_argument('--days', type=int, default=10)
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        print(f"{args.requests} requests, {args.doctors} doctors, {args.days} days "
+              f"({args.doctors * args.days * 16} half-hour slots)")
+        for name in ('batch', 'fcfs'):
+            with contextlib.redirect_stdout(io.StringIO()):
+                db_manager, doctor_ids, patient_id = setup(
+                    os.path.join(temp_dir, f'{name}.db'), args.doctors
+                )
+            requests = make_requests(args.requests, doctor_ids, patient_id, args.days)
+            if name == 'batch':
+                elapsed, placed, deviation = run_batch(db_manager, requests)
+            else:
+                elapsed, placed, deviation = run_fcfs(db_manager, requests, doctor_ids)
+            db_manager.db_config.close_pool()
+            print(f"  {name:<6} {elapsed:8.3f}s  placed {placed:6d}  "
+                  f"mean deviation {deviation / max(placed, 1):6.1f} min")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,122 +1,399 @@
 import sqlite3
 import os
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from config.schema import migrate
+
+# PRAGMAs applied once to every pooled connection when it is opened
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,       # negative value = KiB, i.e. ~16 MB page cache
+    'mmap_size': 134217728,     # 128 MB memory-mapped I/O
+    'busy_timeout': 5000,       # milliseconds
+}
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes free within the timeout"""
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections with per-thread affinity.
+
+    A thread that already holds a connection gets the same one back on
+    nested acquires, and a released connection is preferentially handed
+    back to the thread that used it last. Connections run in autocommit
+    mode; use transaction() to group statements.
+    """
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, db_path, size=5, timeout=30.0, pragmas=None):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self._cond = threading.Condition()
+        self._idle = []
+        self._connections = []
+        self._local = threading.local()
+        self._closed = False
+
+    @classmethod
+    def for_path(cls, db_path, **kwargs):
+        """Get the process-wide pool for a database file, creating it on first use"""
+        key = os.path.abspath(db_path)
+        with cls._registry_lock:
+            pool = cls._registry.get(key)
+            if pool is None or pool._closed:
+                pool = cls(db_path, **kwargs)
+                cls._registry[key] = pool
+            return pool
+
+    def _connect(self):
+        """Open a new connection and apply the configured PRAGMAs"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}').fetchall()
+        return conn
+
+    def acquire(self):
+        """Check out a connection, reusing the one this thread already holds"""
+        local = self._local
+        held = getattr(local, 'conn', None)
+        if held is not None:
+            local.depth += 1
+            return held
+
+        conn = None
+        with self._cond:
+            deadline = None
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+
+                preferred = getattr(local, 'last', None)
+                if preferred is not None and preferred in self._idle:
+                    self._idle.remove(preferred)
+                    conn = preferred
+                    break
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if len(self._connections) < self.size:
+                    conn = self._connect()
+                    self._connections.append(conn)
+                    break
+
+                if deadline is None:
+                    deadline = time.monotonic() + self.timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.timeout}s"
+                    )
+                self._cond.wait(remaining)
+
+        local.conn = conn
+        local.depth = 1
+        local.last = conn
+        return conn
+
+    def release(self, conn):
+        """Return a connection checked out with acquire()"""
+        local = self._local
+        if getattr(local, 'conn', None) is not conn:
+            raise sqlite3.ProgrammingError("Connection is not held by this thread")
+
+        local.depth -= 1
+        if local.depth:
+            return
+        local.conn = None
+
+        # Never hand a connection with an open transaction to another caller
+        if conn.in_transaction:
+            conn.rollback()
+
+        with self._cond:
+            if self._closed:
+                conn.close()
+                return
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a pooled connection"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        """Context manager running its body in a single transaction.
+
+        Commits on success and rolls back on any exception. A transaction
+        opened while this thread is already inside one joins the outer
+        transaction, which stays responsible for committing and for
+        running the after_commit() hooks registered inside it.
+        """
+        with self.connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+
+            conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+            hooks = self._local.hooks = []
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                self._local.hooks = None
+                conn.rollback()
+                for _, on_rollback in hooks:
+                    if on_rollback is not None:
+                        on_rollback()
+                raise
+            self._local.hooks = None
+            for on_commit, _ in hooks:
+                on_commit()
+
+    def after_commit(self, on_commit, on_rollback=None):
+        """Run on_commit once this thread's outermost transaction() commits.
+
+        on_rollback, if given, runs instead when it rolls back. Outside a
+        transaction() block on_commit runs immediately.
+        """
+        hooks = getattr(self._local, 'hooks', None)
+        if hooks is None:
+            on_commit()
+        else:
+            hooks.append((on_commit, on_rollback))
+
+    def close(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._idle = []
+            self._connections = []
+            self._cond.notify_all()
+
+
+class ReportReader:
+    """Read-only connections for long-running reports.
+
+    In 'wal' mode each thread gets a read-only URI connection; the
+    outermost connection() block runs in one read transaction, so a report
+    sees a single consistent state while WAL lets writers carry on. In
+    'snapshot' mode reports read an in-memory copy taken with the backup
+    API and refreshed once it is older than max_age seconds.
+    """
+
+    MODES = ('wal', 'snapshot')
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, db_path, mode='wal', max_age=300.0):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown report mode {mode!r}; expected one of {self.MODES}")
+        self.db_path = db_path
+        self.mode = mode
+        self.max_age = max_age
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._snapshot = None       # (connection, taken_at)
+        self._snapshot_users = {}   # snapshot connection -> open connection() blocks
+        self._closed = False
+
+    @classmethod
+    def for_path(cls, db_path, mode='wal', **kwargs):
+        """Get the process-wide reader for a database file and mode"""
+        key = (os.path.abspath(db_path), mode)
+        with cls._registry_lock:
+            reader = cls._registry.get(key)
+            if reader is None or reader._closed:
+                reader = cls(db_path, mode=mode, **kwargs)
+                cls._registry[key] = reader
+            return reader
+
+    def _connect_read_only(self):
+        uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        return sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+
+    def refresh(self):
+        """Take a fresh snapshot copy of the database"""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        """Replace the snapshot; the caller holds self._lock"""
+        snapshot = sqlite3.connect(':memory:', isolation_level=None, check_same_thread=False)
+        source = self._connect_read_only()
+        try:
+            source.backup(snapshot, pages=1024)
+        finally:
+            source.close()
+        snapshot.execute('PRAGMA query_only = 1')
+        self._retire_snapshot()
+        self._snapshot = (snapshot, time.time())
+
+    def _retire_snapshot(self):
+        """Drop the current snapshot, closing it now unless a report is still reading it"""
+        if self._snapshot is not None:
+            conn = self._snapshot[0]
+            self._snapshot = None
+            if not self._snapshot_users.get(conn):
+                conn.close()
+
+    def _release_snapshot(self, conn):
+        """End one block on a snapshot, closing it if it was retired and is now unused"""
+        with self._lock:
+            users = self._snapshot_users.pop(conn) - 1
+            if users:
+                self._snapshot_users[conn] = users
+            elif self._snapshot is None or self._snapshot[0] is not conn:
+                conn.close()
+
+    def _acquire(self):
+        """Get this thread's (connection, started_at) for a new outermost block"""
+        if self.mode == 'snapshot':
+            with self._lock:
+                if self._snapshot is None or time.time() - self._snapshot[1] > self.max_age:
+                    self._refresh()
+                conn = self._snapshot[0]
+                self._snapshot_users[conn] = self._snapshot_users.get(conn, 0) + 1
+                return self._snapshot
+
+        conn = getattr(self._local, 'wal_conn', None)
+        if conn is None:
+            conn = self._local.wal_conn = self._connect_read_only()
+            with self._lock:
+                self._connections.append(conn)
+        conn.execute('BEGIN')
+        return conn, time.time()
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a read-only connection; nested blocks share it"""
+        local = self._local
+        if getattr(local, 'depth', 0):
+            local.depth += 1
+            try:
+                yield local.conn
+            finally:
+                local.depth -= 1
+            return
+
+        if self._closed:
+            raise sqlite3.ProgrammingError("Report reader is closed")
+        local.conn, local.started_at = self._acquire()
+        local.depth = 1
+        try:
+            yield local.conn
+        finally:
+            local.depth = 0
+            if self.mode == 'wal':
+                local.conn.execute('ROLLBACK')
+            else:
+                self._release_snapshot(local.conn)
+            local.conn = None
+
+    def snapshot_age(self):
+        """Seconds since the data being read (or next to be read) was captured"""
+        if getattr(self._local, 'depth', 0):
+            return time.time() - self._local.started_at
+        if self.mode == 'snapshot' and self._snapshot is not None:
+            return time.time() - self._snapshot[1]
+        return 0.0
+
+    def close(self):
+        """Close read-only connections and the snapshot (once no report is reading it)"""
+        with self._lock:
+            self._closed = True
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+            self._retire_snapshot()
+
 
 class DatabaseConfig:
-    def __init__(self, db_path="database/hospital_scheduler.db"):
+    def __init__(self, db_path="database/hospital_scheduler.db", pool_size=5, pragmas=None,
+                 report_mode='wal', snapshot_max_age=300.0):
         self.db_path = db_path
+        self.pool_size = pool_size
+        self.pragmas = pragmas
+        self.report_mode = report_mode
+        self.snapshot_max_age = snapshot_max_age
         self.ensure_database_directory()
-    
+
     def ensure_database_directory(self):
         """Create database directory if it doesn't exist"""
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-    
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def pool(self):
+        """Shared connection pool for this database file"""
+        return ConnectionPool.for_path(
+            self.db_path, size=self.pool_size, pragmas=self.pragmas
+        )
+
+    def connection(self):
+        """Context manager yielding a pooled connection"""
+        return self.pool.connection()
+
+    def transaction(self, immediate=False):
+        """Context manager yielding a pooled connection inside a transaction"""
+        return self.pool.transaction(immediate=immediate)
+
+    def after_commit(self, on_commit, on_rollback=None):
+        """Defer in-process cache updates until the enclosing transaction commits"""
+        return self.pool.after_commit(on_commit, on_rollback)
+
+    @property
+    def report_reader(self):
+        """Shared read-only connection source for analytics on this database file"""
+        return ReportReader.for_path(
+            self.db_path, mode=self.report_mode, max_age=self.snapshot_max_age
+        )
+
+    def report_connection(self):
+        """Context manager yielding a read-only connection for reports"""
+        return self.report_reader.connection()
+
+    def close_pool(self):
+        """Close the pooled connections and report readers for this database file"""
+        self.pool.close()
+        self.report_reader.close()
+
     def get_connection(self):
-        """Get database connection"""
+        """Get a standalone (unpooled) database connection"""
         return sqlite3.connect(self.db_path)
-    
+
     def initialize_database(self):
-        """Initialize database with required tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Patients table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS patients (
-                patient_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                mrn TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                email TEXT,
-                phone TEXT,
-                date_of_birth DATE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Doctors table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS doctors (
-                doctor_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                specialization TEXT NOT NULL,
-                email TEXT,
-                phone TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Appointments table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS appointments (
-                appointment_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                patient_id INTEGER NOT NULL,
-                doctor_id INTEGER NOT NULL,
-                appointment_date DATE NOT NULL,
-                time_slot TIME NOT NULL,
-                duration_minutes INTEGER DEFAULT 30,
-                status TEXT DEFAULT 'scheduled',
-                diagnosis TEXT,
-                prescription TEXT,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (patient_id) REFERENCES patients (patient_id),
-                FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id),
-                UNIQUE(doctor_id, appointment_date, time_slot)
-            )
-        ''')
-        
-        # Doctor schedules table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS doctor_schedules (
-                schedule_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                doctor_id INTEGER NOT NULL,
-                day_of_week TEXT NOT NULL,
-                start_time TIME NOT NULL,
-                end_time TIME NOT NULL,
-                FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id)
-            )
-        ''')
-        
-        # Doctor breaks table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS doctor_breaks (
-                break_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                doctor_id INTEGER NOT NULL,
-                day_of_week TEXT NOT NULL,
-                break_start TIME NOT NULL,
-                break_end TIME NOT NULL,
-                FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id)
-            )
-        ''')
-        
-        # Doctor leave table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS doctor_leave (
-                leave_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                doctor_id INTEGER NOT NULL,
-                leave_date DATE NOT NULL,
-                reason TEXT,
-                FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id),
-                UNIQUE(doctor_id, leave_date)
-            )
-        ''')
-        
-        # Consultation history table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS consultation_history (
-                consultation_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                patient_id INTEGER NOT NULL,
-                appointment_id INTEGER NOT NULL,
-                diagnosis TEXT,
-                prescription TEXT,
-                notes TEXT,
-                consultation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (patient_id) REFERENCES patients (patient_id),
-                FOREIGN KEY (appointment_id) REFERENCES appointments (appointment_id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        print("Database initialized successfully!")
+        """Bring the database schema up to date.
+
+        Cheap when the schema is current: migrate() only reads
+        PRAGMA user_version, and takes the write lock when behind.
+        """
+        with self.connection() as conn:
+            applied = migrate(conn)
+
+        if applied:
+            print(f"Database initialized successfully! (schema version {applied[-1]})")
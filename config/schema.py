@@ -0,0 +1,526 @@
+"""
+Versioned database schema for Hospital Appointment Scheduler
+
+Each migration is applied once, in order, and the database records the
+last applied version in PRAGMA user_version.
+"""
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """Register a migration step; steps must be declared in version order"""
+    def decorator(func):
+        if MIGRATIONS and version != MIGRATIONS[-1][0] + 1:
+            raise ValueError(f"Migration {version} is out of order")
+        MIGRATIONS.append((version, description, func))
+        return func
+    return decorator
+
+
+def get_schema_version(conn):
+    """Get the schema version recorded in the database"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def latest_version():
+    """Get the version the registered migrations bring a database to"""
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def migrate(conn):
+    """Apply pending migrations in one transaction; returns applied versions"""
+    if get_schema_version(conn) >= latest_version():
+        return []
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # Re-read under the write lock in case another process migrated first
+        current = get_schema_version(conn)
+        applied = []
+        for version, description, step in MIGRATIONS:
+            if version <= current:
+                continue
+            step(conn)
+            conn.execute(f'PRAGMA user_version = {version}')
+            applied.append(version)
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    return applied
+
+
+@migration(1, "initial schema")
+def _create_initial_tables(conn):
+    # Patients table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS patients (
+            patient_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            mrn TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            email TEXT,
+            phone TEXT,
+            date_of_birth DATE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Doctors table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS doctors (
+            doctor_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            specialization TEXT NOT NULL,
+            email TEXT,
+            phone TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Appointments table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS appointments (
+            appointment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            patient_id INTEGER NOT NULL,
+            doctor_id INTEGER NOT NULL,
+            appointment_date DATE NOT NULL,
+            time_slot TIME NOT NULL,
+            duration_minutes INTEGER DEFAULT 30,
+            status TEXT DEFAULT 'scheduled',
+            diagnosis TEXT,
+            prescription TEXT,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (patient_id) REFERENCES patients (patient_id),
+            FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id),
+            UNIQUE(doctor_id, appointment_date, time_slot)
+        )
+    ''')
+
+    # Doctor schedules table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS doctor_schedules (
+            schedule_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            doctor_id INTEGER NOT NULL,
+            day_of_week TEXT NOT NULL,
+            start_time TIME NOT NULL,
+            end_time TIME NOT NULL,
+            FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id)
+        )
+    ''')
+
+    # Doctor breaks table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS doctor_breaks (
+            break_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            doctor_id INTEGER NOT NULL,
+            day_of_week TEXT NOT NULL,
+            break_start TIME NOT NULL,
+            break_end TIME NOT NULL,
+            FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id)
+        )
+    ''')
+
+    # Doctor leave table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS doctor_leave (
+            leave_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            doctor_id INTEGER NOT NULL,
+            leave_date DATE NOT NULL,
+            reason TEXT,
+            FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id),
+            UNIQUE(doctor_id, leave_date)
+        )
+    ''')
+
+    # Consultation history table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS consultation_history (
+            consultation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            patient_id INTEGER NOT NULL,
+            appointment_id INTEGER NOT NULL,
+            diagnosis TEXT,
+            prescription TEXT,
+            notes TEXT,
+            consultation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (patient_id) REFERENCES patients (patient_id),
+            FOREIGN KEY (appointment_id) REFERENCES appointments (appointment_id)
+        )
+    ''')
+
+
+@migration(2, "appointment minute-of-day columns")
+def _add_appointment_minutes(conn):
+    conn.execute('ALTER TABLE appointments ADD COLUMN start_minute INTEGER')
+    conn.execute('ALTER TABLE appointments ADD COLUMN end_minute INTEGER')
+
+    # Backfill from the 'HH:MM' text column
+    conn.execute('''
+        UPDATE appointments
+        SET start_minute = CAST(substr(time_slot, 1, 2) AS INTEGER) * 60
+                         + CAST(substr(time_slot, 4, 2) AS INTEGER),
+            end_minute = CAST(substr(time_slot, 1, 2) AS INTEGER) * 60
+                       + CAST(substr(time_slot, 4, 2) AS INTEGER)
+                       + COALESCE(duration_minutes, 30)
+    ''')
+
+    _add_appointment_minutes_triggers(conn)
+
+
+def _add_appointment_minutes_triggers(conn):
+    """Keep the minute columns in step for writers that only set time_slot"""
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS appointments_minutes_insert
+        AFTER INSERT ON appointments
+        WHEN NEW.start_minute IS NULL
+        BEGIN
+            UPDATE appointments
+            SET start_minute = CAST(substr(NEW.time_slot, 1, 2) AS INTEGER) * 60
+                             + CAST(substr(NEW.time_slot, 4, 2) AS INTEGER),
+                end_minute = CAST(substr(NEW.time_slot, 1, 2) AS INTEGER) * 60
+                           + CAST(substr(NEW.time_slot, 4, 2) AS INTEGER)
+                           + COALESCE(NEW.duration_minutes, 30)
+            WHERE appointment_id = NEW.appointment_id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS appointments_minutes_update
+        AFTER UPDATE OF time_slot, duration_minutes ON appointments
+        BEGIN
+            UPDATE appointments
+            SET start_minute = CAST(substr(NEW.time_slot, 1, 2) AS INTEGER) * 60
+                             + CAST(substr(NEW.time_slot, 4, 2) AS INTEGER),
+                end_minute = CAST(substr(NEW.time_slot, 1, 2) AS INTEGER) * 60
+                           + CAST(substr(NEW.time_slot, 4, 2) AS INTEGER)
+                           + COALESCE(NEW.duration_minutes, 30)
+            WHERE appointment_id = NEW.appointment_id;
+        END
+    ''')
+
+
+@migration(3, "covering and partial indexes for hot queries")
+def _add_query_indexes(conn):
+    # Rebuild appointments so the slot uniqueness only applies to active
+    # rows; a cancelled slot must be bookable again.
+    conn.execute('''
+        CREATE TABLE appointments_rebuild (
+            appointment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            patient_id INTEGER NOT NULL,
+            doctor_id INTEGER NOT NULL,
+            appointment_date DATE NOT NULL,
+            time_slot TIME NOT NULL,
+            duration_minutes INTEGER DEFAULT 30,
+            status TEXT DEFAULT 'scheduled',
+            diagnosis TEXT,
+            prescription TEXT,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            start_minute INTEGER,
+            end_minute INTEGER,
+            FOREIGN KEY (patient_id) REFERENCES patients (patient_id),
+            FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id)
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO appointments_rebuild (
+            appointment_id, patient_id, doctor_id, appointment_date, time_slot,
+            duration_minutes, status, diagnosis, prescription, notes,
+            created_at, updated_at, start_minute, end_minute
+        )
+        SELECT appointment_id, patient_id, doctor_id, appointment_date, time_slot,
+               duration_minutes, status, diagnosis, prescription, notes,
+               created_at, updated_at, start_minute, end_minute
+        FROM appointments
+    ''')
+    conn.execute('DROP TABLE appointments')
+    conn.execute('ALTER TABLE appointments_rebuild RENAME TO appointments')
+
+    # Triggers were dropped with the old table
+    _add_appointment_minutes_triggers(conn)
+
+    _create_appointment_indexes(conn)
+
+    # Schedule and break lookups
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_doctor_schedules_doctor_day
+        ON doctor_schedules (doctor_id, day_of_week, start_time, end_time)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_doctor_breaks_doctor_day
+        ON doctor_breaks (doctor_id, day_of_week, break_start, break_end)
+    ''')
+
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_doctors_specialization
+        ON doctors (specialization)
+    ''')
+
+
+def _create_appointment_indexes(conn):
+    """Create the appointments indexes (shared by migrations that rebuild the table)"""
+    # Active-slot uniqueness and conflict / availability lookups; status is
+    # repeated in the range index so the partial filter needs no table read
+    conn.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_appointments_active_slot
+        ON appointments (doctor_id, appointment_date, time_slot)
+        WHERE status != 'cancelled'
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_appointments_active_range
+        ON appointments (doctor_id, appointment_date, start_minute, end_minute, status)
+        WHERE status != 'cancelled'
+    ''')
+
+    # Doctor day listings and utilization (status filters other than 'cancelled')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_appointments_doctor_date
+        ON appointments (doctor_id, appointment_date, status, duration_minutes)
+    ''')
+
+    # Patient history ordered by date
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_appointments_patient_date
+        ON appointments (patient_id, appointment_date, time_slot)
+    ''')
+
+    # Reminders and date-range reports
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_appointments_date_status
+        ON appointments (appointment_date, status)
+    ''')
+
+
+@migration(4, "per-date schedule overrides")
+def _add_schedule_overrides(conn):
+    # NULL hours close the doctor for the day; otherwise they replace the weekly hours
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS doctor_schedule_overrides (
+            override_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            doctor_id INTEGER NOT NULL,
+            override_date DATE NOT NULL,
+            start_time TIME,
+            end_time TIME,
+            reason TEXT,
+            FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id),
+            UNIQUE(doctor_id, override_date)
+        )
+    ''')
+
+
+@migration(5, "nullable patient for reserved emergency slots")
+def _allow_reserved_appointments(conn):
+    # Emergency reserve placeholders ('reserved' status) hold a slot before a
+    # patient is known; SQLite cannot drop NOT NULL in place, so rebuild.
+    conn.execute('''
+        CREATE TABLE appointments_rebuild (
+            appointment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            patient_id INTEGER,
+            doctor_id INTEGER NOT NULL,
+            appointment_date DATE NOT NULL,
+            time_slot TIME NOT NULL,
+            duration_minutes INTEGER DEFAULT 30,
+            status TEXT DEFAULT 'scheduled',
+            diagnosis TEXT,
+            prescription TEXT,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            start_minute INTEGER,
+            end_minute INTEGER,
+            FOREIGN KEY (patient_id) REFERENCES patients (patient_id),
+            FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id),
+            CHECK (patient_id IS NOT NULL OR status = 'reserved')
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO appointments_rebuild (
+            appointment_id, patient_id, doctor_id, appointment_date, time_slot,
+            duration_minutes, status, diagnosis, prescription, notes,
+            created_at, updated_at, start_minute, end_minute
+        )
+        SELECT appointment_id, patient_id, doctor_id, appointment_date, time_slot,
+               duration_minutes, status, diagnosis, prescription, notes,
+               created_at, updated_at, start_minute, end_minute
+        FROM appointments
+    ''')
+    conn.execute('DROP TABLE appointments')
+    conn.execute('ALTER TABLE appointments_rebuild RENAME TO appointments')
+
+    _add_appointment_minutes_triggers(conn)
+    _create_appointment_indexes(conn)
+
+
+@migration(6, "appointment waitlist")
+def _add_waitlist(conn):
+    # Patients waiting for a doctor (or any doctor of a specialization) within
+    # a date range and time-of-day window; freed slots are matched on cancel
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS waitlist (
+            waitlist_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            patient_id INTEGER NOT NULL,
+            doctor_id INTEGER,
+            specialization TEXT,
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL,
+            earliest_minute INTEGER NOT NULL DEFAULT 0,
+            latest_minute INTEGER NOT NULL DEFAULT 1440,
+            duration_minutes INTEGER NOT NULL DEFAULT 30,
+            status TEXT NOT NULL DEFAULT 'waiting',
+            offered_doctor_id INTEGER,
+            offered_date DATE,
+            offered_minute INTEGER,
+            appointment_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (patient_id) REFERENCES patients (patient_id),
+            FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id),
+            FOREIGN KEY (appointment_id) REFERENCES appointments (appointment_id),
+            CHECK (doctor_id IS NOT NULL OR specialization IS NOT NULL)
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_waitlist_doctor_window
+        ON waitlist (doctor_id, start_date, end_date)
+        WHERE status = 'waiting'
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_waitlist_specialization_window
+        ON waitlist (specialization, start_date, end_date)
+        WHERE status = 'waiting'
+    ''')
+
+
+@migration(7, "recurring appointment series")
+def _add_appointment_series(conn):
+    # The recurrence a series was booked from; its appointments carry series_id
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS appointment_series (
+            series_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            patient_id INTEGER NOT NULL,
+            doctor_id INTEGER NOT NULL,
+            start_date DATE NOT NULL,
+            interval_days INTEGER NOT NULL DEFAULT 7,
+            occurrences INTEGER NOT NULL,
+            time_slot TIME NOT NULL,
+            duration_minutes INTEGER NOT NULL DEFAULT 30,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (patient_id) REFERENCES patients (patient_id),
+            FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id)
+        )
+    ''')
+    conn.execute('''
+        ALTER TABLE appointments
+        ADD COLUMN series_id INTEGER REFERENCES appointment_series (series_id)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_appointments_series
+        ON appointments (series_id, appointment_date)
+        WHERE series_id IS NOT NULL
+    ''')
+
+
+@migration(8, "visit types and per-doctor slot granularity")
+def _add_visit_types(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS visit_types (
+            visit_type TEXT PRIMARY KEY,
+            duration_minutes INTEGER NOT NULL CHECK (duration_minutes > 0),
+            description TEXT
+        )
+    ''')
+    conn.executemany('''
+        INSERT OR IGNORE INTO visit_types (visit_type, duration_minutes, description)
+        VALUES (?, ?, ?)
+    ''', [
+        ('consultation', 30, 'Standard consultation'),
+        ('new_patient', 60, 'New-patient consult'),
+        ('follow_up', 15, 'Follow-up visit'),
+        ('emergency', 30, 'Emergency visit'),
+    ])
+    # Base grid that a doctor's bookable start times are aligned to
+    conn.execute('''
+        ALTER TABLE doctors ADD COLUMN slot_minutes INTEGER NOT NULL DEFAULT 30
+    ''')
+
+
+@migration(9, "materialized doctor free intervals")
+def _add_free_intervals(conn):
+    # Free gaps per doctor-day for the dates in availability_horizon, kept in
+    # step with appointments and schedules by AvailabilityStore
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS doctor_free_intervals (
+            doctor_id INTEGER NOT NULL,
+            free_date DATE NOT NULL,
+            start_minute INTEGER NOT NULL,
+            end_minute INTEGER NOT NULL,
+            PRIMARY KEY (doctor_id, free_date, start_minute),
+            FOREIGN KEY (doctor_id) REFERENCES doctors (doctor_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS availability_horizon (
+            horizon_id INTEGER PRIMARY KEY CHECK (horizon_id = 1),
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL
+        )
+    ''')
+
+
+@migration(10, "named schedule templates and date-effective schedules")
+def _add_schedule_templates(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schedule_templates (
+            template_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schedule_template_hours (
+            template_id INTEGER NOT NULL,
+            day_of_week TEXT NOT NULL,
+            start_time TIME NOT NULL,
+            end_time TIME NOT NULL,
+            PRIMARY KEY (template_id, day_of_week),
+            FOREIGN KEY (template_id) REFERENCES schedule_templates (template_id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schedule_template_breaks (
+            template_id INTEGER NOT NULL,
+            day_of_week TEXT NOT NULL,
+            break_start TIME NOT NULL,
+            break_end TIME NOT NULL,
+            FOREIGN KEY (template_id) REFERENCES schedule_templates (template_id)
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_schedule_template_breaks_template
+        ON schedule_template_breaks (template_id, day_of_week)
+    ''')
+
+    # NULL is the open-ended base schedule; a dated row set replaces the
+    # whole weekly schedule from effective_from until the next version
+    conn.execute('ALTER TABLE doctor_schedules ADD COLUMN effective_from DATE')
+    conn.execute('ALTER TABLE doctor_breaks ADD COLUMN effective_from DATE')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_doctor_schedules_effective
+        ON doctor_schedules (doctor_id, effective_from)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_doctor_breaks_effective
+        ON doctor_breaks (doctor_id, effective_from)
+    ''')
+
+
+@migration(11, "free-interval date index for horizon rolls")
+def _add_free_interval_date_index(conn):
+    # The primary key leads with doctor_id, so trimming past dates across
+    # every doctor needs its own index
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_doctor_free_intervals_date
+        ON doctor_free_intervals (free_date)
+    ''')
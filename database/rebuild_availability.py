@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Rebuild, roll forward or verify the materialized doctor free intervals
+
+Usage: python -m database.rebuild_availability [--horizon-days 30] [--roll] [--verify]
+"""
+
+import argparse
+import sys
+from src.utils.database_manager import DatabaseManager
+
+
+def rebuild_availability(db_manager=None, horizon_days=30, roll=False, verify=False):
+    """Rebuild (or roll) the materialized horizon, optionally verifying it; returns mismatches"""
+    db_manager = db_manager or DatabaseManager()
+    store = db_manager.availability
+
+    if roll:
+        rows = store.roll()
+        print(f"🔄 Horizon rolled forward: {rows} free intervals added")
+    else:
+        rows = store.rebuild(horizon_days=horizon_days)
+        print(f"🧱 Availability rebuilt for {horizon_days} days: {rows} free intervals")
+
+    mismatches = store.verify() if verify else []
+    if verify:
+        if mismatches:
+            print(f"❌ {len(mismatches)} doctor-days differ from the computed availability:")
+            for doctor_id, free_date, stored, expected in mismatches[:20]:
+                print(f"   Doctor {doctor_id} on {free_date}: stored {stored}, expected {expected}")
+        else:
+            print("✅ Materialized availability matches the computed answer")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--horizon-days', type=int, default=30)
+    parser.add_argument('--roll', action='store_true', help='advance the existing horizon to today')
+    parser.add_argument('--verify', action='store_true', help='check the table against the source tables')
+    args = parser.parse_args()
+
+    mismatches = rebuild_availability(
+        horizon_days=args.horizon_days, roll=args.roll, verify=args.verify
+    )
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
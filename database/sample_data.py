@@ -1,25 +1,29 @@
 from src.utils.database_manager import DatabaseManager
 from datetime import datetime, time, date, timedelta
 
-def load_sample_data():
+def load_sample_data(db_manager=None):
     """Load sample data for testing"""
-    db_manager = DatabaseManager()
+    db_manager = db_manager or DatabaseManager()
     
     # Clear existing data first
-    conn = db_manager.db_config.get_connection()
-    cursor = conn.cursor()
-    
-    # Clear all tables (in correct order to respect foreign keys)
-    cursor.execute('DELETE FROM consultation_history')
-    cursor.execute('DELETE FROM appointments')
-    cursor.execute('DELETE FROM doctor_leave')
-    cursor.execute('DELETE FROM doctor_breaks')
-    cursor.execute('DELETE FROM doctor_schedules')
-    cursor.execute('DELETE FROM patients')
-    cursor.execute('DELETE FROM doctors')
-    
-    conn.commit()
-    conn.close()
+    with db_manager.db_config.transaction() as conn:
+        # Clear all tables (in correct order to respect foreign keys)
+        conn.execute('DELETE FROM consultation_history')
+        conn.execute('DELETE FROM waitlist')
+        conn.execute('DELETE FROM appointments')
+        conn.execute('DELETE FROM appointment_series')
+        conn.execute('DELETE FROM doctor_free_intervals')
+        conn.execute('DELETE FROM doctor_schedule_overrides')
+        conn.execute('DELETE FROM doctor_leave')
+        conn.execute('DELETE FROM doctor_breaks')
+        conn.execute('DELETE FROM doctor_schedules')
+        conn.execute('DELETE FROM schedule_template_breaks')
+        conn.execute('DELETE FROM schedule_template_hours')
+        conn.execute('DELETE FROM schedule_templates')
+        conn.execute('DELETE FROM patients')
+        conn.execute('DELETE FROM doctors')
+    db_manager.interval_index.invalidate()
+    db_manager.calendars.invalidate()
     
     print("📦 LOADING SAMPLE DATA...")
     
@@ -42,7 +46,7 @@ def load_sample_data():
             # If patient exists, get their ID
             existing_patient = db_manager.get_patient(mrn=patient[0])
             if existing_patient:
-                patient_ids.append(existing_patient[0])
+                patient_ids.append(existing_patient.patient_id)
     
     # Add sample doctors
     doctors = [
@@ -72,17 +76,12 @@ def load_sample_data():
     ]
     
     successful_appointments = 0
-    for i, appointment in enumerate(sample_appointments):
-        # Check if we have enough patient and doctor IDs
-        if i < len(patient_ids) and i < len(doctor_ids):
-            appointment_id, message = db_manager.add_appointment(*appointment)
-            if appointment_id:
-                print(f"Added appointment: {message} (ID: {appointment_id})")
-                successful_appointments += 1
-            else:
-                print(f"Failed to add appointment: {message}")
+    for result in db_manager.add_appointments_bulk(sample_appointments):
+        if result.booked:
+            print(f"Added appointment: {result.message} (ID: {result.appointment_id})")
+            successful_appointments += 1
         else:
-            print(f"Skipping appointment - not enough patients or doctors")
+            print(f"Failed to add appointment: {result.message}")
     
     print(f"\n✅ Sample data loading completed!")
     print(f"Loaded {len(patient_ids)} patients and {len(doctor_ids)} doctors")
@@ -12,15 +12,17 @@ from src.services.schedule_service import ScheduleService
 from src.services.notification_service import NotificationService
 from src.services.analytics_service import AnalyticsService
 from src.utils.database_manager import DatabaseManager
+from src.utils.time_utils import time_str
 from database.sample_data import load_sample_data
 
 class HospitalSchedulerApp:
     def __init__(self):
-        self.appointment_service = AppointmentService()
-        self.schedule_service = ScheduleService()
-        self.notification_service = NotificationService()
-        self.analytics_service = AnalyticsService()
+        # One manager (and so one schema check and connection pool) shared by all services
         self.db_manager = DatabaseManager()
+        self.appointment_service = AppointmentService(self.db_manager)
+        self.schedule_service = ScheduleService(self.db_manager)
+        self.notification_service = NotificationService(self.db_manager)
+        self.analytics_service = AnalyticsService(self.db_manager)
     
     def display_menu(self):
         """Display main menu"""
@@ -173,7 +175,9 @@ class HospitalSchedulerApp:
         print(f"\n📋 Appointments for Patient {patient_id}:")
         print("-" * 80)
         for appt in appointments:
-            print(f"ID: {appt[0]} | Dr. {appt[12]} ({appt[13]}) | Date: {appt[3]} | Time: {appt[4]} | Status: {appt[6]}")
+            status = getattr(appt.status, 'value', appt.status)
+            print(f"ID: {appt.appointment_id} | Dr. {appt.doctor_name} ({appt.specialization}) | "
+                  f"Date: {appt.appointment_date} | Time: {time_str(appt.time_slot)} | Status: {status}")
     
     def set_doctor_schedule(self):
         """Set doctor schedule"""
@@ -265,7 +269,7 @@ class HospitalSchedulerApp:
     def load_sample_data(self):
         """Load sample data"""
         print("\n📦 LOADING SAMPLE DATA...")
-        load_sample_data()
+        load_sample_data(self.db_manager)
         print("✅ Sample data loaded successfully!")
 
 def main():
@@ -1,13 +1,38 @@
 from datetime import datetime, timedelta
 from enum import Enum
+from src.utils.row_mapping import parse_date, parse_time
 
 class AppointmentStatus(Enum):
     SCHEDULED = "scheduled"
     COMPLETED = "completed"
     CANCELLED = "cancelled"
     EMERGENCY = "emergency"
+    RESERVED = "reserved"  # emergency capacity held without a patient
+
+def _parse_status(value):
+    """Convert a stored status to AppointmentStatus, keeping unknown values as-is"""
+    try:
+        return AppointmentStatus(value)
+    except ValueError:
+        return value
+
+# Marker for medical details that have not been loaded from the database yet
+_NOT_LOADED = object()
 
 class Appointment:
+    __slots__ = (
+        'appointment_id', 'patient_id', 'doctor_id', 'appointment_date', 'time_slot',
+        'duration_minutes', 'status', 'start_minute', 'end_minute',
+        'series_id', 'created_at', 'updated_at', 'patient_name', 'doctor_name', 'specialization',
+        '_details', '_detail_loader'
+    )
+    
+    CONVERTERS = {
+        'appointment_date': parse_date,
+        'time_slot': parse_time,
+        'status': _parse_status,
+    }
+    
     def __init__(self, appointment_id, patient_id, doctor_id, appointment_date, 
                  time_slot, duration_minutes=30):
         self.appointment_id = appointment_id
@@ -17,12 +42,66 @@ class Appointment:
         self.time_slot = time_slot
         self.duration_minutes = duration_minutes
         self.status = AppointmentStatus.SCHEDULED
-        self.diagnosis = None
-        self.prescription = None
-        self.notes = None
+        self.start_minute = None
+        self.end_minute = None
+        self.series_id = None
+        self.patient_name = None
+        self.doctor_name = None
+        self.specialization = None
+        self._details = (None, None, None)
+        self._detail_loader = None
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
     
+    @classmethod
+    def _from_db(cls, detail_loader=None):
+        """Blank instance for row hydration; medical details load on first access"""
+        appointment = cls.__new__(cls)
+        appointment.start_minute = appointment.end_minute = appointment.series_id = None
+        appointment.created_at = appointment.updated_at = None
+        appointment.patient_name = appointment.doctor_name = appointment.specialization = None
+        appointment._details = _NOT_LOADED
+        appointment._detail_loader = detail_loader
+        return appointment
+    
+    def _get_details(self):
+        """Get (diagnosis, prescription, notes), loading them if needed"""
+        if self._details is _NOT_LOADED:
+            if self._detail_loader is None:
+                self._details = (None, None, None)
+            else:
+                self._details = self._detail_loader(self.appointment_id)
+        return self._details
+    
+    def _set_detail(self, index, value):
+        details = list(self._get_details())
+        details[index] = value
+        self._details = tuple(details)
+    
+    @property
+    def diagnosis(self):
+        return self._get_details()[0]
+    
+    @diagnosis.setter
+    def diagnosis(self, value):
+        self._set_detail(0, value)
+    
+    @property
+    def prescription(self):
+        return self._get_details()[1]
+    
+    @prescription.setter
+    def prescription(self, value):
+        self._set_detail(1, value)
+    
+    @property
+    def notes(self):
+        return self._get_details()[2]
+    
+    @notes.setter
+    def notes(self, value):
+        self._set_detail(2, value)
+    
     def calculate_end_time(self):
         """Calculate appointment end time"""
         return (datetime.combine(self.appointment_date, self.time_slot) + 
@@ -31,9 +110,7 @@ class Appointment:
     def mark_completed(self, diagnosis="", prescription="", notes=""):
         """Mark appointment as completed with medical details"""
         self.status = AppointmentStatus.COMPLETED
-        self.diagnosis = diagnosis
-        self.prescription = prescription
-        self.notes = notes
+        self._details = (diagnosis, prescription, notes)
         self.updated_at = datetime.now()
     
     def mark_cancelled(self):
@@ -1,17 +1,29 @@
 from datetime import time, datetime
 
 class Doctor:
+    __slots__ = (
+        'doctor_id', 'name', 'specialization', 'email', 'phone', 'created_at',
+        'working_hours', 'break_times', 'leave_dates', 'emergency_slots', 'slot_minutes'
+    )
+    
     def __init__(self, doctor_id, name, specialization, email, phone):
         self.doctor_id = doctor_id
         self.name = name
         self.specialization = specialization
         self.email = email
         self.phone = phone
+        self.created_at = None
+        self.slot_minutes = 30   # start-time granularity in minutes
         self.working_hours = {}  # {day: (start_time, end_time)}
         self.break_times = {}    # {day: [(break_start, break_end)]}
         self.leave_dates = []    # List of unavailable dates
         self.emergency_slots = []  # Emergency appointment slots
     
+    @classmethod
+    def _from_db(cls):
+        """Blank instance for row hydration"""
+        return cls(None, None, None, None, None)
+    
     def set_working_hours(self, day, start_time, end_time):
         """Set working hours for a specific day"""
         self.working_hours[day] = (start_time, end_time)
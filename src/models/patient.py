@@ -1,4 +1,16 @@
+from datetime import datetime
+from src.utils.row_mapping import parse_date
+
 class Patient:
+    __slots__ = (
+        'patient_id', 'mrn', 'name', 'email', 'phone', 'date_of_birth', 'created_at',
+        'consultation_history'
+    )
+    
+    CONVERTERS = {
+        'date_of_birth': parse_date,
+    }
+    
     def __init__(self, patient_id, mrn, name, email, phone, date_of_birth):
         self.patient_id = patient_id
         self.mrn = mrn  # Medical Record Number
@@ -6,8 +18,14 @@ class Patient:
         self.email = email
         self.phone = phone
         self.date_of_birth = date_of_birth
+        self.created_at = None
         self.consultation_history = []
     
+    @classmethod
+    def _from_db(cls):
+        """Blank instance for row hydration"""
+        return cls(None, None, None, None, None, None)
+    
     def add_consultation(self, appointment_id, diagnosis, prescription, notes):
         """Add consultation record to patient history"""
         consultation = {
@@ -6,10 +6,26 @@ from .appointment_service import AppointmentService
 from .schedule_service import ScheduleService
 from .notification_service import NotificationService
 from .analytics_service import AnalyticsService
+from .emergency_reserve import EmergencyReserve
+from .waitlist_service import WaitlistService
+from .series_service import SeriesService, RecurrenceRule, SeriesResult
+from .batch_scheduler import BatchScheduler, BookingRequest, BatchPlacement
+from .async_services import AsyncAppointmentService, AsyncScheduleService, DatabaseExecutor
 
 __all__ = [
     'AppointmentService', 
     'ScheduleService', 
     'NotificationService', 
-    'AnalyticsService'
+    'AnalyticsService',
+    'EmergencyReserve',
+    'WaitlistService',
+    'SeriesService',
+    'RecurrenceRule',
+    'SeriesResult',
+    'BatchScheduler',
+    'BookingRequest',
+    'BatchPlacement',
+    'AsyncAppointmentService',
+    'AsyncScheduleService',
+    'DatabaseExecutor'
 ]
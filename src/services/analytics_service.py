@@ -1,42 +1,39 @@
 from datetime import datetime, date, timedelta
 from src.utils.database_manager import DatabaseManager
+from src.utils.time_utils import to_minutes, date_str
+from src.utils.row_mapping import named_rows
+from src.utils.doctor_calendar import weekday_number
 import statistics
 from collections import defaultdict
 
 class AnalyticsService:
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or DatabaseManager()
     
     def get_doctor_utilization(self, doctor_id, start_date, end_date):
         """Calculate doctor utilization rate for a period"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        # Get total working hours in period
-        cursor.execute('''
-            SELECT day_of_week, start_time, end_time 
-            FROM doctor_schedules 
-            WHERE doctor_id = ?
-        ''', (doctor_id,))
+        with self.db_manager.db_config.report_connection() as conn:
+            # Get total working hours in period
+            schedules = conn.execute('''
+                SELECT day_of_week, start_time, end_time, effective_from 
+                FROM doctor_schedules 
+                WHERE doctor_id = ?
+            ''', (doctor_id,)).fetchall()
+            
+            # Get booked appointment hours
+            result = named_rows.fetchone(conn.execute('''
+                SELECT COUNT(*) as appointment_count,
+                       SUM(duration_minutes) as total_minutes
+                FROM appointments 
+                WHERE doctor_id = ? 
+                AND appointment_date BETWEEN ? AND ?
+                AND status IN ('scheduled', 'completed')
+            ''', (doctor_id, start_date, end_date)))
         
-        schedules = cursor.fetchall()
         total_available_hours = self._calculate_available_hours(schedules, start_date, end_date)
         
-        # Get booked appointment hours
-        cursor.execute('''
-            SELECT COUNT(*) as appointment_count,
-                   SUM(duration_minutes) as total_minutes
-            FROM appointments 
-            WHERE doctor_id = ? 
-            AND appointment_date BETWEEN ? AND ?
-            AND status IN ('scheduled', 'completed')
-        ''', (doctor_id, start_date, end_date))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        appointment_count = result[0] if result[0] else 0
-        total_booked_minutes = result[1] if result[1] else 0
+        appointment_count = result.appointment_count or 0
+        total_booked_minutes = result.total_minutes or 0
         total_booked_hours = total_booked_minutes / 60
         
         # Calculate utilization rate
@@ -60,24 +57,23 @@ class AnalyticsService:
         total_hours = 0
         current_date = start_date
         
-        # Create day mapping
-        day_mapping = {
-            'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 'Thursday': 3,
-            'Friday': 4, 'Saturday': 5, 'Sunday': 6
-        }
-        
-        schedule_dict = {}
-        for day, start_time, end_time in schedules:
-            schedule_dict[day_mapping[day]] = (start_time, end_time)
+        # Weekly schedules by effective_from; None is the base version
+        versions = defaultdict(dict)
+        for day, start_time, end_time, effective_from in schedules:
+            weekday = weekday_number(day)
+            if weekday is not None:
+                versions[effective_from][weekday] = (start_time, end_time)
+        version_dates = sorted(effective_from for effective_from in versions if effective_from)
         
         # Calculate hours for each day in range
         while current_date <= end_date:
             day_of_week = current_date.weekday()
+            current = date_str(current_date)
+            in_effect = [effective_from for effective_from in version_dates if effective_from <= current]
+            schedule_dict = versions[in_effect[-1] if in_effect else None]
             if day_of_week in schedule_dict:
                 start_time, end_time = schedule_dict[day_of_week]
-                hours = (datetime.combine(date.today(), end_time) - 
-                        datetime.combine(date.today(), start_time)).seconds / 3600
-                total_hours += hours
+                total_hours += (to_minutes(end_time) - to_minutes(start_time)) / 60
             
             current_date += timedelta(days=1)
         
@@ -85,61 +81,55 @@ class AnalyticsService:
     
     def get_patient_flow_metrics(self, start_date, end_date):
         """Analyze patient flow and appointment patterns"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        # Basic appointment statistics
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total_appointments,
-                SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
-                SUM(CASE WHEN status = 'scheduled' THEN 1 ELSE 0 END) as scheduled,
-                SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) as cancelled,
-                SUM(CASE WHEN status = 'emergency' THEN 1 ELSE 0 END) as emergency,
-                AVG(duration_minutes) as avg_duration
-            FROM appointments 
-            WHERE appointment_date BETWEEN ? AND ?
-        ''', (start_date, end_date))
-        
-        stats = cursor.fetchone()
-        
-        # Appointment distribution by specialty
-        cursor.execute('''
-            SELECT d.specialization, COUNT(*) as appointment_count
-            FROM appointments a
-            JOIN doctors d ON a.doctor_id = d.doctor_id
-            WHERE a.appointment_date BETWEEN ? AND ?
-            GROUP BY d.specialization
-            ORDER BY appointment_count DESC
-        ''', (start_date, end_date))
-        
-        specialty_distribution = cursor.fetchall()
-        
-        # Daily appointment trends
-        cursor.execute('''
-            SELECT appointment_date, COUNT(*) as daily_count
-            FROM appointments 
-            WHERE appointment_date BETWEEN ? AND ?
-            GROUP BY appointment_date
-            ORDER BY appointment_date
-        ''', (start_date, end_date))
-        
-        daily_trends = cursor.fetchall()
-        
-        conn.close()
+        with self.db_manager.db_config.report_connection() as conn:
+            # Basic appointment statistics
+            stats = named_rows.fetchone(conn.execute('''
+                SELECT 
+                    COUNT(*) as total_appointments,
+                    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
+                    SUM(CASE WHEN status = 'scheduled' THEN 1 ELSE 0 END) as scheduled,
+                    SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) as cancelled,
+                    SUM(CASE WHEN status = 'emergency' THEN 1 ELSE 0 END) as emergency,
+                    AVG(duration_minutes) as avg_duration
+                FROM appointments 
+                WHERE appointment_date BETWEEN ? AND ?
+                AND status != 'reserved'
+            ''', (start_date, end_date)))
+            
+            # Appointment distribution by specialty
+            specialty_distribution = conn.execute('''
+                SELECT d.specialization, COUNT(*) as appointment_count
+                FROM appointments a
+                JOIN doctors d ON a.doctor_id = d.doctor_id
+                WHERE a.appointment_date BETWEEN ? AND ?
+                AND a.status != 'reserved'
+                GROUP BY d.specialization
+                ORDER BY appointment_count DESC
+            ''', (start_date, end_date)).fetchall()
+            
+            # Daily appointment trends
+            daily_trends = conn.execute('''
+                SELECT appointment_date, COUNT(*) as daily_count
+                FROM appointments 
+                WHERE appointment_date BETWEEN ? AND ?
+                AND status != 'reserved'
+                GROUP BY appointment_date
+                ORDER BY appointment_date
+            ''', (start_date, end_date)).fetchall()
         
         # Calculate additional metrics
-        completion_rate = (stats[1] / stats[0] * 100) if stats[0] > 0 else 0
-        cancellation_rate = (stats[3] / stats[0] * 100) if stats[0] > 0 else 0
+        total = stats.total_appointments
+        completion_rate = (stats.completed / total * 100) if total > 0 else 0
+        cancellation_rate = (stats.cancelled / total * 100) if total > 0 else 0
         
         return {
             'period': f"{start_date} to {end_date}",
-            'total_appointments': stats[0],
-            'completed_appointments': stats[1],
-            'scheduled_appointments': stats[2],
-            'cancelled_appointments': stats[3],
-            'emergency_appointments': stats[4],
-            'average_duration_minutes': round(stats[5] if stats[5] else 0, 2),
+            'total_appointments': total,
+            'completed_appointments': stats.completed,
+            'scheduled_appointments': stats.scheduled,
+            'cancelled_appointments': stats.cancelled,
+            'emergency_appointments': stats.emergency,
+            'average_duration_minutes': round(stats.avg_duration if stats.avg_duration else 0, 2),
             'completion_rate': round(completion_rate, 2),
             'cancellation_rate': round(cancellation_rate, 2),
             'specialty_distribution': specialty_distribution,
@@ -148,22 +138,17 @@ class AnalyticsService:
     
     def get_peak_hours_analysis(self, start_date, end_date):
         """Analyze peak appointment hours"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT 
-                strftime('%H:00', time_slot) as hour_block,
-                COUNT(*) as appointment_count
-            FROM appointments 
-            WHERE appointment_date BETWEEN ? AND ?
-            AND status != 'cancelled'
-            GROUP BY hour_block
-            ORDER BY appointment_count DESC
-        ''', (start_date, end_date))
-        
-        hourly_data = cursor.fetchall()
-        conn.close()
+        with self.db_manager.db_config.report_connection() as conn:
+            hourly_data = conn.execute('''
+                SELECT 
+                    printf('%02d:00', start_minute / 60) as hour_block,
+                    COUNT(*) as appointment_count
+                FROM appointments 
+                WHERE appointment_date BETWEEN ? AND ?
+                AND status NOT IN ('cancelled', 'reserved')
+                GROUP BY start_minute / 60
+                ORDER BY appointment_count DESC
+            ''', (start_date, end_date)).fetchall()
         
         peak_hours = []
         for hour, count in hourly_data[:5]:  # Top 5 peak hours
@@ -183,34 +168,38 @@ class AnalyticsService:
         start_date = report_date - timedelta(days=30)  # Last 30 days
         
         doctor_utilization = []
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        # Get all doctors
-        cursor.execute('SELECT doctor_id, name FROM doctors')
-        doctors = cursor.fetchall()
         
-        for doctor_id, doctor_name in doctors:
-            utilization = self.get_doctor_utilization(doctor_id, start_date, report_date)
-            doctor_utilization.append({
-                'doctor_name': doctor_name,
-                **utilization
-            })
-        
-        patient_flow = self.get_patient_flow_metrics(start_date, report_date)
-        peak_hours = self.get_peak_hours_analysis(start_date, report_date)
-        
-        conn.close()
+        # Run every query of the report against one read snapshot
+        with self.db_manager.db_config.report_connection() as conn:
+            doctors = conn.execute('SELECT doctor_id, name FROM doctors').fetchall()
+            
+            for doctor_id, doctor_name in doctors:
+                utilization = self.get_doctor_utilization(doctor_id, start_date, report_date)
+                doctor_utilization.append({
+                    'doctor_name': doctor_name,
+                    **utilization
+                })
+            
+            patient_flow = self.get_patient_flow_metrics(start_date, report_date)
+            peak_hours = self.get_peak_hours_analysis(start_date, report_date)
+            snapshot_age = self.get_snapshot_age()
         
         # Generate report
         self._print_performance_report(doctor_utilization, patient_flow, peak_hours, start_date, report_date)
+        print(f"Data as of {snapshot_age:.1f} seconds ago "
+              f"({self.db_manager.db_config.report_mode} mode)")
         
         return {
             'doctor_utilization': doctor_utilization,
             'patient_flow': patient_flow,
-            'peak_hours': peak_hours
+            'peak_hours': peak_hours,
+            'snapshot_age_seconds': round(snapshot_age, 3)
         }
     
+    def get_snapshot_age(self):
+        """Seconds since the data analytics reads was captured"""
+        return self.db_manager.db_config.report_reader.snapshot_age()
+    
     def _print_performance_report(self, doctor_utilization, patient_flow, peak_hours, start_date, end_date):
         """Print formatted performance report"""
         print(f"\n📈 HOSPITAL PERFORMANCE REPORT")
@@ -1,27 +1,45 @@
 from datetime import datetime, time, date, timedelta
-from src.utils.database_manager import DatabaseManager
+import heapq
+from src.utils.database_manager import DatabaseManager, BookingResult
+from src.utils.time_utils import MINUTES_PER_DAY, to_minutes, from_minutes
+from src.utils.intervals import free_intervals, first_fit
 from src.models.appointment import AppointmentStatus
 import logging
 
+# Working window for doctors who have no schedule for a weekday (minutes)
+DEFAULT_WORKING_HOURS = (9 * 60, 17 * 60)
+
 class AppointmentService:
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    def __init__(self, db_manager=None, emergency_reserve=None, waitlist=None):
+        self.db_manager = db_manager or DatabaseManager()
+        self.emergency_reserve = emergency_reserve
+        self.waitlist = waitlist
         self.logger = logging.getLogger(__name__)
     
-    def book_appointment(self, patient_id, doctor_id, appointment_date, preferred_time):
-        """Book an appointment with automatic time slot finding"""
+    def book_appointment(self, patient_id, doctor_id, appointment_date, preferred_time,
+                         duration_minutes=30, visit_type=None):
+        """Book an appointment with automatic time slot finding.
+        
+        A visit_type (e.g. 'new_patient', 'follow_up') sets the duration
+        from the visit_types table instead of duration_minutes.
+        """
+        if visit_type is not None:
+            duration_minutes = self.db_manager.get_visit_duration(visit_type)
+        
         # Check doctor availability
         if not self._is_doctor_available(doctor_id, appointment_date):
             return None, "Doctor is not available on this date"
         
         # Find available time slot
-        available_slot = self._find_available_slot(doctor_id, appointment_date, preferred_time)
+        available_slot = self._find_available_slot(
+            doctor_id, appointment_date, preferred_time, duration_minutes=duration_minutes
+        )
         if not available_slot:
             return None, "No available slots found for preferred time"
         
         # Book the appointment
         appointment_id, message = self.db_manager.add_appointment(
-            patient_id, doctor_id, appointment_date, available_slot
+            patient_id, doctor_id, appointment_date, available_slot, duration_minutes
         )
         
         if appointment_id:
@@ -31,102 +49,235 @@ class AppointmentService:
         
         return appointment_id, message
     
-    def _is_doctor_available(self, doctor_id, appointment_date):
-        """Check if doctor is available on given date"""
-        # For now, we'll assume doctors are available on weekdays
-        # In a real system, this would check doctor schedules and leave
-        return appointment_date.weekday() < 5  # Monday-Friday
+    def book_earliest_by_specialization(self, patient_id, specialization, after=None,
+                                        horizon_days=14, duration_minutes=30, visit_type=None):
+        """Book the earliest free slot with any doctor of a specialization.
+        
+        Each doctor contributes a lazy stream of free start times in date
+        order, and a heap keyed by (date, minute, doctor_id) only advances
+        the stream whose head was taken, so days past the answer are never
+        loaded. If another booking wins the race for a slot, that doctor's
+        day is re-read and the search continues with the next candidate.
+        """
+        if visit_type is not None:
+            duration_minutes = self.db_manager.get_visit_duration(visit_type)
+        after = after or datetime.now()
+        if not isinstance(after, datetime):
+            after = datetime.combine(after, time(0, 0))
+        first_day, first_minute = after.date(), to_minutes(after.time())
+        
+        heap = []
+        for doctor in self.db_manager.get_doctors_by_specialization(specialization):
+            stream = self._free_starts(
+                doctor.doctor_id, first_day, first_minute, horizon_days, duration_minutes
+            )
+            self._push_candidate(heap, doctor.doctor_id, stream)
+        
+        while heap:
+            day, minute, doctor_id, stream = heapq.heappop(heap)
+            time_slot = from_minutes(minute)
+            result = self.db_manager.book_appointment_slot(
+                patient_id, doctor_id, day, time_slot, duration_minutes
+            )
+            
+            if result.booked:
+                self.logger.info(f"Appointment booked: {result.appointment_id} for patient {patient_id}")
+                self._send_appointment_confirmation(patient_id, doctor_id, day, time_slot)
+                return result.appointment_id, result.message
+            if result.status != BookingResult.CONFLICT:
+                return None, result.message
+            
+            # Lost the race: reload this doctor-day and resume from the same point
+            self.db_manager.interval_index.invalidate(doctor_id, day.isoformat())
+            stream = self._free_starts(
+                doctor_id, day, minute, horizon_days - (day - first_day).days, duration_minutes
+            )
+            self._push_candidate(heap, doctor_id, stream)
+        
+        return None, f"No {specialization} slots available in the next {horizon_days} days"
     
-    def _find_available_slot(self, doctor_id, appointment_date, preferred_time, max_slots=10):
-        """Find available time slot starting from preferred time"""
-        current_time = preferred_time
-        slots_checked = 0
-        
-        while slots_checked < max_slots:
-            # Check if this slot is available
-            if not self.db_manager._has_appointment_conflict(doctor_id, appointment_date, current_time, 30):
-                return current_time
+    @staticmethod
+    def _push_candidate(heap, doctor_id, stream):
+        """Push the next (date, minute) of a doctor's stream onto the heap"""
+        candidate = next(stream, None)
+        if candidate is not None:
+            heapq.heappush(heap, (candidate[0], candidate[1], doctor_id, stream))
+    
+    def _free_starts(self, doctor_id, first_day, first_minute, days, duration_minutes):
+        """Yield (date, start_minute) for the first grid start of each free gap that fits.
+        
+        Starts are on the doctor's slot grid, so first_minute is rounded up
+        to it, and come in time order.
+        """
+        calendar = self.db_manager.calendars.get(doctor_id)
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            if not calendar.is_working(day):
+                continue
             
-            # Move to next slot (30-minute intervals)
-            current_time = (datetime.combine(date.today(), current_time) + timedelta(minutes=30)).time()
-            slots_checked += 1
+            hours, busy = self.db_manager.get_doctor_day_intervals(doctor_id, day)
+            window_start, window_end = hours or DEFAULT_WORKING_HOURS
+            if offset == 0:
+                window_start = max(window_start, first_minute)
+            
+            for gap in free_intervals(window_start, window_end, busy):
+                start = first_fit([gap], duration_minutes, calendar.slot_minutes,
+                                  calendar.grid_anchor(day))
+                if start is not None:
+                    yield day, start
+    
+    def _is_doctor_available(self, doctor_id, appointment_date):
+        """Check if doctor works on given date (schedule, leave and overrides)"""
+        return self.db_manager.calendars.get(doctor_id).is_working(appointment_date)
+    
+    def _find_available_slot(self, doctor_id, appointment_date, preferred_time, max_slots=10,
+                             duration_minutes=30):
+        """Find the first free gap of duration_minutes at or after the preferred time.
         
-        return None
+        The search covers max_slots of the doctor's grid slots after
+        preferred_time, clipped to the doctor's working hours when a
+        schedule exists.
+        """
+        earliest = to_minutes(preferred_time)
+        slot_minutes = self.db_manager.calendars.get(doctor_id).slot_minutes
+        return self._find_first_gap(
+            doctor_id, appointment_date, earliest, earliest + max_slots * slot_minutes,
+            duration_minutes
+        )
     
-    def cancel_appointment(self, appointment_id):
-        """Cancel an appointment"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
+    def _find_first_gap(self, doctor_id, appointment_date, earliest, latest, duration_minutes,
+                        respect_schedule=True):
+        """Get the first free start time in [earliest, latest) minutes, or None.
         
-        cursor.execute('''
-            UPDATE appointments 
-            SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP 
-            WHERE appointment_id = ?
-        ''', (appointment_id,))
+        Busy intervals for the doctor-day are loaded once and merged with
+        breaks (and clipped to working hours) when respect_schedule is set;
+        starts are then also kept on the doctor's slot grid.
+        """
+        hours, busy = self.db_manager.get_doctor_day_intervals(
+            doctor_id, appointment_date, include_breaks=respect_schedule
+        )
+        step, anchor = 1, 0
+        if respect_schedule:
+            calendar = self.db_manager.calendars.get(doctor_id)
+            step, anchor = calendar.slot_minutes, calendar.grid_anchor(appointment_date)
+            if hours:
+                earliest, latest = max(earliest, hours[0]), min(latest, hours[1])
         
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
+        start = first_fit(
+            free_intervals(earliest, min(latest, MINUTES_PER_DAY), busy), duration_minutes,
+            step, anchor
+        )
+        return None if start is None else from_minutes(start)
+    
+    def cancel_appointment(self, appointment_id):
+        """Cancel an appointment, handing the freed slot to the waitlist if one is attached"""
+        backfill = None
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            slot = conn.execute('''
+                SELECT doctor_id, appointment_date, start_minute, end_minute, status
+                FROM appointments WHERE appointment_id = ?
+            ''', (appointment_id,)).fetchone()
+            cursor = conn.execute('''
+                UPDATE appointments 
+                SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP 
+                WHERE appointment_id = ?
+            ''', (appointment_id,))
+            success = cursor.rowcount > 0
+            
+            # Backfill in the same transaction so the slot is never visibly free
+            if success and self.waitlist and slot[4] not in ('cancelled', 'reserved'):
+                backfill = self.waitlist.backfill(conn, slot[0], slot[1], slot[2], slot[3])
+            if success:
+                self.db_manager.availability.refresh_days(conn, slot[0], [slot[1]])
+                # Touch the cache only once an enclosing transaction has committed
+                self.db_manager.db_config.after_commit(
+                    lambda: self._update_index_after_cancel(slot, appointment_id, backfill),
+                    lambda: self.db_manager.interval_index.invalidate(slot[0], slot[1])
+                )
         
         if success:
             self.logger.info(f"Appointment cancelled: {appointment_id}")
         
+        if backfill and backfill.appointment_id:
+            self.logger.info(f"Waitlist entry {backfill.waitlist_id} booked: {backfill.appointment_id}")
+            self._send_appointment_confirmation(
+                backfill.patient_id, backfill.doctor_id, backfill.appointment_date,
+                from_minutes(backfill.start_minute)
+            )
+        elif backfill:
+            self.logger.info(f"Waitlist entry {backfill.waitlist_id} offered the freed slot")
+        
         return success
     
+    def _update_index_after_cancel(self, slot, appointment_id, backfill):
+        """Apply a committed cancellation, and any waitlist booking it made, to the interval index"""
+        index = self.db_manager.interval_index
+        index.remove(slot[0], slot[1], appointment_id)
+        if backfill and backfill.appointment_id:
+            index.add(
+                backfill.doctor_id, backfill.appointment_date, backfill.appointment_id,
+                backfill.start_minute, backfill.start_minute + backfill.duration_minutes
+            )
+    
     def complete_appointment(self, appointment_id, diagnosis, prescription, notes):
         """Mark appointment as completed with medical details"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE appointments 
-            SET status = 'completed', diagnosis = ?, prescription = ?, notes = ?, 
-                updated_at = CURRENT_TIMESTAMP 
-            WHERE appointment_id = ?
-        ''', (diagnosis, prescription, notes, appointment_id))
-        
-        # Also add to consultation history
-        cursor.execute('''
-            INSERT INTO consultation_history (patient_id, appointment_id, diagnosis, prescription, notes)
-            SELECT patient_id, appointment_id, diagnosis, prescription, notes
-            FROM appointments 
-            WHERE appointment_id = ?
-        ''', (appointment_id,))
-        
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            slot = conn.execute(
+                'SELECT doctor_id, appointment_date FROM appointments WHERE appointment_id = ?',
+                (appointment_id,)
+            ).fetchone()
+            conn.execute('''
+                UPDATE appointments 
+                SET status = 'completed', diagnosis = ?, prescription = ?, notes = ?, 
+                    updated_at = CURRENT_TIMESTAMP 
+                WHERE appointment_id = ?
+            ''', (diagnosis, prescription, notes, appointment_id))
+            
+            # Also add to consultation history
+            cursor = conn.execute('''
+                INSERT INTO consultation_history (patient_id, appointment_id, diagnosis, prescription, notes)
+                SELECT patient_id, appointment_id, diagnosis, prescription, notes
+                FROM appointments 
+                WHERE appointment_id = ?
+            ''', (appointment_id,))
+            success = cursor.rowcount > 0
+            if success:
+                self.db_manager.availability.refresh_days(conn, slot[0], [slot[1]])
         
         if success:
+            # A completed visit still occupies its slot, but it may have been cancelled before
+            self.db_manager.interval_index.invalidate(slot[0], slot[1])
             self.logger.info(f"Appointment completed: {appointment_id}")
         
         return success
     
     def get_patient_appointments(self, patient_id, status=None):
         """Get all appointments for a patient"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        if status:
-            cursor.execute('''
-                SELECT a.*, d.name as doctor_name, d.specialization 
-                FROM appointments a 
-                JOIN doctors d ON a.doctor_id = d.doctor_id 
-                WHERE a.patient_id = ? AND a.status = ?
-                ORDER BY a.appointment_date DESC, a.time_slot DESC
-            ''', (patient_id, status))
-        else:
-            cursor.execute('''
-                SELECT a.*, d.name as doctor_name, d.specialization 
-                FROM appointments a 
-                JOIN doctors d ON a.doctor_id = d.doctor_id 
-                WHERE a.patient_id = ? 
-                ORDER BY a.appointment_date DESC, a.time_slot DESC
-            ''', (patient_id,))
-        
-        appointments = cursor.fetchall()
-        conn.close()
-        return appointments
+        with self.db_manager.db_config.connection() as conn:
+            if status:
+                cursor = conn.execute('''
+                    SELECT a.appointment_id, a.patient_id, a.doctor_id, a.appointment_date,
+                           a.time_slot, a.duration_minutes, a.status, a.start_minute,
+                           a.end_minute, a.created_at, a.updated_at,
+                           d.name as doctor_name, d.specialization 
+                    FROM appointments a 
+                    JOIN doctors d ON a.doctor_id = d.doctor_id 
+                    WHERE a.patient_id = ? AND a.status = ?
+                    ORDER BY a.appointment_date DESC, a.time_slot DESC
+                ''', (patient_id, status))
+            else:
+                cursor = conn.execute('''
+                    SELECT a.appointment_id, a.patient_id, a.doctor_id, a.appointment_date,
+                           a.time_slot, a.duration_minutes, a.status, a.start_minute,
+                           a.end_minute, a.created_at, a.updated_at,
+                           d.name as doctor_name, d.specialization 
+                    FROM appointments a 
+                    JOIN doctors d ON a.doctor_id = d.doctor_id 
+                    WHERE a.patient_id = ? 
+                    ORDER BY a.appointment_date DESC, a.time_slot DESC
+                ''', (patient_id,))
+            
+            return self.db_manager.appointment_rows.fetchall(cursor)
     
     def _send_appointment_confirmation(self, patient_id, doctor_id, appointment_date, time_slot):
         """Simulate sending appointment confirmation (console output for demo)"""
@@ -134,18 +285,15 @@ class AppointmentService:
         doctor = self.db_manager.get_doctor(doctor_id)
         
         print(f"\n=== APPOINTMENT CONFIRMATION ===")
-        print(f"Patient: {patient[2]}")  # name is at index 2
-        print(f"Doctor: {doctor[1]}")    # name is at index 1
+        print(f"Patient: {patient.name}")
+        print(f"Doctor: {doctor.name}")
         print(f"Date: {appointment_date}")
         print(f"Time: {time_slot}")
-        print(f"MRN: {patient[1]}")
+        print(f"MRN: {patient.mrn}")
         print(f"===============================\n")
     
     def book_emergency_appointment(self, patient_id, doctor_id, appointment_date):
         """Book emergency appointment - finds next available slot regardless of schedule"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
         # Find next available slot today
         current_time = datetime.now().time()
         today = date.today()
@@ -154,37 +302,56 @@ class AppointmentService:
         emergency_slot = self._find_emergency_slot(doctor_id, today, current_time)
         
         if emergency_slot:
-            appointment_id, message = self.db_manager.add_appointment(
-                patient_id, doctor_id, today, emergency_slot
+            result = self.db_manager.book_appointment_slot(
+                patient_id, doctor_id, today, emergency_slot,
+                status=AppointmentStatus.EMERGENCY.value
             )
+            appointment_id, message = result.appointment_id, result.message
             
             if appointment_id:
-                cursor.execute('''
-                    UPDATE appointments SET status = 'emergency' 
-                    WHERE appointment_id = ?
-                ''', (appointment_id,))
-                conn.commit()
-                
                 self.logger.info(f"Emergency appointment booked: {appointment_id}")
                 print(f"🚨 EMERGENCY APPOINTMENT: {today} at {emergency_slot}")
             
-            conn.close()
             return appointment_id, message
         
-        conn.close()
         return None, "No emergency slots available today"
     
-    def _find_emergency_slot(self, doctor_id, appointment_date, start_time, max_hours=4):
-        """Find emergency slot within specified hours"""
-        current_dt = datetime.combine(appointment_date, start_time)
-        end_dt = current_dt + timedelta(hours=max_hours)
-        
-        while current_dt <= end_dt:
-            if not self.db_manager._has_appointment_conflict(
-                doctor_id, appointment_date, current_dt.time(), 30
-            ):
-                return current_dt.time()
-            
-            current_dt += timedelta(minutes=30)
+    def book_emergency_by_specialization(self, patient_id, specialization):
+        """Book the first emergency slot with any doctor of a specialization.
+        
+        Pre-reserved capacity is used when an EmergencyReserve is attached;
+        otherwise (or when the reserve is exhausted) each doctor's next four
+        hours are searched for a free gap.
+        """
+        if self.emergency_reserve:
+            result = self.emergency_reserve.allocate(patient_id, specialization)
+            if result.booked:
+                self.logger.info(f"Emergency appointment booked from reserve: {result.appointment_id}")
+                return result.appointment_id, result.message
         
-        return None
+        now = datetime.now()
+        today = now.date()
+        for doctor in self.db_manager.get_doctors_by_specialization(specialization):
+            emergency_slot = self._find_emergency_slot(doctor.doctor_id, today, now.time())
+            if not emergency_slot:
+                continue
+            result = self.db_manager.book_appointment_slot(
+                patient_id, doctor.doctor_id, today, emergency_slot,
+                status=AppointmentStatus.EMERGENCY.value
+            )
+            if result.booked:
+                self.logger.info(f"Emergency appointment booked: {result.appointment_id}")
+                print(f"🚨 EMERGENCY APPOINTMENT: {today} at {emergency_slot}")
+                return result.appointment_id, result.message
+        
+        return None, f"No {specialization} emergency slots available today"
+    
+    def _find_emergency_slot(self, doctor_id, appointment_date, start_time, max_hours=4,
+                             duration_minutes=30):
+        """Find emergency slot within specified hours, ignoring schedule and breaks"""
+        earliest = to_minutes(start_time)
+        return self._find_first_gap(
+            doctor_id, appointment_date, earliest,
+            earliest + max_hours * 60 + duration_minutes, duration_minutes,
+            respect_schedule=False
+        )
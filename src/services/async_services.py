@@ -0,0 +1,121 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.database_manager import DatabaseManager
+from src.services.appointment_service import AppointmentService
+from src.services.schedule_service import ScheduleService
+
+
+class DatabaseExecutor:
+    """Bounded thread pool that runs blocking service calls for asyncio callers.
+
+    Defaults to one worker per pooled connection, and for_config() hands
+    every facade on a database file the same executor, so workers never
+    queue on the pool. Each call keeps its worker's connection checked out
+    from start to finish. Cancelling the awaiting task drops a call that
+    has not started yet; for one already running it interrupts the SQLite
+    statement in progress, if any, which rolls back an open transaction.
+    Python code between statements is not interrupted and runs on.
+    """
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, db_config, max_workers=None):
+        self.db_config = db_config
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or db_config.pool_size,
+            thread_name_prefix='scheduler-db'
+        )
+        self._shutdown = False
+
+    @classmethod
+    def for_config(cls, db_config):
+        """Get the process-wide executor for a database file's connection pool"""
+        key = os.path.abspath(db_config.db_path)
+        pool = db_config.pool
+        with cls._registry_lock:
+            entry = cls._registry.get(key)
+            if entry is None or entry[0] is not pool or entry[1]._shutdown:
+                entry = (pool, cls(db_config))
+                cls._registry[key] = entry
+            return entry[1]
+
+    async def run(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on a worker and await its result"""
+        held = {}
+        lock = threading.Lock()
+
+        def call():
+            with self.db_config.connection() as conn:
+                with lock:
+                    held['conn'] = conn
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    with lock:
+                        held.clear()
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, call)
+        except asyncio.CancelledError:
+            with lock:
+                if 'conn' in held:
+                    held['conn'].interrupt()
+            raise
+
+    def shutdown(self, wait=True):
+        """Stop accepting calls and release the worker threads"""
+        self._shutdown = True
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class AsyncAppointmentService:
+    """Asyncio facade over AppointmentService with the same semantics.
+
+    emergency_reserve and waitlist are passed to the wrapped service, as
+    for AppointmentService.
+    """
+
+    def __init__(self, db_manager=None, executor=None, emergency_reserve=None, waitlist=None):
+        self.service = AppointmentService(
+            db_manager or DatabaseManager(), emergency_reserve=emergency_reserve, waitlist=waitlist
+        )
+        self.executor = executor or DatabaseExecutor.for_config(self.service.db_manager.db_config)
+
+    async def book_appointment(self, patient_id, doctor_id, appointment_date, preferred_time,
+                               duration_minutes=30, visit_type=None):
+        """Book an appointment with automatic time slot finding"""
+        return await self.executor.run(
+            self.service.book_appointment, patient_id, doctor_id, appointment_date, preferred_time,
+            duration_minutes, visit_type
+        )
+
+    async def cancel_appointment(self, appointment_id):
+        """Cancel an appointment"""
+        return await self.executor.run(self.service.cancel_appointment, appointment_id)
+
+    async def get_patient_appointments(self, patient_id, status=None):
+        """Get all appointments for a patient.
+
+        Medical details still load lazily, so read diagnosis, prescription
+        and notes inside executor.run() rather than on the event loop.
+        """
+        return await self.executor.run(self.service.get_patient_appointments, patient_id, status)
+
+
+class AsyncScheduleService:
+    """Asyncio facade over ScheduleService with the same semantics"""
+
+    def __init__(self, db_manager=None, executor=None):
+        self.service = ScheduleService(db_manager or DatabaseManager())
+        self.executor = executor or DatabaseExecutor.for_config(self.service.db_manager.db_config)
+
+    async def get_doctor_availability(self, doctor_id, target_date, duration_minutes=None,
+                                      visit_type=None):
+        """Get available start times for a doctor on specific date"""
+        return await self.executor.run(
+            self.service.get_doctor_availability, doctor_id, target_date, duration_minutes, visit_type
+        )
@@ -0,0 +1,154 @@
+from collections import namedtuple, defaultdict
+from datetime import date
+from src.utils.database_manager import DatabaseManager
+from src.utils.time_utils import to_minutes, from_minutes, time_str, date_str
+from src.utils.intervals import merge_intervals, free_intervals, FreeList
+from src.services.appointment_service import DEFAULT_WORKING_HOURS
+import logging
+
+# A queued request: a doctor_id or a specialization, and a window on one date
+BookingRequest = namedtuple(
+    'BookingRequest',
+    'patient_id appointment_date window_start window_end '
+    'doctor_id specialization preferred_time duration_minutes',
+    defaults=(None, None, None, 30)
+)
+
+# Outcome per request; appointment_id is None when no slot fit the window
+BatchPlacement = namedtuple(
+    'BatchPlacement', 'appointment_id doctor_id appointment_date time_slot deviation_minutes'
+)
+
+
+class BatchScheduler:
+    """Assigns a whole queue of booking requests in one pass.
+
+    Every candidate doctor-day is loaded once into a FreeList of free
+    intervals. Requests are then placed greedily, most constrained first
+    (fewest candidate doctors, narrowest window), each at the feasible
+    start on the doctor's slot grid closest to its preferred time over all
+    its candidate doctors.
+    Planning and the executemany insert run in one BEGIN IMMEDIATE
+    transaction, so the batch commits atomically against current data.
+    """
+
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or DatabaseManager()
+        self.logger = logging.getLogger(__name__)
+
+    def schedule(self, requests):
+        """Place and book queued BookingRequests; returns BatchPlacements in input order"""
+        requests = list(requests)
+        candidates = self._candidate_doctors(requests)
+        windows = [
+            (to_minutes(request.window_start), to_minutes(request.window_end))
+            for request in requests
+        ]
+        order = sorted(
+            range(len(requests)),
+            key=lambda i: (len(candidates[i]), windows[i][1] - windows[i][0], windows[i][0], i)
+        )
+
+        placements = [BatchPlacement(None, None, request.appointment_date, None, None)
+                      for request in requests]
+        planned = []
+
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            free_lists = self._load_free_lists(conn, requests, candidates)
+            calendars = self.db_manager.calendars.get_many(
+                {doctor_id for doctor_ids in candidates for doctor_id in doctor_ids}
+            )
+
+            for i in order:
+                request = requests[i]
+                earliest, latest = windows[i]
+                preferred = to_minutes(request.preferred_time or request.window_start)
+                day = date_str(request.appointment_date)
+
+                best = None
+                for doctor_id in candidates[i]:
+                    free = free_lists.get((doctor_id, day))
+                    if free is None:
+                        continue
+                    calendar = calendars[doctor_id]
+                    start = free.nearest_fit(
+                        preferred, request.duration_minutes, earliest, latest,
+                        calendar.slot_minutes, calendar.grid_anchor(request.appointment_date)
+                    )
+                    if start is not None and (best is None or abs(start - preferred) < best[0]):
+                        best = (abs(start - preferred), start, doctor_id, free)
+
+                if best is None:
+                    continue
+                deviation, start, doctor_id, free = best
+                end = start + request.duration_minutes
+                free.take(start, end)
+                planned.append((i, doctor_id, day, start, end, deviation))
+
+            new_ids = self.db_manager._insert_appointments(conn, [
+                (requests[i].patient_id, doctor_id, day, time_str(start),
+                 requests[i].duration_minutes, start, end)
+                for i, doctor_id, day, start, end, _ in planned
+            ])
+
+        for (i, doctor_id, day, start, end, deviation), appointment_id in zip(planned, new_ids):
+            self.db_manager.interval_index.add(doctor_id, day, appointment_id, start, end)
+            placements[i] = BatchPlacement(
+                appointment_id, doctor_id, requests[i].appointment_date, from_minutes(start), deviation
+            )
+
+        self.logger.info(f"Batch scheduled {len(planned)} of {len(requests)} requests")
+        return placements
+
+    def _candidate_doctors(self, requests):
+        """Get the tuple of doctor IDs each request may be booked with"""
+        by_specialization = {}
+        candidates = []
+        for request in requests:
+            if request.doctor_id is not None:
+                candidates.append((request.doctor_id,))
+                continue
+            if request.specialization not in by_specialization:
+                by_specialization[request.specialization] = tuple(
+                    doctor.doctor_id
+                    for doctor in self.db_manager.get_doctors_by_specialization(request.specialization)
+                )
+            candidates.append(by_specialization[request.specialization])
+        return candidates
+
+    def _load_free_lists(self, conn, requests, candidates):
+        """Build a FreeList per working candidate doctor-day, one query per doctor"""
+        days_by_doctor = defaultdict(set)
+        for request, doctor_ids in zip(requests, candidates):
+            for doctor_id in doctor_ids:
+                days_by_doctor[doctor_id].add(date_str(request.appointment_date))
+        return load_free_lists(self.db_manager, conn, days_by_doctor)
+
+
+def load_free_lists(db_manager, conn, days_by_doctor):
+    """Get {(doctor_id, date_str): FreeList} for the working days in {doctor_id: {date_str}}.
+
+    Each doctor's bookings over its day span come from one range query on
+    conn, so the lists reflect that connection's open transaction.
+    """
+    free_lists = {}
+    for doctor_id, days in days_by_doctor.items():
+        if not days:
+            continue
+        booked = defaultdict(list)
+        for appointment_date, start_minute, end_minute in conn.execute('''
+            SELECT appointment_date, start_minute, end_minute FROM appointments
+            WHERE doctor_id = ? AND appointment_date BETWEEN ? AND ?
+            AND status != 'cancelled'
+        ''', (doctor_id, min(days), max(days))):
+            booked[appointment_date].append((start_minute, end_minute))
+
+        calendar = db_manager.calendars.get(doctor_id)
+        for day in days:
+            day_date = date.fromisoformat(day)
+            if not calendar.is_working(day_date):
+                continue
+            hours = calendar.working_hours(day_date) or DEFAULT_WORKING_HOURS
+            busy = merge_intervals(booked[day] + calendar.breaks_on(day_date))
+            free_lists[(doctor_id, day)] = FreeList(free_intervals(hours[0], hours[1], busy))
+    return free_lists
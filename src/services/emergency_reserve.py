@@ -0,0 +1,165 @@
+import threading
+from collections import defaultdict, deque
+from datetime import datetime, time, date
+from src.utils.database_manager import DatabaseManager, BookingResult
+from src.utils.time_utils import to_minutes, date_str
+from src.models.appointment import AppointmentStatus
+import logging
+
+class EmergencyReserve:
+    """Emergency capacity held back from regular booking.
+
+    replenish() places a 'reserved' placeholder appointment at each reserve
+    time for every doctor working that day, so regular booking sees those
+    slots as taken. The placeholders are kept in a ready pool per
+    specialization ordered by start time; allocate() pops the earliest in
+    O(1) and claims it with a single UPDATE. Reserves not claimed
+    release_lead_minutes before they start go back to regular booking
+    when release_expired() runs.
+    """
+
+    def __init__(self, db_manager=None, reserve_times=(time(10, 0), time(15, 0)),
+                 duration_minutes=30, release_lead_minutes=15):
+        self.db_manager = db_manager or DatabaseManager()
+        self.reserve_times = tuple(reserve_times)
+        self.duration_minutes = duration_minutes
+        self.release_lead_minutes = release_lead_minutes
+        self.pools = defaultdict(deque)  # {specialization: deque[(date, start_minute, doctor_id, appointment_id)]}
+        self.hits = 0
+        self.misses = 0
+        self.released = 0
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def replenish(self, reserve_date=None):
+        """Hold reserve slots for every doctor working on a date; returns the number held"""
+        reserve_date = reserve_date or date.today()
+        reserve_date_str = date_str(reserve_date)
+
+        with self.db_manager.db_config.connection() as conn:
+            doctor_ids = [row[0] for row in conn.execute('SELECT doctor_id FROM doctors')]
+
+        for doctor_id in doctor_ids:
+            if not self.db_manager.calendars.get(doctor_id).is_working(reserve_date):
+                continue
+            hours, busy = self.db_manager.get_doctor_day_intervals(doctor_id, reserve_date)
+            for reserve_time in self.reserve_times:
+                start = to_minutes(reserve_time)
+                end = start + self.duration_minutes
+                if hours and not (hours[0] <= start and end <= hours[1]):
+                    continue
+                if any(busy_start < end and busy_end > start for busy_start, busy_end in busy):
+                    continue
+                self.db_manager.book_appointment_slot(
+                    None, doctor_id, reserve_date, reserve_time, self.duration_minutes,
+                    status=AppointmentStatus.RESERVED.value
+                )
+
+        with self.db_manager.db_config.connection() as conn:
+            held = conn.execute('''
+                SELECT a.appointment_date, a.start_minute, a.doctor_id, a.appointment_id,
+                       d.specialization
+                FROM appointments a
+                JOIN doctors d ON a.doctor_id = d.doctor_id
+                WHERE a.appointment_date = ? AND a.status = 'reserved'
+            ''', (reserve_date_str,)).fetchall()
+
+        with self._lock:
+            for specialization, pool in self.pools.items():
+                self.pools[specialization] = deque(entry for entry in pool if entry[0] != reserve_date)
+            entries = defaultdict(list)
+            for appointment_date, start_minute, doctor_id, appointment_id, specialization in held:
+                entries[specialization].append(
+                    (date.fromisoformat(appointment_date), start_minute, doctor_id, appointment_id)
+                )
+            for specialization, new_entries in entries.items():
+                self.pools[specialization] = deque(sorted(list(self.pools[specialization]) + new_entries))
+
+        self.logger.info(f"Emergency reserve holds {len(held)} slots on {reserve_date}")
+        return len(held)
+
+    def allocate(self, patient_id, specialization, now=None):
+        """Claim the earliest upcoming reserve slot of a specialization for a patient"""
+        now = now or datetime.now()
+        current = (now.date(), to_minutes(now.time()))
+
+        while True:
+            with self._lock:
+                # replenish() and release_expired() replace the deques, so look it up each time
+                pool = self.pools.get(specialization)
+                if not pool:
+                    break
+                reserve_date, start_minute, doctor_id, appointment_id = pool.popleft()
+            if (reserve_date, start_minute) < current:
+                continue  # already started; release_expired() frees it
+
+            with self.db_manager.db_config.transaction(immediate=True) as conn:
+                claimed = conn.execute('''
+                    UPDATE appointments
+                    SET patient_id = ?, status = 'emergency', updated_at = CURRENT_TIMESTAMP
+                    WHERE appointment_id = ? AND status = 'reserved'
+                ''', (patient_id, appointment_id)).rowcount
+            if claimed:
+                with self._lock:
+                    self.hits += 1
+                return BookingResult(
+                    appointment_id, BookingResult.BOOKED, "Emergency reserve slot allocated", []
+                )
+
+        with self._lock:
+            self.misses += 1
+        return BookingResult(
+            None, BookingResult.CONFLICT, f"No {specialization} emergency reserve available", []
+        )
+
+    def release_expired(self, now=None):
+        """Return unclaimed reserves starting within the release lead to regular booking"""
+        now = now or datetime.now()
+        today = now.date()
+        cutoff = to_minutes(now.time()) + self.release_lead_minutes
+
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            expired = [
+                (appointment_id, doctor_id, appointment_date)
+                for appointment_id, doctor_id, appointment_date, start_minute in conn.execute('''
+                    SELECT appointment_id, doctor_id, appointment_date, start_minute
+                    FROM appointments
+                    WHERE appointment_date <= ? AND status = 'reserved'
+                ''', (date_str(today),))
+                if appointment_date < date_str(today) or start_minute < cutoff
+            ]
+            conn.executemany(
+                "DELETE FROM appointments WHERE appointment_id = ? AND status = 'reserved'",
+                [(appointment_id,) for appointment_id, _, _ in expired]
+            )
+            for doctor_id in {doctor_id for _, doctor_id, _ in expired}:
+                self.db_manager.availability.refresh_days(conn, doctor_id, [
+                    appointment_date for _, expired_doctor, appointment_date in expired
+                    if expired_doctor == doctor_id
+                ])
+
+        released_ids = set()
+        for appointment_id, doctor_id, appointment_date in expired:
+            self.db_manager.interval_index.remove(doctor_id, appointment_date, appointment_id)
+            released_ids.add(appointment_id)
+        with self._lock:
+            for specialization, pool in self.pools.items():
+                self.pools[specialization] = deque(
+                    entry for entry in pool if entry[3] not in released_ids
+                )
+            self.released += len(expired)
+        return len(expired)
+
+    def metrics(self):
+        """Get reserve hit/miss counts, hit rate and slots currently held"""
+        with self._lock:
+            hits, misses, released = self.hits, self.misses, self.released
+            held = sum(len(pool) for pool in self.pools.values())
+        requests = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / requests * 100, 2) if requests else 0.0,
+            'released': released,
+            'held': held,
+        }
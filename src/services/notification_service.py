@@ -3,28 +3,23 @@ from src.utils.database_manager import DatabaseManager
 import logging
 
 class NotificationService:
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or DatabaseManager()
         self.logger = logging.getLogger(__name__)
     
     def send_appointment_reminders(self, days_before=1):
         """Send reminders for upcoming appointments"""
         target_date = date.today() + timedelta(days=days_before)
         
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT a.appointment_id, p.name as patient_name, p.email, p.phone,
-                   d.name as doctor_name, a.appointment_date, a.time_slot
-            FROM appointments a
-            JOIN patients p ON a.patient_id = p.patient_id
-            JOIN doctors d ON a.doctor_id = d.doctor_id
-            WHERE a.appointment_date = ? AND a.status = 'scheduled'
-        ''', (target_date,))
-        
-        upcoming_appointments = cursor.fetchall()
-        conn.close()
+        with self.db_manager.db_config.connection() as conn:
+            upcoming_appointments = conn.execute('''
+                SELECT a.appointment_id, p.name as patient_name, p.email, p.phone,
+                       d.name as doctor_name, a.appointment_date, a.time_slot
+                FROM appointments a
+                JOIN patients p ON a.patient_id = p.patient_id
+                JOIN doctors d ON a.doctor_id = d.doctor_id
+                WHERE a.appointment_date = ? AND a.status = 'scheduled'
+            ''', (target_date,)).fetchall()
         
         reminders_sent = 0
         for appointment in upcoming_appointments:
@@ -53,21 +48,18 @@ class NotificationService:
         if not report_date:
             report_date = date.today()
         
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT d.doctor_id, d.name as doctor_name, d.specialization,
-                   COUNT(a.appointment_id) as total_appointments,
-                   SUM(CASE WHEN a.status = 'completed' THEN 1 ELSE 0 END) as completed,
-                   SUM(CASE WHEN a.status = 'scheduled' THEN 1 ELSE 0 END) as scheduled
-            FROM doctors d
-            LEFT JOIN appointments a ON d.doctor_id = a.doctor_id AND a.appointment_date = ?
-            GROUP BY d.doctor_id, d.name, d.specialization
-            ORDER BY d.name
-        ''', (report_date,))
-        
-        doctor_reports = cursor.fetchall()
+        with self.db_manager.db_config.connection() as conn:
+            doctor_reports = conn.execute('''
+                SELECT d.doctor_id, d.name as doctor_name, d.specialization,
+                       COUNT(a.appointment_id) as total_appointments,
+                       SUM(CASE WHEN a.status = 'completed' THEN 1 ELSE 0 END) as completed,
+                       SUM(CASE WHEN a.status = 'scheduled' THEN 1 ELSE 0 END) as scheduled
+                FROM doctors d
+                LEFT JOIN appointments a ON d.doctor_id = a.doctor_id AND a.appointment_date = ?
+                    AND a.status != 'reserved'
+                GROUP BY d.doctor_id, d.name, d.specialization
+                ORDER BY d.name
+            ''', (report_date,)).fetchall()
         
         print(f"\n📊 DAILY APPOINTMENT REPORT - {report_date}")
         print("=" * 60)
@@ -78,24 +70,18 @@ class NotificationService:
             print(f"   📅 Total: {total} | ✅ Completed: {completed} | ⏰ Scheduled: {scheduled}")
             print("-" * 40)
         
-        conn.close()
         return doctor_reports
     
     def notify_emergency_booking(self, appointment_id):
         """Notify about emergency appointment booking"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT p.name, d.name, a.appointment_date, a.time_slot
-            FROM appointments a
-            JOIN patients p ON a.patient_id = p.patient_id
-            JOIN doctors d ON a.doctor_id = d.doctor_id
-            WHERE a.appointment_id = ?
-        ''', (appointment_id,))
-        
-        appointment = cursor.fetchone()
-        conn.close()
+        with self.db_manager.db_config.connection() as conn:
+            appointment = conn.execute('''
+                SELECT p.name, d.name, a.appointment_date, a.time_slot
+                FROM appointments a
+                JOIN patients p ON a.patient_id = p.patient_id
+                JOIN doctors d ON a.doctor_id = d.doctor_id
+                WHERE a.appointment_id = ?
+            ''', (appointment_id,)).fetchone()
         
         if appointment:
             patient_name, doctor_name, appointment_date, time_slot = appointment
@@ -1,147 +1,669 @@
 from datetime import datetime, time, date, timedelta
+import heapq
+import json
+import sqlite3
+from collections import defaultdict, namedtuple
+from functools import reduce
+from math import gcd
 from src.utils.database_manager import DatabaseManager
+from src.utils.slot_bitmap import day_bitmap, grid_bitmap, run_starts, iter_set_bits
+from src.utils.intervals import fit_starts
+from src.utils.doctor_calendar import DAY_NAMES, DoctorCalendar, weekday_number
+from src.utils.time_utils import MINUTES_PER_DAY, from_minutes, time_str, date_str
+from src.services.batch_scheduler import load_free_lists
 import logging
 
+# Shared time objects for every minute of the day, indexed by minute
+_MINUTE_TIMES = tuple(from_minutes(minute) for minute in range(MINUTES_PER_DAY))
+
+# A named weekly rota: {day name: (start, end)} hours and {day name: [(start, end)]} breaks
+ScheduleTemplate = namedtuple('ScheduleTemplate', 'name hours breaks')
+
+# One appointment displaced by leave; doctor_id is None when it had to be cancelled
+Reassignment = namedtuple(
+    'Reassignment',
+    'appointment_id patient_id original_date original_time doctor_id appointment_date time_slot'
+)
+
+
+class LeaveReport(namedtuple('LeaveReport', 'doctor_id start_date end_date leave_days reassignments')):
+    """Outcome of mark_leave_range(): leave days added and what happened to each appointment"""
+    __slots__ = ()
+    
+    @property
+    def reassigned(self):
+        return [entry for entry in self.reassignments if entry.doctor_id is not None]
+    
+    @property
+    def cancelled(self):
+        return [entry for entry in self.reassignments if entry.doctor_id is None]
+    
+    def summary(self):
+        """Printable reassignment report"""
+        lines = [
+            f"Leave for doctor {self.doctor_id}: {self.start_date} to {self.end_date} "
+            f"({self.leave_days} new days)",
+            f"Appointments affected: {len(self.reassignments)}, reassigned: {len(self.reassigned)}, "
+            f"cancelled: {len(self.cancelled)}",
+        ]
+        for entry in self.reassignments:
+            if entry.doctor_id is None:
+                target = "CANCELLED - no free slot found"
+            else:
+                target = f"doctor {entry.doctor_id} on {entry.appointment_date} at {entry.time_slot}"
+            lines.append(
+                f"  #{entry.appointment_id} patient {entry.patient_id} "
+                f"({entry.original_date} {entry.original_time}) -> {target}"
+            )
+        return "\n".join(lines)
+
+
 class ScheduleService:
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or DatabaseManager()
         self.logger = logging.getLogger(__name__)
     
-    def set_doctor_schedule(self, doctor_id, day_of_week, start_time, end_time):
-        """Set doctor's weekly schedule"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        # Remove existing schedule for this day
-        cursor.execute('''
-            DELETE FROM doctor_schedules 
-            WHERE doctor_id = ? AND day_of_week = ?
-        ''', (doctor_id, day_of_week))
-        
-        # Add new schedule
-        cursor.execute('''
-            INSERT INTO doctor_schedules (doctor_id, day_of_week, start_time, end_time)
-            VALUES (?, ?, ?, ?)
-        ''', (doctor_id, day_of_week, start_time, end_time))
-        
-        conn.commit()
-        conn.close()
+    def set_doctor_schedule(self, doctor_id, day_of_week, start_time, end_time, effective_from=None):
+        """Set doctor's weekly schedule for one day.
+        
+        Writes the schedule version in effect today (the base one until a
+        template has been applied), or the dated version starting on
+        effective_from, which must exist. A later dated version still
+        takes over from its own date; a warning is logged when one exists
+        and effective_from was not given. Day names are accepted in any
+        case; anything else raises ValueError.
+        """
+        day_of_week = self._day_name(day_of_week)
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            version = self._schedule_version(conn, doctor_id, effective_from)
+            
+            # Remove existing schedule for this day, including rows stored in another case
+            conn.execute('''
+                DELETE FROM doctor_schedules 
+                WHERE doctor_id = ? AND day_of_week = ? COLLATE NOCASE AND effective_from IS ?
+            ''', (doctor_id, day_of_week, version))
+            
+            # Add new schedule
+            conn.execute('''
+                INSERT INTO doctor_schedules (doctor_id, day_of_week, start_time, end_time, effective_from)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (doctor_id, day_of_week, time_str(start_time), time_str(end_time), version))
+            self.db_manager.availability.refresh_weekday(conn, doctor_id, DAY_NAMES.index(day_of_week))
+        self.db_manager.calendars.invalidate(doctor_id)
+        
         self.logger.info(f"Schedule set for doctor {doctor_id} on {day_of_week}")
         return True
     
-    def add_doctor_break(self, doctor_id, day_of_week, break_start, break_end):
-        """Add break time to doctor's schedule"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
+    def add_doctor_break(self, doctor_id, day_of_week, break_start, break_end, effective_from=None):
+        """Add break time to doctor's schedule; versions and day names as in set_doctor_schedule()"""
+        day_of_week = self._day_name(day_of_week)
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            version = self._schedule_version(conn, doctor_id, effective_from)
+            conn.execute('''
+                INSERT INTO doctor_breaks (doctor_id, day_of_week, break_start, break_end, effective_from)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (doctor_id, day_of_week, time_str(break_start), time_str(break_end), version))
+            self.db_manager.availability.refresh_weekday(conn, doctor_id, DAY_NAMES.index(day_of_week))
+        self.db_manager.calendars.invalidate(doctor_id)
         
-        cursor.execute('''
-            INSERT INTO doctor_breaks (doctor_id, day_of_week, break_start, break_end)
-            VALUES (?, ?, ?, ?)
-        ''', (doctor_id, day_of_week, break_start, break_end))
-        
-        conn.commit()
-        conn.close()
         self.logger.info(f"Break added for doctor {doctor_id} on {day_of_week}")
         return True
     
+    @staticmethod
+    def _day_name(day_of_week):
+        """Get the stored spelling of a day name given in any case"""
+        weekday = weekday_number(day_of_week)
+        if weekday is None:
+            raise ValueError(f"Unknown day of week: {day_of_week!r}")
+        return DAY_NAMES[weekday]
+    
+    def _schedule_version(self, conn, doctor_id, effective_from):
+        """Get the effective_from a weekly schedule write targets (None for the base version)"""
+        if effective_from is not None:
+            version = date_str(effective_from)
+            exists = conn.execute('''
+                SELECT 1 FROM doctor_schedules WHERE doctor_id = ? AND effective_from = ? LIMIT 1
+            ''', (doctor_id, version)).fetchone()
+            if exists is None:
+                raise ValueError(f"Doctor {doctor_id} has no schedule version effective from {version}")
+            return version
+        
+        today = date_str(date.today())
+        current, newer = conn.execute('''
+            SELECT MAX(CASE WHEN effective_from <= ? THEN effective_from END),
+                   MIN(CASE WHEN effective_from > ? THEN effective_from END)
+            FROM doctor_schedules WHERE doctor_id = ?
+        ''', (today, today, doctor_id)).fetchone()
+        if newer is not None:
+            self.logger.warning(
+                f"Doctor {doctor_id} has a schedule version effective from {newer}; "
+                f"this change applies until then"
+            )
+        return current
+    
+    def save_schedule_template(self, name, hours, breaks=None):
+        """Create or replace a named weekly schedule template; returns its ID.
+        
+        Applying a template copies its rows, so replacing it later does not
+        change schedules it was already applied to.
+        """
+        breaks = breaks or {}
+        unknown = (set(hours) | set(breaks)) - set(DAY_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown day names: {', '.join(sorted(unknown))}")
+        if not hours:
+            raise ValueError("A schedule template needs working hours on at least one day")
+        
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            row = conn.execute(
+                'SELECT template_id FROM schedule_templates WHERE name = ?', (name,)
+            ).fetchone()
+            if row is None:
+                template_id = conn.execute(
+                    'INSERT INTO schedule_templates (name) VALUES (?)', (name,)
+                ).lastrowid
+            else:
+                template_id = row[0]
+                conn.execute('DELETE FROM schedule_template_hours WHERE template_id = ?', (template_id,))
+                conn.execute('DELETE FROM schedule_template_breaks WHERE template_id = ?', (template_id,))
+            
+            conn.executemany('''
+                INSERT INTO schedule_template_hours (template_id, day_of_week, start_time, end_time)
+                VALUES (?, ?, ?, ?)
+            ''', [(template_id, day, time_str(start), time_str(end))
+                  for day, (start, end) in hours.items()])
+            conn.executemany('''
+                INSERT INTO schedule_template_breaks (template_id, day_of_week, break_start, break_end)
+                VALUES (?, ?, ?, ?)
+            ''', [(template_id, day, time_str(start), time_str(end))
+                  for day, spans in breaks.items() for start, end in spans])
+        
+        self.logger.info(f"Schedule template '{name}' saved")
+        return template_id
+    
+    def get_schedule_template(self, name):
+        """Get a ScheduleTemplate by name with 'HH:MM' times, or None"""
+        with self.db_manager.db_config.connection() as conn:
+            row = conn.execute(
+                'SELECT template_id FROM schedule_templates WHERE name = ?', (name,)
+            ).fetchone()
+            if row is None:
+                return None
+            hours = {
+                day: (start, end)
+                for day, start, end in conn.execute('''
+                    SELECT day_of_week, start_time, end_time FROM schedule_template_hours
+                    WHERE template_id = ?
+                ''', (row[0],))
+            }
+            breaks = defaultdict(list)
+            for day, start, end in conn.execute('''
+                SELECT day_of_week, break_start, break_end FROM schedule_template_breaks
+                WHERE template_id = ?
+                ORDER BY day_of_week, break_start
+            ''', (row[0],)):
+                breaks[day].append((start, end))
+        return ScheduleTemplate(name, hours, dict(breaks))
+    
+    def apply_template(self, template, doctor_ids, effective_from):
+        """Give many doctors a template's weekly schedule from effective_from on.
+        
+        Every schedule and break row is written with executemany inside one
+        BEGIN IMMEDIATE transaction as a dated version: earlier dates keep
+        the schedule they had, and later versions still take over on their
+        own dates. Applying on a date that already has a version replaces
+        it. Returns the number of doctors updated.
+        """
+        doctor_ids = list(doctor_ids)
+        effective_from_str = date_str(effective_from)
+        
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            row = conn.execute(
+                'SELECT template_id FROM schedule_templates WHERE name = ?', (template,)
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Unknown schedule template: {template}")
+            hours = conn.execute('''
+                SELECT day_of_week, start_time, end_time FROM schedule_template_hours
+                WHERE template_id = ?
+            ''', (row[0],)).fetchall()
+            breaks = conn.execute('''
+                SELECT day_of_week, break_start, break_end FROM schedule_template_breaks
+                WHERE template_id = ?
+            ''', (row[0],)).fetchall()
+            
+            versions = [(doctor_id, effective_from_str) for doctor_id in doctor_ids]
+            conn.executemany(
+                'DELETE FROM doctor_schedules WHERE doctor_id = ? AND effective_from = ?', versions
+            )
+            conn.executemany(
+                'DELETE FROM doctor_breaks WHERE doctor_id = ? AND effective_from = ?', versions
+            )
+            conn.executemany('''
+                INSERT INTO doctor_schedules (doctor_id, day_of_week, start_time, end_time, effective_from)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(doctor_id, day, start, end, effective_from_str)
+                  for doctor_id in doctor_ids for day, start, end in hours])
+            conn.executemany('''
+                INSERT INTO doctor_breaks (doctor_id, day_of_week, break_start, break_end, effective_from)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(doctor_id, day, start, end, effective_from_str)
+                  for doctor_id in doctor_ids for day, start, end in breaks])
+            
+            self.db_manager.availability.refresh_from(
+                conn, DoctorCalendar.load_many(conn, doctor_ids), effective_from
+            )
+        
+        for doctor_id in doctor_ids:
+            self.db_manager.calendars.invalidate(doctor_id)
+        self.logger.info(
+            f"Schedule template '{template}' applied to {len(doctor_ids)} doctors "
+            f"from {effective_from_str}"
+        )
+        return len(doctor_ids)
+    
     def mark_doctor_leave(self, doctor_id, leave_date, reason=""):
         """Mark doctor as on leave"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                INSERT INTO doctor_leave (doctor_id, leave_date, reason)
-                VALUES (?, ?, ?)
-            ''', (doctor_id, leave_date, reason))
+            with self.db_manager.db_config.transaction(immediate=True) as conn:
+                conn.execute('''
+                    INSERT INTO doctor_leave (doctor_id, leave_date, reason)
+                    VALUES (?, ?, ?)
+                ''', (doctor_id, date_str(leave_date), reason))
+                self.db_manager.availability.refresh_days(
+                    conn, doctor_id, [leave_date], DoctorCalendar.load(conn, doctor_id)
+                )
+            self.db_manager.calendars.invalidate(doctor_id)
             
-            conn.commit()
             self.logger.info(f"Leave marked for doctor {doctor_id} on {leave_date}")
             return True
             
         except sqlite3.IntegrityError:
             self.logger.warning(f"Leave already exists for doctor {doctor_id} on {leave_date}")
             return False
-        finally:
-            conn.close()
     
-    def get_doctor_availability(self, doctor_id, target_date):
-        """Get available time slots for a doctor on specific date"""
-        day_of_week = target_date.strftime('%A')
+    def mark_leave_range(self, doctor_id, start_date, end_date, reason="", search_days=14,
+                         prefer_peers=False, progress=None):
+        """Mark a doctor on leave for [start_date, end_date] and rebook the displaced appointments.
         
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
+        In one BEGIN IMMEDIATE transaction: the leave days are inserted with
+        executemany, every active appointment in the range is found with
+        one query, and each is moved to the same doctor's next free slot
+        after the leave (nearest its original time, within search_days) or,
+        failing that, to the peer of the same specialization free closest
+        to its original time on its original date. prefer_peers reverses
+        that order. Appointments that fit nowhere are cancelled and listed
+        in the report; unclaimed emergency reserves are dropped.
+        progress(done, total, reassignment) is called as each one is placed.
+        Returns a LeaveReport.
+        """
+        leave_days = [start_date + timedelta(days=offset)
+                      for offset in range((end_date - start_date).days + 1)]
+        later_days = {date_str(end_date + timedelta(days=offset)) for offset in range(1, search_days + 1)}
         
-        # Get working hours
-        cursor.execute('''
-            SELECT start_time, end_time FROM doctor_schedules 
-            WHERE doctor_id = ? AND day_of_week = ?
-        ''', (doctor_id, day_of_week))
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            added = conn.executemany('''
+                INSERT OR IGNORE INTO doctor_leave (doctor_id, leave_date, reason)
+                VALUES (?, ?, ?)
+            ''', [(doctor_id, date_str(day), reason) for day in leave_days]).rowcount
+            
+            affected = conn.execute('''
+                SELECT appointment_id, patient_id, appointment_date, start_minute, end_minute, status
+                FROM appointments
+                WHERE doctor_id = ? AND appointment_date BETWEEN ? AND ?
+                AND status IN ('scheduled', 'emergency', 'reserved')
+                ORDER BY appointment_date, start_minute
+            ''', (doctor_id, date_str(start_date), date_str(end_date))).fetchall()
+            reserved = [row for row in affected if row[5] == 'reserved']
+            affected = [row for row in affected if row[5] != 'reserved']
+            conn.executemany(
+                "DELETE FROM appointments WHERE appointment_id = ? AND status = 'reserved'",
+                [(row[0],) for row in reserved]
+            )
+            
+            doctor = self.db_manager.get_doctor(doctor_id)
+            peers = [
+                peer.doctor_id
+                for peer in self.db_manager.get_doctors_by_specialization(doctor.specialization)
+                if peer.doctor_id != doctor_id
+            ] if doctor else []
+            affected_days = {row[2] for row in affected}
+            days_by_doctor = {peer_id: affected_days for peer_id in peers}
+            days_by_doctor[doctor_id] = later_days
+            free_lists = load_free_lists(self.db_manager, conn, days_by_doctor)
+            
+            calendars = self.db_manager.calendars.get_many([doctor_id] + peers)
+            
+            reassignments, moves = [], []
+            for done, (appointment_id, patient_id, day, start, end, _) in enumerate(affected, 1):
+                placement = self._place_displaced(
+                    free_lists, calendars, doctor_id, peers, sorted(later_days), day, start,
+                    end - start, prefer_peers
+                )
+                if placement is None:
+                    entry = Reassignment(appointment_id, patient_id, day, from_minutes(start),
+                                         None, None, None)
+                else:
+                    new_doctor, new_day, new_start = placement
+                    free_lists[(new_doctor, new_day)].take(new_start, new_start + end - start)
+                    moves.append((appointment_id, day, new_doctor, new_day, new_start, end - start))
+                    entry = Reassignment(appointment_id, patient_id, day, from_minutes(start),
+                                         new_doctor, new_day, from_minutes(new_start))
+                reassignments.append(entry)
+                if progress:
+                    progress(done, len(affected), entry)
+            
+            conn.executemany('''
+                UPDATE appointments
+                SET doctor_id = ?, appointment_date = ?, time_slot = ?, start_minute = ?,
+                    end_minute = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE appointment_id = ?
+            ''', [(new_doctor, new_day, time_str(new_start), new_start, new_start + duration,
+                   appointment_id)
+                  for appointment_id, _, new_doctor, new_day, new_start, duration in moves])
+            conn.executemany('''
+                UPDATE appointments SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP
+                WHERE appointment_id = ?
+            ''', [(entry.appointment_id,) for entry in reassignments if entry.doctor_id is None])
+            
+            availability = self.db_manager.availability
+            availability.refresh_days(conn, doctor_id, leave_days, DoctorCalendar.load(conn, doctor_id))
+            targets = defaultdict(set)
+            for _, _, new_doctor, new_day, _, _ in moves:
+                targets[new_doctor].add(new_day)
+            for target_doctor, days in targets.items():
+                availability.refresh_days(conn, target_doctor, days)
+        
+        self.db_manager.calendars.invalidate(doctor_id)
+        index = self.db_manager.interval_index
+        for appointment_id, _, day, start, end, _ in reserved + affected:
+            index.remove(doctor_id, day, appointment_id)
+        for appointment_id, _, new_doctor, new_day, new_start, duration in moves:
+            index.add(new_doctor, new_day, appointment_id, new_start, new_start + duration)
         
-        schedule = cursor.fetchone()
-        if not schedule:
-            return []  # No schedule for this day
+        report = LeaveReport(doctor_id, start_date, end_date, added, reassignments)
+        self.logger.info(
+            f"Leave marked for doctor {doctor_id} from {start_date} to {end_date}: "
+            f"{len(report.reassigned)} reassigned, {len(report.cancelled)} cancelled"
+        )
+        return report
+    
+    @staticmethod
+    def _place_displaced(free_lists, calendars, doctor_id, peers, later_days, day, start, duration,
+                         prefer_peers):
+        """Get (doctor_id, date_str, start_minute) for a displaced appointment, or None"""
+        def fit_on(target_id, target_day):
+            free = free_lists.get((target_id, target_day))
+            if free is None:
+                return None
+            calendar = calendars[target_id]
+            return free.nearest_fit(start, duration, 0, MINUTES_PER_DAY, calendar.slot_minutes,
+                                    calendar.grid_anchor(date.fromisoformat(target_day)))
         
-        start_time, end_time = schedule
+        def same_doctor():
+            for later_day in later_days:
+                fit = fit_on(doctor_id, later_day)
+                if fit is not None:
+                    return doctor_id, later_day, fit
+            return None
         
-        # Get breaks
-        cursor.execute('''
-            SELECT break_start, break_end FROM doctor_breaks 
-            WHERE doctor_id = ? AND day_of_week = ?
-        ''', (doctor_id, day_of_week))
+        def peer():
+            best = None
+            for peer_id in peers:
+                fit = fit_on(peer_id, day)
+                if fit is not None and (best is None or abs(fit - start) < abs(best[2] - start)):
+                    best = (peer_id, day, fit)
+            return best
+        
+        for strategy in ((peer, same_doctor) if prefer_peers else (same_doctor, peer)):
+            placement = strategy()
+            if placement is not None:
+                return placement
+        return None
+    
+    def set_date_override(self, doctor_id, override_date, start_time=None, end_time=None, reason=""):
+        """Replace a doctor's weekly hours on one date; no hours closes the day"""
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO doctor_schedule_overrides
+                    (doctor_id, override_date, start_time, end_time, reason)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (doctor_id, date_str(override_date),
+                  time_str(start_time) if start_time else None,
+                  time_str(end_time) if end_time else None, reason))
+            self.db_manager.availability.refresh_days(
+                conn, doctor_id, [override_date], DoctorCalendar.load(conn, doctor_id)
+            )
+        self.db_manager.calendars.invalidate(doctor_id)
+        
+        self.logger.info(f"Schedule override set for doctor {doctor_id} on {override_date}")
+        return True
+    
+    def set_slot_granularity(self, doctor_id, slot_minutes):
+        """Set the grid a doctor's appointment start times are aligned to"""
+        if slot_minutes <= 0:
+            raise ValueError("slot_minutes must be positive")
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            conn.execute(
+                'UPDATE doctors SET slot_minutes = ? WHERE doctor_id = ?', (slot_minutes, doctor_id)
+            )
+        self.db_manager.calendars.invalidate(doctor_id)
         
-        breaks = cursor.fetchall()
+        self.logger.info(f"Slot granularity for doctor {doctor_id} set to {slot_minutes} minutes")
+        return True
+    
+    def get_doctor_availability(self, doctor_id, target_date, duration_minutes=None, visit_type=None):
+        """Get available start times for a doctor on specific date.
         
-        # Get existing appointments
-        cursor.execute('''
-            SELECT time_slot, duration_minutes FROM appointments 
-            WHERE doctor_id = ? AND appointment_date = ? AND status != 'cancelled'
-            ORDER BY time_slot
-        ''', (doctor_id, target_date))
+        Starts are on the doctor's slot grid and leave room for a visit of
+        duration_minutes (or visit_type's duration; the grid size by default).
+        Dates inside the materialized horizon are answered from the stored
+        free intervals; other dates from the doctor's compiled calendar.
+        Both reflect leave and date overrides.
+        """
+        calendar = self.db_manager.calendars.get(doctor_id)
+        duration_minutes = self._visit_duration(calendar, duration_minutes, visit_type)
+        hours = calendar.working_hours(target_date)
         
-        appointments = cursor.fetchall()
-        conn.close()
+        with self.db_manager.db_config.connection() as conn:
+            # Inside the materialized horizon the free intervals are stored
+            stored = self.db_manager.availability.free_intervals(conn, doctor_id, target_date)
+            if stored is not None:
+                return [
+                    _MINUTE_TIMES[start]
+                    for start in fit_starts(stored, duration_minutes, calendar.slot_minutes,
+                                            calendar.grid_anchor(target_date))
+                ]
+            
+            if hours is None:
+                return []  # Not working on this date
+            start_minute, end_minute = hours
+            
+            # Get existing appointments overlapping working hours
+            appointments = conn.execute('''
+                SELECT start_minute, end_minute FROM appointments 
+                WHERE doctor_id = ? AND appointment_date = ? AND status != 'cancelled'
+                AND start_minute < ? AND end_minute > ?
+                ORDER BY start_minute
+            ''', (doctor_id, date_str(target_date), end_minute, start_minute)).fetchall()
         
         # Generate available slots
         return self._generate_available_slots(
-            start_time, end_time, breaks, appointments, target_date
+            start_minute, end_minute, calendar.breaks_on(target_date), appointments,
+            duration_minutes, calendar.slot_minutes
         )
     
-    def _generate_available_slots(self, start_time, end_time, breaks, appointments, target_date):
-        """Generate available time slots considering breaks and existing appointments"""
-        slot_duration = 30  # minutes
-        current_time = start_time
-        available_slots = []
-        
-        while current_time < end_time:
-            slot_end = (datetime.combine(target_date, current_time) + 
-                       timedelta(minutes=slot_duration)).time()
-            
-            # Check if slot overlaps with any break
-            break_conflict = False
-            for break_start, break_end in breaks:
-                if not (slot_end <= break_start or current_time >= break_end):
-                    break_conflict = True
-                    break
-            
-            # Check if slot overlaps with any appointment
-            appointment_conflict = False
-            for app_time, app_duration in appointments:
-                app_end = (datetime.combine(target_date, app_time) + 
-                          timedelta(minutes=app_duration)).time()
-                if not (slot_end <= app_time or current_time >= app_end):
-                    appointment_conflict = True
-                    break
-            
-            # If no conflicts, add to available slots
-            if not break_conflict and not appointment_conflict and slot_end <= end_time:
-                available_slots.append(current_time)
-            
-            # Move to next slot
-            current_time = (datetime.combine(target_date, current_time) + 
-                          timedelta(minutes=slot_duration)).time()
-        
-        return available_slots
+    def find_openings(self, doctor_id, start_date=None, horizon_days=60, duration_minutes=None,
+                      visit_type=None):
+        """Yield (date, time) free slots for a doctor across a range of days.
+        
+        The doctor's compiled calendar (hours, breaks, leave and overrides)
+        comes from the calendar cache and all active appointments in the
+        range are fetched with one query; days are then expanded lazily, so callers can stop after the
+        first few openings, e.g. with itertools.islice.
+        """
+        start_date = start_date or date.today()
+        end_date = start_date + timedelta(days=horizon_days - 1)
+        
+        calendar = self.db_manager.calendars.get(doctor_id)
+        duration_minutes = self._visit_duration(calendar, duration_minutes, visit_type)
+        with self.db_manager.db_config.connection() as conn:
+            booked = {}
+            for appointment_date, start_minute, end_minute in conn.execute('''
+                SELECT appointment_date, start_minute, end_minute FROM appointments
+                WHERE doctor_id = ? AND appointment_date BETWEEN ? AND ?
+                AND status != 'cancelled'
+                ORDER BY appointment_date, start_minute
+            ''', (doctor_id, date_str(start_date), date_str(end_date))):
+                booked.setdefault(appointment_date, []).append((start_minute, end_minute))
+        
+        for offset in range(horizon_days):
+            day = start_date + timedelta(days=offset)
+            hours = calendar.working_hours(day)
+            if hours is None:
+                continue
+            
+            for slot in self.iter_available_slots(
+                hours[0], hours[1], calendar.breaks_on(day), booked.get(date_str(day), ()),
+                duration_minutes, calendar.slot_minutes
+            ):
+                yield day, slot
+    
+    def get_availability_calendar(self, doctor_ids, start_date, end_date, duration_minutes=None):
+        """Yield (doctor_id, date, slots) for every working day of every doctor in a date range.
+        
+        Calendars come from the calendar cache, with any missing ones bulk
+        loaded together, and all active appointments for the whole set are
+        fetched with one query, so the number of statements is fixed
+        whatever the number of doctors or days. Days a doctor does not work
+        (leave, closed overrides, no hours) are skipped; slots are computed
+        lazily as the caller iterates.
+        """
+        doctor_ids = list(doctor_ids)
+        calendars = self.db_manager.calendars.get_many(doctor_ids)
+        
+        booked = defaultdict(list)
+        with self.db_manager.db_config.connection() as conn:
+            for doctor_id, appointment_date, start_minute, end_minute in conn.execute('''
+                SELECT doctor_id, appointment_date, start_minute, end_minute FROM appointments
+                WHERE doctor_id IN (SELECT value FROM json_each(?))
+                AND appointment_date BETWEEN ? AND ? AND status != 'cancelled'
+                ORDER BY doctor_id, appointment_date, start_minute
+            ''', (json.dumps(doctor_ids), date_str(start_date), date_str(end_date))):
+                booked[(doctor_id, appointment_date)].append((start_minute, end_minute))
+        
+        days = [start_date + timedelta(days=offset)
+                for offset in range((end_date - start_date).days + 1)]
+        for doctor_id in doctor_ids:
+            calendar = calendars[doctor_id]
+            for day in days:
+                hours = calendar.working_hours(day)
+                if hours is None:
+                    continue
+                yield doctor_id, day, self._generate_available_slots(
+                    hours[0], hours[1], calendar.breaks_on(day),
+                    booked.get((doctor_id, date_str(day)), ()),
+                    duration_minutes or calendar.slot_minutes, calendar.slot_minutes
+                )
+    
+    def find_joint_slots(self, doctor_ids, date_range, duration_minutes=30, limit=None):
+        """Get (date, time) starts where every listed doctor is free for duration_minutes.
+        
+        date_range is an inclusive (start_date, end_date) pair. Each
+        doctor-day becomes an integer bitmap at a unit dividing every
+        doctor's slot size and grid anchor; the doctors' bitmaps are ANDed,
+        the starts of runs long enough for the visit are read off the
+        result and only starts on every doctor's own grid are kept. As in
+        get_doctor_availability(), doctors without working hours on a date
+        are not available. Bookings are fetched with one range query per
+        doctor.
+        """
+        start_date, end_date = date_range
+        days = [start_date + timedelta(days=offset)
+                for offset in range((end_date - start_date).days + 1)]
+        cached = self.db_manager.calendars.get_many(doctor_ids)
+        calendars = [cached[doctor_id] for doctor_id in doctor_ids]
+        if not days or not calendars:
+            return []
+        
+        booked = defaultdict(list)
+        with self.db_manager.db_config.connection() as conn:
+            for doctor_id in doctor_ids:
+                for appointment_date, start_minute, end_minute in conn.execute('''
+                    SELECT appointment_date, start_minute, end_minute FROM appointments
+                    WHERE doctor_id = ? AND appointment_date BETWEEN ? AND ?
+                    AND status != 'cancelled'
+                ''', (doctor_id, date_str(start_date), date_str(end_date))):
+                    booked[(doctor_id, appointment_date)].append((start_minute, end_minute))
+        
+        slots = []
+        for day in days:
+            hours = [calendar.working_hours(day) for calendar in calendars]
+            if None in hours:
+                continue
+            grids = [(calendar.grid_anchor(day), calendar.slot_minutes) for calendar in calendars]
+            unit = reduce(gcd, [value for grid in grids for value in grid])
+            
+            joint = starts = -1
+            for doctor_id, calendar, doctor_hours, (anchor, step) in zip(
+                    doctor_ids, calendars, hours, grids):
+                busy = calendar.breaks_on(day) + booked.get((doctor_id, date_str(day)), [])
+                joint &= day_bitmap(doctor_hours, busy, unit)
+                starts &= grid_bitmap(anchor, step, unit)
+            starts &= run_starts(joint, -(-duration_minutes // unit))
+            
+            for index in iter_set_bits(starts):
+                slots.append((day, from_minutes(index * unit)))
+                if limit is not None and len(slots) >= limit:
+                    return slots
+        return slots
+    
+    def _visit_duration(self, calendar, duration_minutes, visit_type):
+        """Resolve a visit length: visit_type, then duration_minutes, then the doctor's grid"""
+        if visit_type is not None:
+            return self.db_manager.get_visit_duration(visit_type)
+        return duration_minutes or calendar.slot_minutes
+    
+    def iter_available_slots(self, start_minute, end_minute, breaks, appointments,
+                             duration_minutes=30, slot_minutes=None):
+        """Yield available start times considering breaks and existing appointments.
+        
+        All bounds are minutes after midnight; breaks and appointments are
+        (start, end) pairs, each sorted by start. Starts lie on the
+        slot_minutes grid (anchored at start_minute, defaulting to
+        duration_minutes) and leave room for duration_minutes before the
+        next busy interval. One sweep over both busy lists runs in
+        O(slots + busy).
+        """
+        step = slot_minutes or duration_minutes
+        current = start_minute
+        
+        for busy_start, busy_end in heapq.merge(breaks, appointments):
+            if busy_end <= current:
+                continue
+            
+            # Emit grid starts that finish before this busy interval begins
+            limit = min(busy_start, end_minute)
+            while current + duration_minutes <= limit:
+                yield _MINUTE_TIMES[current]
+                current += step
+            if busy_start >= end_minute:
+                return
+            
+            # Jump to the first grid start at or after the busy interval
+            if busy_end > current:
+                current += -(-(busy_end - current) // step) * step
+        
+        while current + duration_minutes <= end_minute:
+            yield _MINUTE_TIMES[current]
+            current += step
+    
+    def _generate_available_slots(self, start_minute, end_minute, breaks, appointments,
+                                  duration_minutes=30, slot_minutes=None):
+        """Get available time slots as a list; see iter_available_slots()"""
+        return list(self.iter_available_slots(
+            start_minute, end_minute, breaks, appointments, duration_minutes, slot_minutes
+        ))
     
     def get_daily_schedule(self, doctor_id, schedule_date):
         """Get daily schedule for a doctor"""
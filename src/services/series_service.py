@@ -0,0 +1,234 @@
+from collections import namedtuple, defaultdict
+from datetime import timedelta
+from src.utils.database_manager import DatabaseManager, BookingResult
+from src.utils.time_utils import to_minutes, time_str, date_str
+from src.utils.row_mapping import parse_date
+import logging
+
+
+class RecurrenceRule(namedtuple('RecurrenceRule', 'start_date count until interval_days',
+                                defaults=(None, None, 7))):
+    """Every interval_days from start_date, for count occurrences or up to until"""
+    __slots__ = ()
+
+    def dates(self):
+        """Get the occurrence dates in order"""
+        if self.interval_days < 1:
+            raise ValueError("interval_days must be at least 1")
+        if self.count is None and self.until is None:
+            raise ValueError("A recurrence needs a count or an until date")
+
+        dates = []
+        current = self.start_date
+        while ((self.count is None or len(dates) < self.count)
+               and (self.until is None or current <= self.until)):
+            dates.append(current)
+            current += timedelta(days=self.interval_days)
+        return dates
+
+
+class SeriesResult(namedtuple('SeriesResult', 'series_id status message appointment_ids conflicts')):
+    """Outcome of booking or moving a series.
+
+    conflicts lists (date, appointment_ids) for each occurrence that could
+    not be placed; an empty ID list means the doctor does not work at that
+    time that day (day off, outside working hours or during a break).
+    """
+    __slots__ = ()
+
+    @property
+    def booked(self):
+        return self.status == BookingResult.BOOKED
+
+
+class SeriesService:
+    """Books, cancels and moves recurring appointment series.
+
+    All occurrences of a series are checked against existing bookings with
+    one range query for the doctor and inserted with executemany inside a
+    single BEGIN IMMEDIATE transaction, so a series is either booked whole
+    or (with all_or_nothing=False) booked on its free dates only, with the
+    blocked occurrences reported.
+    """
+
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or DatabaseManager()
+        self.logger = logging.getLogger(__name__)
+
+    def book_series(self, patient_id, doctor_id, rule, time_slot, duration_minutes=30,
+                    all_or_nothing=True):
+        """Book every occurrence of a RecurrenceRule at time_slot; returns a SeriesResult"""
+        occurrences = rule.dates()
+        if not occurrences:
+            return SeriesResult(None, BookingResult.ERROR, "Recurrence has no occurrences", [], [])
+        start_minute = to_minutes(time_slot)
+        end_minute = start_minute + duration_minutes
+
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            conflicts = self._find_series_conflicts(
+                conn, doctor_id, occurrences, start_minute, end_minute
+            )
+            if conflicts and all_or_nothing:
+                return SeriesResult(
+                    None, BookingResult.CONFLICT,
+                    f"{len(conflicts)} of {len(occurrences)} occurrences conflict", [], conflicts
+                )
+            free_dates = [day for day in occurrences if day not in dict(conflicts)]
+            if not free_dates:
+                return SeriesResult(None, BookingResult.CONFLICT, "Every occurrence conflicts",
+                                    [], conflicts)
+
+            series_id = conn.execute('''
+                INSERT INTO appointment_series (patient_id, doctor_id, start_date, interval_days,
+                                                occurrences, time_slot, duration_minutes)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (patient_id, doctor_id, date_str(rule.start_date), rule.interval_days,
+                  len(occurrences), time_str(time_slot), duration_minutes)).lastrowid
+            appointment_ids = self.db_manager._insert_appointments(conn, [
+                (patient_id, doctor_id, date_str(day), time_str(time_slot), duration_minutes,
+                 start_minute, end_minute)
+                for day in free_dates
+            ], series_id=series_id)
+
+        for day, appointment_id in zip(free_dates, appointment_ids):
+            self.db_manager.interval_index.add(
+                doctor_id, date_str(day), appointment_id, start_minute, end_minute
+            )
+        self.logger.info(f"Series {series_id} booked: {len(appointment_ids)} appointments")
+        return SeriesResult(
+            series_id, BookingResult.BOOKED,
+            f"Booked {len(appointment_ids)} of {len(occurrences)} occurrences",
+            appointment_ids, conflicts
+        )
+
+    def get_series_appointments(self, series_id):
+        """Get the active appointments of a series in date order"""
+        with self.db_manager.db_config.connection() as conn:
+            return self.db_manager.appointment_rows.fetchall(conn.execute('''
+                SELECT appointment_id, patient_id, doctor_id, appointment_date, time_slot,
+                       duration_minutes, status, start_minute, end_minute, series_id
+                FROM appointments
+                WHERE series_id = ? AND status != 'cancelled'
+                ORDER BY appointment_date
+            ''', (series_id,)))
+
+    def cancel_series(self, series_id, from_date=None):
+        """Cancel the scheduled appointments of a series, optionally from a date on"""
+        from_date_str = date_str(from_date) if from_date else '0000-01-01'
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            cancelled = conn.execute('''
+                SELECT appointment_id, doctor_id, appointment_date FROM appointments
+                WHERE series_id = ? AND appointment_date >= ? AND status = 'scheduled'
+            ''', (series_id, from_date_str)).fetchall()
+            conn.executemany('''
+                UPDATE appointments SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP
+                WHERE appointment_id = ?
+            ''', [(appointment_id,) for appointment_id, _, _ in cancelled])
+            for doctor_id in {doctor_id for _, doctor_id, _ in cancelled}:
+                self.db_manager.availability.refresh_days(conn, doctor_id, [
+                    appointment_date for _, cancelled_doctor, appointment_date in cancelled
+                    if cancelled_doctor == doctor_id
+                ])
+
+        for appointment_id, doctor_id, appointment_date in cancelled:
+            self.db_manager.interval_index.remove(doctor_id, appointment_date, appointment_id)
+        self.logger.info(f"Series {series_id} cancelled: {len(cancelled)} appointments")
+        return len(cancelled)
+
+    def move_series(self, series_id, time_slot=None, shift_days=0, from_date=None):
+        """Move the scheduled appointments of a series to a new time and/or by shift_days.
+
+        The move is all-or-nothing: if any moved occurrence would conflict
+        with another booking or fall outside the doctor's working hours,
+        nothing changes and the conflicts are reported.
+        """
+        from_date_str = date_str(from_date) if from_date else '0000-01-01'
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            rows = conn.execute('''
+                SELECT appointment_id, doctor_id, appointment_date, time_slot, duration_minutes
+                FROM appointments
+                WHERE series_id = ? AND appointment_date >= ? AND status = 'scheduled'
+                ORDER BY appointment_date
+            ''', (series_id, from_date_str)).fetchall()
+            if not rows:
+                return SeriesResult(series_id, BookingResult.ERROR, "No scheduled appointments to move",
+                                    [], [])
+
+            doctor_id, duration_minutes = rows[0][1], rows[0][4]
+            new_time = time_str(time_slot) if time_slot else rows[0][3]
+            start_minute = to_minutes(new_time)
+            end_minute = start_minute + duration_minutes
+            moves = [
+                (appointment_id, appointment_date,
+                 date_str(parse_date(appointment_date) + timedelta(days=shift_days)))
+                for appointment_id, _, appointment_date, _, _ in rows
+            ]
+
+            conflicts = self._find_series_conflicts(
+                conn, doctor_id, [parse_date(new_date) for _, _, new_date in moves],
+                start_minute, end_minute, ignore={appointment_id for appointment_id, _, _ in moves}
+            )
+            if conflicts:
+                return SeriesResult(
+                    series_id, BookingResult.CONFLICT,
+                    f"{len(conflicts)} of {len(moves)} moved occurrences conflict", [], conflicts
+                )
+
+            # Moving later onto a later occurrence's slot must vacate that slot first
+            ordered = reversed(moves) if shift_days > 0 else moves
+            conn.executemany('''
+                UPDATE appointments
+                SET appointment_date = ?, time_slot = ?, start_minute = ?, end_minute = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE appointment_id = ?
+            ''', [(new_date, new_time, start_minute, end_minute, appointment_id)
+                  for appointment_id, _, new_date in ordered])
+            self.db_manager.availability.refresh_days(
+                conn, doctor_id, [day for _, old_date, new_date in moves for day in (old_date, new_date)]
+            )
+
+        for appointment_id, old_date, new_date in moves:
+            self.db_manager.interval_index.remove(doctor_id, old_date, appointment_id)
+            self.db_manager.interval_index.add(
+                doctor_id, new_date, appointment_id, start_minute, end_minute
+            )
+        self.logger.info(f"Series {series_id} moved: {len(moves)} appointments")
+        return SeriesResult(series_id, BookingResult.BOOKED, f"Moved {len(moves)} appointments",
+                            [appointment_id for appointment_id, _, _ in moves], [])
+
+    def _find_series_conflicts(self, conn, doctor_id, occurrences, start_minute, end_minute,
+                               ignore=frozenset()):
+        """Get (date, blocking appointment IDs) for occurrences that cannot be booked.
+
+        One range query over the series' date span finds every overlapping
+        booking; occurrences the doctor's calendar rules out (days off, time
+        outside working hours or overlapping a break) also count.
+        """
+        wanted = {date_str(day) for day in occurrences}
+        blockers = defaultdict(list)
+        for appointment_id, appointment_date in conn.execute('''
+            SELECT appointment_id, appointment_date FROM appointments
+            WHERE doctor_id = ? AND appointment_date BETWEEN ? AND ?
+            AND status != 'cancelled' AND start_minute < ? AND end_minute > ?
+        ''', (doctor_id, min(wanted), max(wanted), end_minute, start_minute)):
+            if appointment_date in wanted and appointment_id not in ignore:
+                blockers[appointment_date].append(appointment_id)
+
+        calendar = self.db_manager.calendars.get(doctor_id)
+        return [
+            (day, blockers[date_str(day)])
+            for day in occurrences
+            if blockers[date_str(day)]
+            or not self._fits_calendar(calendar, day, start_minute, end_minute)
+        ]
+
+    @staticmethod
+    def _fits_calendar(calendar, day, start_minute, end_minute):
+        """Whether [start_minute, end_minute) is bookable on a date, as for single bookings"""
+        if not calendar.is_working(day):
+            return False
+        hours = calendar.working_hours(day)
+        if hours and not (hours[0] <= start_minute and end_minute <= hours[1]):
+            return False
+        return not any(break_start < end_minute and break_end > start_minute
+                       for break_start, break_end in calendar.breaks_on(day))
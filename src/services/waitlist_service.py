@@ -0,0 +1,173 @@
+from collections import namedtuple
+from datetime import date
+from src.utils.database_manager import DatabaseManager, BookingResult
+from src.utils.doctor_calendar import DoctorCalendar
+from src.utils.intervals import free_intervals, first_fit
+from src.utils.row_mapping import parse_date
+from src.utils.time_utils import MINUTES_PER_DAY, to_minutes, from_minutes, time_str, date_str
+from src.services.appointment_service import DEFAULT_WORKING_HOURS
+from src.models.appointment import AppointmentStatus
+import logging
+
+# Result of matching a freed slot; appointment_id is None for an offer
+Backfill = namedtuple('Backfill', 'waitlist_id patient_id doctor_id appointment_date start_minute '
+                                  'duration_minutes appointment_id')
+
+
+class WaitlistService:
+    """Waitlist for patients wanting an earlier or any slot in a date window.
+
+    AppointmentService.cancel_appointment calls backfill() inside the
+    cancel transaction. The freed interval is matched with a range scan on
+    start_date through the partial (doctor_id, start_date) and
+    (specialization, start_date) indexes over waiting entries, so its cost
+    grows with the waiting entries for that doctor or specialization whose
+    window opened on or before the date. The longest-waiting entry that
+    fits is either booked into the slot (auto_book) or sent an offer to
+    accept later; a fit starts on the doctor's slot grid and stays inside
+    their working hours and outside breaks.
+    """
+
+    def __init__(self, db_manager=None, auto_book=True):
+        self.db_manager = db_manager or DatabaseManager()
+        self.auto_book = auto_book
+        self.logger = logging.getLogger(__name__)
+
+    def add_to_waitlist(self, patient_id, start_date, end_date, doctor_id=None, specialization=None,
+                        earliest_time=None, latest_time=None, duration_minutes=30):
+        """Register a patient for a doctor or specialization within a date window"""
+        if doctor_id is None and specialization is None:
+            raise ValueError("A waitlist entry needs a doctor or a specialization")
+
+        with self.db_manager.db_config.transaction() as conn:
+            cursor = conn.execute('''
+                INSERT INTO waitlist (patient_id, doctor_id, specialization, start_date, end_date,
+                                      earliest_minute, latest_minute, duration_minutes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (patient_id, doctor_id, None if doctor_id else specialization,
+                  date_str(start_date), date_str(end_date),
+                  to_minutes(earliest_time) if earliest_time else 0,
+                  to_minutes(latest_time) if latest_time else MINUTES_PER_DAY,
+                  duration_minutes))
+            waitlist_id = cursor.lastrowid
+
+        self.logger.info(f"Patient {patient_id} added to waitlist: {waitlist_id}")
+        return waitlist_id
+
+    def remove_from_waitlist(self, waitlist_id):
+        """Withdraw a waiting or offered entry"""
+        with self.db_manager.db_config.transaction() as conn:
+            cursor = conn.execute('''
+                UPDATE waitlist SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP
+                WHERE waitlist_id = ? AND status IN ('waiting', 'offered')
+            ''', (waitlist_id,))
+            return cursor.rowcount > 0
+
+    def get_entry(self, waitlist_id):
+        """Get a waitlist entry as a dict, or None"""
+        with self.db_manager.db_config.connection() as conn:
+            cursor = conn.execute('SELECT * FROM waitlist WHERE waitlist_id = ?', (waitlist_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in cursor.description], row))
+
+    def backfill(self, conn, doctor_id, appointment_date, start_minute, end_minute):
+        """Match a freed [start, end) slot on conn's open transaction; returns a Backfill or None"""
+        day = appointment_date if isinstance(appointment_date, date) else parse_date(appointment_date)
+        appointment_date_str = date_str(day)
+        # Read on conn so schedule changes committed elsewhere are seen
+        calendar = DoctorCalendar.load(conn, doctor_id)
+        if not calendar.is_working(day):
+            return None
+        hours = calendar.working_hours(day) or DEFAULT_WORKING_HOURS
+        free = free_intervals(
+            max(start_minute, hours[0]), min(end_minute, hours[1]), calendar.breaks_on(day)
+        )
+        if not free:
+            return None
+
+        specialization = conn.execute(
+            'SELECT specialization FROM doctors WHERE doctor_id = ?', (doctor_id,)
+        ).fetchone()
+        candidates = conn.execute('''
+            SELECT waitlist_id, patient_id, duration_minutes, earliest_minute, latest_minute
+            FROM waitlist
+            WHERE status = 'waiting' AND doctor_id = ?
+            AND start_date <= ? AND end_date >= ?
+            AND MAX(?, earliest_minute) + duration_minutes <= MIN(?, latest_minute)
+            UNION ALL
+            SELECT waitlist_id, patient_id, duration_minutes, earliest_minute, latest_minute
+            FROM waitlist
+            WHERE status = 'waiting' AND specialization = ?
+            AND start_date <= ? AND end_date >= ?
+            AND MAX(?, earliest_minute) + duration_minutes <= MIN(?, latest_minute)
+            ORDER BY waitlist_id
+        ''', (
+            doctor_id, appointment_date_str, appointment_date_str, start_minute, end_minute,
+            specialization[0] if specialization else None,
+            appointment_date_str, appointment_date_str, start_minute, end_minute,
+        )).fetchall()
+
+        # The query only bounds the window; the start must also fit the doctor's day
+        for waitlist_id, patient_id, duration_minutes, earliest, latest in candidates:
+            slot_start = first_fit(
+                [(max(gap_start, earliest), min(gap_end, latest)) for gap_start, gap_end in free],
+                duration_minutes, calendar.slot_minutes, calendar.grid_anchor(day)
+            )
+            if slot_start is not None:
+                break
+        else:
+            return None
+
+        if not self.auto_book:
+            conn.execute('''
+                UPDATE waitlist
+                SET status = 'offered', offered_doctor_id = ?, offered_date = ?,
+                    offered_minute = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE waitlist_id = ?
+            ''', (doctor_id, appointment_date_str, slot_start, waitlist_id))
+            return Backfill(waitlist_id, patient_id, doctor_id, appointment_date_str,
+                            slot_start, duration_minutes, None)
+
+        # The freed interval belonged to the cancelled appointment alone, so it is free
+        appointment_id = conn.execute('''
+            INSERT INTO appointments (patient_id, doctor_id, appointment_date, time_slot,
+                                      duration_minutes, status, start_minute, end_minute)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (patient_id, doctor_id, appointment_date_str, time_str(slot_start), duration_minutes,
+              AppointmentStatus.SCHEDULED.value, slot_start, slot_start + duration_minutes)).lastrowid
+        conn.execute('''
+            UPDATE waitlist
+            SET status = 'booked', appointment_id = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE waitlist_id = ?
+        ''', (appointment_id, waitlist_id))
+        return Backfill(waitlist_id, patient_id, doctor_id, appointment_date_str,
+                        slot_start, duration_minutes, appointment_id)
+
+    def accept_offer(self, waitlist_id):
+        """Book the slot offered to a waitlist entry; returns a BookingResult.
+
+        The offer check, the booking and the status update share one
+        BEGIN IMMEDIATE transaction, so concurrent accepts, or an accept
+        racing a withdrawal, cannot both see the offer as open.
+        """
+        with self.db_manager.db_config.transaction(immediate=True) as conn:
+            offer = conn.execute('''
+                SELECT patient_id, offered_doctor_id, offered_date, offered_minute, duration_minutes
+                FROM waitlist WHERE waitlist_id = ? AND status = 'offered'
+            ''', (waitlist_id,)).fetchone()
+            if offer is None:
+                return BookingResult(None, BookingResult.ERROR, "No open offer for this waitlist entry", [])
+
+            patient_id, doctor_id, offered_date, offered_minute, duration_minutes = offer
+            # Joins this transaction rather than opening its own
+            result = self.db_manager.book_appointment_slot(
+                patient_id, doctor_id, offered_date, from_minutes(offered_minute), duration_minutes
+            )
+            conn.execute('''
+                UPDATE waitlist
+                SET status = ?, appointment_id = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE waitlist_id = ?
+            ''', ('booked' if result.booked else 'waiting', result.appointment_id, waitlist_id))
+        return result
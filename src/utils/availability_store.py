@@ -0,0 +1,224 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from src.utils.time_utils import date_str
+from src.utils.intervals import merge_intervals, free_intervals
+from src.utils.doctor_calendar import DoctorCalendar
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+class AvailabilityStore:
+    """Materialized free intervals per doctor-day over a rolling horizon.
+
+    doctor_free_intervals holds, for every doctor and every date in the
+    availability_horizon row, the gaps in working hours not taken by
+    breaks or active appointments. Writers call refresh_days() or
+    refresh_weekday() on their own connection inside the transaction that
+    changes the source rows, so the table commits or rolls back with them.
+    Until rebuild() sets a horizon nothing is materialized and refreshes
+    cost one primary-key lookup.
+    """
+
+    def __init__(self, db_config, horizon_days=30):
+        self.db_config = db_config
+        self.horizon_days = horizon_days
+
+    def horizon(self, conn):
+        """Get the materialized (start_date, end_date) ISO strings, or None"""
+        return conn.execute(
+            'SELECT start_date, end_date FROM availability_horizon WHERE horizon_id = 1'
+        ).fetchone()
+
+    def free_intervals(self, conn, doctor_id, day):
+        """Get the stored free (start, end) minutes for a doctor-day, or None if not materialized"""
+        horizon = self.horizon(conn)
+        day_str = date_str(day)
+        if horizon is None or not horizon[0] <= day_str <= horizon[1]:
+            return None
+        return conn.execute('''
+            SELECT start_minute, end_minute FROM doctor_free_intervals
+            WHERE doctor_id = ? AND free_date = ?
+            ORDER BY start_minute
+        ''', (doctor_id, day_str)).fetchall()
+
+    def refresh_days(self, conn, doctor_id, days, calendar=None):
+        """Recompute a doctor's stored intervals for the given dates inside the horizon.
+
+        Must run on the connection holding the writer's transaction. The
+        doctor's calendar is read on that connection unless the caller
+        passes one it already loaded there; the process-wide calendar
+        cache can lag schedule writes made by other processes.
+        """
+        horizon = self.horizon(conn)
+        if horizon is None:
+            return 0
+        days = sorted({_as_date(day) for day in days
+                       if horizon[0] <= date_str(day) <= horizon[1]})
+        if not days:
+            return 0
+
+        calendar = calendar or DoctorCalendar.load(conn, doctor_id)
+        busy = self._load_busy(conn, days[0], days[-1], doctor_id)
+        conn.executemany(
+            'DELETE FROM doctor_free_intervals WHERE doctor_id = ? AND free_date = ?',
+            [(doctor_id, date_str(day)) for day in days]
+        )
+        return self._insert(conn, self._compute({doctor_id: calendar}, days, busy))
+
+    def refresh_weekday(self, conn, doctor_id, weekday, calendar=None):
+        """Recompute a doctor's stored intervals on every horizon date falling on weekday"""
+        horizon = self.horizon(conn)
+        if horizon is None:
+            return 0
+        start, end = _as_date(horizon[0]), _as_date(horizon[1])
+        first = start + timedelta(days=(weekday - start.weekday()) % 7)
+        days = [first + timedelta(weeks=week) for week in range((end - first).days // 7 + 1)]
+        return self.refresh_days(
+            conn, doctor_id, days, calendar or DoctorCalendar.load(conn, doctor_id)
+        )
+
+    def refresh_from(self, conn, calendars, start_date):
+        """Recompute stored intervals for {doctor_id: calendar} from start_date to the horizon end.
+
+        Used by bulk schedule writes; bookings for every doctor are read
+        with one range query.
+        """
+        horizon = self.horizon(conn)
+        if horizon is None or date_str(start_date) > horizon[1]:
+            return 0
+        start = max(_as_date(start_date), _as_date(horizon[0]))
+        end = _as_date(horizon[1])
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        conn.executemany(
+            'DELETE FROM doctor_free_intervals WHERE doctor_id = ? AND free_date >= ?',
+            [(doctor_id, date_str(start)) for doctor_id in calendars]
+        )
+        return self._insert(conn, self._compute(calendars, days, self._load_busy(conn, start, end)))
+
+    def rebuild(self, start_date=None, horizon_days=None):
+        """Rematerialize every doctor over [start_date, start_date + horizon_days); returns rows stored"""
+        start_date = start_date or date.today()
+        horizon_days = horizon_days or self.horizon_days
+        days = [start_date + timedelta(days=offset) for offset in range(horizon_days)]
+
+        with self.db_config.transaction(immediate=True) as conn:
+            conn.execute('DELETE FROM doctor_free_intervals')
+            conn.execute('''
+                INSERT OR REPLACE INTO availability_horizon (horizon_id, start_date, end_date)
+                VALUES (1, ?, ?)
+            ''', (date_str(days[0]), date_str(days[-1])))
+            return self._materialize(conn, days)
+
+    def roll(self, today=None):
+        """Advance the horizon to start today, materializing only the newly covered days"""
+        today = today or date.today()
+        with self.db_config.transaction(immediate=True) as conn:
+            horizon = self.horizon(conn)
+            if horizon is None:
+                return 0
+            old_start, old_end = _as_date(horizon[0]), _as_date(horizon[1])
+            end = today + (old_end - old_start)
+
+            if old_start <= today <= old_end:
+                conn.execute(
+                    'DELETE FROM doctor_free_intervals WHERE free_date < ?', (date_str(today),)
+                )
+                first_new = old_end + timedelta(days=1)
+            else:
+                # Nothing stored can be reused
+                conn.execute('DELETE FROM doctor_free_intervals')
+                first_new = today
+            conn.execute('''
+                UPDATE availability_horizon SET start_date = ?, end_date = ? WHERE horizon_id = 1
+            ''', (date_str(today), date_str(end)))
+
+            days = [first_new + timedelta(days=offset) for offset in range((end - first_new).days + 1)]
+            return self._materialize(conn, days) if days else 0
+
+    def verify(self):
+        """Compare the stored intervals with a fresh computation from the source tables.
+
+        Returns (doctor_id, date, stored, expected) for every doctor-day
+        that differs; an empty list means the table is consistent.
+        """
+        # A read transaction keeps both sides on the same snapshot
+        with self.db_config.transaction() as conn:
+            horizon = self.horizon(conn)
+            if horizon is None:
+                return []
+            start, end = _as_date(horizon[0]), _as_date(horizon[1])
+            days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+            doctor_ids = [row[0] for row in conn.execute('SELECT doctor_id FROM doctors')]
+            expected = self._compute(
+                DoctorCalendar.load_many(conn, doctor_ids), days, self._load_busy(conn, start, end)
+            )
+            stored = defaultdict(list)
+            for doctor_id, free_date, start_minute, end_minute in conn.execute('''
+                SELECT doctor_id, free_date, start_minute, end_minute FROM doctor_free_intervals
+                ORDER BY doctor_id, free_date, start_minute
+            '''):
+                stored[(doctor_id, free_date)].append((start_minute, end_minute))
+
+        return [
+            (doctor_id, free_date, stored.get((doctor_id, free_date), []),
+             expected.get((doctor_id, free_date), []))
+            for doctor_id, free_date in sorted(set(stored) | set(expected))
+            if stored.get((doctor_id, free_date), []) != expected.get((doctor_id, free_date), [])
+        ]
+
+    def _materialize(self, conn, days):
+        """Compute and insert intervals for every doctor over days (already cleared)"""
+        doctor_ids = [row[0] for row in conn.execute('SELECT doctor_id FROM doctors')]
+        calendars = DoctorCalendar.load_many(conn, doctor_ids)
+        busy = self._load_busy(conn, min(days), max(days))
+        return self._insert(conn, self._compute(calendars, days, busy))
+
+    @staticmethod
+    def _load_busy(conn, start, end, doctor_id=None):
+        """Get {(doctor_id, date): [(start, end)]} of active appointments in a date range"""
+        if doctor_id is None:
+            rows = conn.execute('''
+                SELECT doctor_id, appointment_date, start_minute, end_minute FROM appointments
+                WHERE appointment_date BETWEEN ? AND ? AND status != 'cancelled'
+            ''', (date_str(start), date_str(end)))
+        else:
+            rows = conn.execute('''
+                SELECT doctor_id, appointment_date, start_minute, end_minute FROM appointments
+                WHERE doctor_id = ? AND appointment_date BETWEEN ? AND ? AND status != 'cancelled'
+            ''', (doctor_id, date_str(start), date_str(end)))
+        busy = defaultdict(list)
+        for doctor_id, appointment_date, start_minute, end_minute in rows:
+            busy[(doctor_id, appointment_date)].append((start_minute, end_minute))
+        return busy
+
+    @staticmethod
+    def _compute(calendars, days, busy):
+        """Get {(doctor_id, date): free intervals} for each working doctor-day"""
+        free = {}
+        for doctor_id, calendar in calendars.items():
+            for day in days:
+                hours = calendar.working_hours(day)
+                if hours is None:
+                    continue
+                key = (doctor_id, date_str(day))
+                gaps = free_intervals(
+                    hours[0], hours[1], merge_intervals(calendar.breaks_on(day) + busy.get(key, []))
+                )
+                if gaps:
+                    free[key] = gaps
+        return free
+
+    @staticmethod
+    def _insert(conn, free):
+        rows = [
+            (doctor_id, free_date, start_minute, end_minute)
+            for (doctor_id, free_date), gaps in free.items()
+            for start_minute, end_minute in gaps
+        ]
+        conn.executemany('''
+            INSERT INTO doctor_free_intervals (doctor_id, free_date, start_minute, end_minute)
+            VALUES (?, ?, ?, ?)
+        ''', rows)
+        return len(rows)
@@ -1,186 +1,399 @@
 import sqlite3
 import os
 from datetime import datetime, time, date, timedelta
+from bisect import bisect_left
+from collections import namedtuple, defaultdict
+from itertools import islice
 from config.database_config import DatabaseConfig
+from src.utils.time_utils import to_minutes, time_str, date_str
+from src.utils.row_mapping import RowMapper
+from src.utils.interval_index import IntervalIndex
+from src.utils.intervals import merge_intervals
+from src.utils.doctor_calendar import CalendarCache
+from src.utils.availability_store import AvailabilityStore
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+
+
+class BookingResult(namedtuple('BookingResult', 'appointment_id status message conflicts')):
+    """Outcome of a booking attempt; conflicts lists overlapping appointment IDs"""
+    __slots__ = ()
+    
+    BOOKED = 'booked'
+    CONFLICT = 'conflict'
+    ERROR = 'error'
+    
+    @property
+    def booked(self):
+        return self.status == self.BOOKED
+
+
+class _BulkRow:
+    """Working state for one row of a bulk import"""
+    __slots__ = ('index', 'patient_id', 'start_minute', 'end_minute', 'time_slot',
+                 'duration_minutes', 'appointment_id', 'conflicts')
+    
+    def __init__(self, index, patient_id, start_minute, end_minute, time_slot, duration_minutes):
+        self.index = index
+        self.patient_id = patient_id
+        self.start_minute = start_minute
+        self.end_minute = end_minute
+        self.time_slot = time_slot
+        self.duration_minutes = duration_minutes
+        self.appointment_id = None
+        self.conflicts = []
+
 
 class DatabaseManager:
-    def __init__(self):
-        self.db_config = DatabaseConfig()
+    def __init__(self, db_config=None):
+        self.db_config = db_config or DatabaseConfig()
         self.db_config.initialize_database()
+        
+        # Row factories hydrating query results into model instances
+        self.patient_rows = RowMapper(Patient)
+        self.doctor_rows = RowMapper(Doctor)
+        self.appointment_rows = RowMapper(
+            Appointment, detail_loader=self.get_appointment_details
+        )
+        
+        # Per-doctor-day busy intervals shared by every manager on this file
+        self.interval_index = IntervalIndex.for_config(self.db_config)
+        
+        # Compiled weekly templates, leave and overrides per doctor
+        self.calendars = CalendarCache.for_config(self.db_config)
+        
+        # Materialized free intervals, refreshed inside each writing transaction
+        self.availability = AvailabilityStore(self.db_config)
     
     # Patient operations
     def add_patient(self, mrn, name, email, phone, date_of_birth):
         """Add a new patient to the database"""
-        conn = self.db_config.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                INSERT INTO patients (mrn, name, email, phone, date_of_birth)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (mrn, name, email, phone, date_of_birth))
-            conn.commit()
-            return cursor.lastrowid
+            with self.db_config.transaction() as conn:
+                cursor = conn.execute('''
+                    INSERT INTO patients (mrn, name, email, phone, date_of_birth)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (mrn, name, email, phone, date_of_birth))
+                return cursor.lastrowid
         except sqlite3.IntegrityError:
             print(f"Patient with MRN {mrn} already exists!")
             return None
-        finally:
-            conn.close()
     
     def get_patient(self, patient_id=None, mrn=None):
         """Get patient by ID or MRN"""
-        conn = self.db_config.get_connection()
-        cursor = conn.cursor()
-        
         if patient_id:
-            cursor.execute('SELECT * FROM patients WHERE patient_id = ?', (patient_id,))
+            query, params = 'SELECT * FROM patients WHERE patient_id = ?', (patient_id,)
         elif mrn:
-            cursor.execute('SELECT * FROM patients WHERE mrn = ?', (mrn,))
+            query, params = 'SELECT * FROM patients WHERE mrn = ?', (mrn,)
         else:
             return None
         
-        patient = cursor.fetchone()
-        conn.close()
-        return patient
+        with self.db_config.connection() as conn:
+            return self.patient_rows.fetchone(conn.execute(query, params))
     
     # Doctor operations
     def add_doctor(self, name, specialization, email, phone):
         """Add a new doctor to the database"""
-        conn = self.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO doctors (name, specialization, email, phone)
-            VALUES (?, ?, ?, ?)
-        ''', (name, specialization, email, phone))
-        
-        conn.commit()
-        doctor_id = cursor.lastrowid
-        conn.close()
-        return doctor_id
+        with self.db_config.transaction() as conn:
+            cursor = conn.execute('''
+                INSERT INTO doctors (name, specialization, email, phone)
+                VALUES (?, ?, ?, ?)
+            ''', (name, specialization, email, phone))
+            return cursor.lastrowid
     
     def get_doctor(self, doctor_id):
         """Get doctor by ID"""
-        conn = self.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM doctors WHERE doctor_id = ?', (doctor_id,))
-        doctor = cursor.fetchone()
-        conn.close()
-        return doctor
+        with self.db_config.connection() as conn:
+            return self.doctor_rows.fetchone(conn.execute(
+                'SELECT * FROM doctors WHERE doctor_id = ?', (doctor_id,)
+            ))
     
     def get_doctors_by_specialization(self, specialization):
         """Get all doctors by specialization"""
-        conn = self.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM doctors WHERE specialization = ?', (specialization,))
-        doctors = cursor.fetchall()
-        conn.close()
-        return doctors
+        with self.db_config.connection() as conn:
+            return self.doctor_rows.fetchall(conn.execute(
+                'SELECT * FROM doctors WHERE specialization = ?', (specialization,)
+            ))
+    
+    # Visit type operations
+    def add_visit_type(self, visit_type, duration_minutes, description=None):
+        """Add or update a visit type and its duration"""
+        with self.db_config.transaction() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO visit_types (visit_type, duration_minutes, description)
+                VALUES (?, ?, ?)
+            ''', (visit_type, duration_minutes, description))
+    
+    def get_visit_types(self):
+        """Get {visit_type: duration_minutes} for every visit type"""
+        with self.db_config.connection() as conn:
+            return dict(conn.execute('SELECT visit_type, duration_minutes FROM visit_types'))
+    
+    def get_visit_duration(self, visit_type):
+        """Get the duration of a visit type in minutes; raises ValueError if unknown"""
+        with self.db_config.connection() as conn:
+            row = conn.execute(
+                'SELECT duration_minutes FROM visit_types WHERE visit_type = ?', (visit_type,)
+            ).fetchone()
+        if row is None:
+            raise ValueError(f"Unknown visit type: {visit_type}")
+        return row[0]
     
     # Appointment operations
     def add_appointment(self, patient_id, doctor_id, appointment_date, time_slot, duration_minutes=30):
         """Add a new appointment with conflict detection"""
-        conn = self.db_config.get_connection()
-        cursor = conn.cursor()
+        result = self.book_appointment_slot(
+            patient_id, doctor_id, appointment_date, time_slot, duration_minutes
+        )
+        return result.appointment_id, result.message
+    
+    def book_appointment_slot(self, patient_id, doctor_id, appointment_date, time_slot,
+                              duration_minutes=30, status='scheduled'):
+        """Atomically check for overlaps and insert an appointment.
         
-        # Convert time_slot to string if it's a time object
-        if hasattr(time_slot, 'isoformat'):
-            time_slot_str = time_slot.isoformat(timespec='minutes')
-        else:
-            time_slot_str = str(time_slot)
+        The overlap query and the insert run inside one BEGIN IMMEDIATE
+        transaction, so concurrent bookings for the same doctor serialize
+        on the write lock and cannot both pass the check.
+        """
+        appointment_date_str = date_str(appointment_date)
+        start_minute = to_minutes(time_slot)
+        end_minute = start_minute + duration_minutes
         
-        # Convert appointment_date to string if it's a date object
-        if hasattr(appointment_date, 'isoformat'):
-            appointment_date_str = appointment_date.isoformat()
-        else:
-            appointment_date_str = str(appointment_date)
+        try:
+            with self.db_config.transaction(immediate=True) as conn:
+                conflicts = self._find_conflicts(
+                    conn, doctor_id, appointment_date_str, start_minute, end_minute
+                )
+                if conflicts:
+                    return BookingResult(
+                        None, BookingResult.CONFLICT, "Time slot conflict detected", conflicts
+                    )
+                
+                cursor = conn.execute('''
+                    INSERT INTO appointments (patient_id, doctor_id, appointment_date, time_slot,
+                                              duration_minutes, status, start_minute, end_minute)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (patient_id, doctor_id, appointment_date_str, time_str(time_slot),
+                      duration_minutes, status, start_minute, end_minute))
+                appointment_id = cursor.lastrowid
+                self.availability.refresh_days(conn, doctor_id, [appointment_date_str])
+                # A joined outer transaction may still roll back the insert
+                self.db_config.after_commit(
+                    lambda: self.interval_index.add(
+                        doctor_id, appointment_date_str, appointment_id, start_minute, end_minute
+                    ),
+                    lambda: self.interval_index.invalidate(doctor_id, appointment_date_str)
+                )
+        except sqlite3.IntegrityError as e:
+            return BookingResult(None, BookingResult.ERROR, f"Scheduling error: {str(e)}", [])
         
-        # Check for conflicts
-        if self._has_appointment_conflict(doctor_id, appointment_date, time_slot, duration_minutes):
-            conn.close()
-            return None, "Time slot conflict detected"
+        return BookingResult(
+            appointment_id, BookingResult.BOOKED, "Appointment scheduled successfully", []
+        )
+    
+    def add_appointments_bulk(self, appointments, chunk_size=1000):
+        """Import many appointments, one transaction per chunk.
+        
+        Each item is (patient_id, doctor_id, appointment_date, time_slot[,
+        duration_minutes]). Rows are grouped by doctor-day and checked with a
+        sort-and-sweep against each other and against active bookings, then
+        the accepted rows are inserted with executemany. Returns one
+        BookingResult per input row, in input order.
+        """
+        results = []
+        iterator = iter(appointments)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return results
+            results.extend(self._add_appointment_chunk(chunk))
+    
+    def _add_appointment_chunk(self, chunk):
+        """Sweep and insert one chunk of bulk rows; returns results in chunk order"""
+        results = [None] * len(chunk)
+        groups = defaultdict(list)
+        
+        for index, row in enumerate(chunk):
+            try:
+                patient_id, doctor_id, appointment_date, time_slot = row[:4]
+                duration_minutes = row[4] if len(row) > 4 else 30
+                start_minute = to_minutes(time_slot)
+                groups[(doctor_id, date_str(appointment_date))].append(_BulkRow(
+                    index, patient_id, start_minute, start_minute + duration_minutes,
+                    time_str(time_slot), duration_minutes
+                ))
+            except (TypeError, ValueError) as e:
+                results[index] = BookingResult(
+                    None, BookingResult.ERROR, f"Invalid appointment row: {str(e)}", []
+                )
         
         try:
-            cursor.execute('''
-                INSERT INTO appointments (patient_id, doctor_id, appointment_date, time_slot, duration_minutes)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (patient_id, doctor_id, appointment_date_str, time_slot_str, duration_minutes))
-            
-            conn.commit()
-            appointment_id = cursor.lastrowid
-            conn.close()
-            return appointment_id, "Appointment scheduled successfully"
-            
-        except sqlite3.IntegrityError as e:
-            conn.close()
-            return None, f"Scheduling error: {str(e)}"
+            with self.db_config.transaction(immediate=True) as conn:
+                accepted = []
+                for (doctor_id, appointment_date_str), rows in groups.items():
+                    existing = conn.execute('''
+                        SELECT appointment_id, start_minute, end_minute
+                        FROM appointments
+                        WHERE doctor_id = ? AND appointment_date = ? AND status != 'cancelled'
+                        ORDER BY start_minute
+                    ''', (doctor_id, appointment_date_str)).fetchall()
+                    
+                    for row in self._sweep_bulk_rows(rows, existing):
+                        accepted.append((doctor_id, appointment_date_str, row))
+                
+                new_ids = self._insert_appointments(conn, [
+                    (row.patient_id, doctor_id, appointment_date_str, row.time_slot,
+                     row.duration_minutes, row.start_minute, row.end_minute)
+                    for doctor_id, appointment_date_str, row in accepted
+                ])
+        except sqlite3.IntegrityError:
+            # Fall back to row-by-row booking so one bad row cannot sink the chunk
+            for index, row in enumerate(chunk):
+                if results[index] is None:
+                    results[index] = self.book_appointment_slot(*row)
+            return results
+        
+        for (doctor_id, appointment_date_str, row), appointment_id in zip(accepted, new_ids):
+            row.appointment_id = appointment_id
+            self.interval_index.add(
+                doctor_id, appointment_date_str, appointment_id, row.start_minute, row.end_minute
+            )
+            results[row.index] = BookingResult(
+                appointment_id, BookingResult.BOOKED, "Appointment scheduled successfully", []
+            )
+        for rows in groups.values():
+            for row in rows:
+                if row.appointment_id is None:
+                    conflicts = [
+                        blocker if isinstance(blocker, int) else blocker.appointment_id
+                        for blocker in row.conflicts
+                    ]
+                    results[row.index] = BookingResult(
+                        None, BookingResult.CONFLICT, "Time slot conflict detected", conflicts
+                    )
+        return results
     
-    def _has_appointment_conflict(self, doctor_id, appointment_date, time_slot, duration_minutes):
-        """Check if appointment time conflicts with existing appointments"""
-        conn = self.db_config.get_connection()
-        cursor = conn.cursor()
+    def _insert_appointments(self, conn, rows, series_id=None):
+        """Insert pre-checked appointment rows with executemany; returns their IDs in order.
         
-        # Convert to strings for comparison
-        if hasattr(appointment_date, 'isoformat'):
-            appointment_date_str = appointment_date.isoformat()
-        else:
-            appointment_date_str = str(appointment_date)
+        Each row is (patient_id, doctor_id, appointment_date, time_slot,
+        duration_minutes, start_minute, end_minute). Must run inside a write
+        transaction; materialized availability is refreshed in it.
+        """
+        rows = list(rows)
+        last_id = conn.execute(
+            "SELECT COALESCE(MAX(appointment_id), 0) FROM appointments"
+        ).fetchone()[0]
+        conn.executemany('''
+            INSERT INTO appointments (patient_id, doctor_id, appointment_date, time_slot,
+                                      duration_minutes, start_minute, end_minute, series_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (tuple(row) + (series_id,) for row in rows))
         
-        cursor.execute('''
-            SELECT time_slot, duration_minutes 
-            FROM appointments 
-            WHERE doctor_id = ? AND appointment_date = ? AND status != 'cancelled'
-        ''', (doctor_id, appointment_date_str))
+        days_by_doctor = defaultdict(set)
+        for row in rows:
+            days_by_doctor[row[1]].add(row[2])
+        for doctor_id, days in days_by_doctor.items():
+            self.availability.refresh_days(conn, doctor_id, days)
         
-        existing_appointments = cursor.fetchall()
-        conn.close()
+        # AUTOINCREMENT IDs are assigned in insertion order under the write lock
+        return [r[0] for r in conn.execute(
+            "SELECT appointment_id FROM appointments WHERE appointment_id > ? "
+            "ORDER BY appointment_id", (last_id,)
+        )]
+    
+    @staticmethod
+    def _sweep_bulk_rows(rows, existing):
+        """Yield the rows of one doctor-day that fit around existing bookings.
         
-        for existing_slot, existing_duration in existing_appointments:
-            # Convert string time back to time object for comparison
-            if isinstance(existing_slot, str):
-                existing_time = time.fromisoformat(existing_slot)
-            else:
-                existing_time = existing_slot
-                
-            existing_start = datetime.combine(appointment_date, existing_time)
-            existing_end = existing_start + timedelta(minutes=existing_duration)
+        Candidates are swept in start order; a candidate is rejected when it
+        starts before the latest end seen so far (an earlier accepted row or
+        existing booking) or when an existing booking starts inside it.
+        """
+        existing_starts = [start for _, start, _ in existing]
+        rows.sort(key=lambda row: (row.start_minute, row.index))
+        
+        latest_end, latest_owner = None, None
+        next_existing = 0
+        for row in rows:
+            # Fold in existing bookings that start before this candidate
+            while (next_existing < len(existing)
+                   and existing[next_existing][1] < row.start_minute):
+                existing_id, _, existing_end = existing[next_existing]
+                if latest_end is None or existing_end > latest_end:
+                    latest_end, latest_owner = existing_end, existing_id
+                next_existing += 1
             
-            # Convert new time_slot if it's a string
-            if isinstance(time_slot, str):
-                new_time = time.fromisoformat(time_slot)
-            else:
-                new_time = time_slot
-                
-            new_start = datetime.combine(appointment_date, new_time)
-            new_end = new_start + timedelta(minutes=duration_minutes)
+            if latest_end is not None and row.start_minute < latest_end:
+                row.conflicts.append(latest_owner)
+                continue
             
-            # Check for overlap
-            if not (new_end <= existing_start or new_start >= existing_end):
-                return True
+            later = bisect_left(existing_starts, row.start_minute)
+            if later < len(existing) and existing[later][1] < row.end_minute:
+                row.conflicts.append(existing[later][0])
+                continue
+            
+            latest_end, latest_owner = row.end_minute, row
+            yield row
+    
+    def _find_conflicts(self, conn, doctor_id, appointment_date_str, start_minute, end_minute):
+        """Get IDs of active appointments overlapping [start, end) minutes on the given day"""
+        rows = conn.execute('''
+            SELECT appointment_id 
+            FROM appointments 
+            WHERE doctor_id = ? AND appointment_date = ? AND status != 'cancelled'
+            AND start_minute < ? AND end_minute > ?
+        ''', (doctor_id, appointment_date_str, end_minute, start_minute)).fetchall()
+        return [row[0] for row in rows]
+    
+    def _has_appointment_conflict(self, doctor_id, appointment_date, time_slot, duration_minutes):
+        """Check if appointment time conflicts with existing appointments.
         
-        return False
+        Answered from the in-memory interval index; booking itself re-checks
+        in SQL under the write lock.
+        """
+        start_minute = to_minutes(time_slot)
+        return bool(self.interval_index.conflicts(
+            doctor_id, date_str(appointment_date),
+            start_minute, start_minute + duration_minutes
+        ))
+    
+    def get_doctor_day_intervals(self, doctor_id, appointment_date, include_breaks=True):
+        """Get (working_hours, busy) for a doctor-day in minutes.
+        
+        working_hours is the (start, end) the doctor's calendar gives for
+        that date, or None when there are none. busy merges active
+        appointments, taken from the interval index, with breaks into
+        sorted disjoint intervals. Both come from in-memory caches.
+        """
+        busy = self.interval_index.busy_intervals(doctor_id, date_str(appointment_date))
+        calendar = self.calendars.get(doctor_id)
+        if include_breaks:
+            busy.extend(calendar.breaks_on(appointment_date))
+        return calendar.working_hours(appointment_date), merge_intervals(busy)
     
     def get_doctor_appointments(self, doctor_id, appointment_date):
         """Get all appointments for a doctor on a specific date"""
-        conn = self.db_config.get_connection()
-        cursor = conn.cursor()
+        appointment_date_str = date_str(appointment_date)
         
-        # Convert date to string for query
-        if hasattr(appointment_date, 'isoformat'):
-            appointment_date_str = appointment_date.isoformat()
-        else:
-            appointment_date_str = str(appointment_date)
-        
-        cursor.execute('''
-            SELECT a.*, p.name as patient_name 
-            FROM appointments a 
-            JOIN patients p ON a.patient_id = p.patient_id 
-            WHERE a.doctor_id = ? AND a.appointment_date = ? 
-            ORDER BY a.time_slot
-        ''', (doctor_id, appointment_date_str))
-        
-        appointments = cursor.fetchall()
-        conn.close()
-        return appointments
\ No newline at end of file
+        with self.db_config.connection() as conn:
+            return self.appointment_rows.fetchall(conn.execute('''
+                SELECT a.appointment_id, a.patient_id, a.doctor_id, a.appointment_date,
+                       a.time_slot, a.duration_minutes, a.status, a.start_minute, a.end_minute,
+                       a.created_at, a.updated_at, p.name as patient_name 
+                FROM appointments a 
+                JOIN patients p ON a.patient_id = p.patient_id 
+                WHERE a.doctor_id = ? AND a.appointment_date = ? 
+                ORDER BY a.time_slot
+            ''', (doctor_id, appointment_date_str)))
+    
+    def get_appointment_details(self, appointment_id):
+        """Get (diagnosis, prescription, notes) for an appointment"""
+        with self.db_config.connection() as conn:
+            row = conn.execute('''
+                SELECT diagnosis, prescription, notes 
+                FROM appointments 
+                WHERE appointment_id = ?
+            ''', (appointment_id,)).fetchone()
+        return row if row else (None, None, None)
\ No newline at end of file
@@ -0,0 +1,243 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+from src.utils.time_utils import to_minutes
+from src.utils.intervals import merge_intervals
+
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Slot grid for doctors without a configured granularity (minutes)
+DEFAULT_SLOT_MINUTES = 30
+
+logger = logging.getLogger(__name__)
+
+
+def weekday_number(day_name):
+    """Get the weekday (Monday = 0) of a day name in any case, or None if it is not one"""
+    name = day_name.strip().capitalize() if isinstance(day_name, str) else None
+    return DAY_NAMES.index(name) if name in DAY_NAMES else None
+
+
+class DoctorCalendar:
+    """A doctor's weekly template, leave days and per-date overrides, in minutes after midnight"""
+    __slots__ = ('doctor_id', 'hours', 'breaks', 'leave', 'overrides', 'slot_minutes', 'versions')
+
+    def __init__(self, doctor_id, hours=None, breaks=None, leave=(), overrides=None,
+                 slot_minutes=DEFAULT_SLOT_MINUTES, versions=()):
+        self.doctor_id = doctor_id
+        self.hours = hours or {}          # {weekday: (start, end)}
+        self.breaks = breaks or {}        # {weekday: [(start, end)]}, merged
+        self.leave = set(leave)           # {date}
+        self.overrides = overrides or {}  # {date: (start, end) or None when closed}
+        self.slot_minutes = slot_minutes  # start-time grid
+        # [(effective_from, hours, breaks)], each replacing the base from its date on
+        self.versions = sorted(versions, key=lambda version: version[0])
+
+    @classmethod
+    def load(cls, conn, doctor_id):
+        """Compile a doctor's calendar from schedules, breaks, leave, overrides and slot grid"""
+        return cls.load_many(conn, [doctor_id])[doctor_id]
+
+    @classmethod
+    def load_many(cls, conn, doctor_ids):
+        """Compile calendars for many doctors with one query per source table.
+
+        Returns {doctor_id: DoctorCalendar}; the IDs are passed to SQLite
+        as one JSON array, so the statement count does not grow with them.
+        """
+        doctor_ids = list(doctor_ids)
+        ids = json.dumps(doctor_ids)
+
+        # Keyed by effective_from; None holds the base schedule
+        hours = defaultdict(lambda: defaultdict(dict))
+        for doctor_id, effective_from, day, start, end in conn.execute('''
+            SELECT doctor_id, effective_from, day_of_week, start_time, end_time FROM doctor_schedules
+            WHERE doctor_id IN (SELECT value FROM json_each(?))
+        ''', (ids,)):
+            weekday = cls._weekday(doctor_id, day)
+            if weekday is not None:
+                hours[doctor_id][effective_from][weekday] = (to_minutes(start), to_minutes(end))
+
+        breaks = defaultdict(lambda: defaultdict(dict))
+        for doctor_id, effective_from, day, start, end in conn.execute('''
+            SELECT doctor_id, effective_from, day_of_week, break_start, break_end FROM doctor_breaks
+            WHERE doctor_id IN (SELECT value FROM json_each(?))
+        ''', (ids,)):
+            weekday = cls._weekday(doctor_id, day)
+            if weekday is not None:
+                breaks[doctor_id][effective_from].setdefault(weekday, []).append(
+                    (to_minutes(start), to_minutes(end))
+                )
+
+        leave = defaultdict(list)
+        for doctor_id, leave_date in conn.execute('''
+            SELECT doctor_id, leave_date FROM doctor_leave
+            WHERE doctor_id IN (SELECT value FROM json_each(?))
+        ''', (ids,)):
+            leave[doctor_id].append(date.fromisoformat(leave_date))
+
+        overrides = defaultdict(dict)
+        for doctor_id, override_date, start, end in conn.execute('''
+            SELECT doctor_id, override_date, start_time, end_time FROM doctor_schedule_overrides
+            WHERE doctor_id IN (SELECT value FROM json_each(?))
+        ''', (ids,)):
+            overrides[doctor_id][date.fromisoformat(override_date)] = (
+                (to_minutes(start), to_minutes(end)) if start and end else None
+            )
+
+        slot_minutes = dict(conn.execute('''
+            SELECT doctor_id, slot_minutes FROM doctors
+            WHERE doctor_id IN (SELECT value FROM json_each(?))
+        ''', (ids,)))
+
+        def merged(spans_by_weekday):
+            return {weekday: merge_intervals(spans) for weekday, spans in spans_by_weekday.items()}
+
+        return {
+            doctor_id: cls(
+                doctor_id, hours[doctor_id][None], merged(breaks[doctor_id][None]),
+                leave[doctor_id], overrides[doctor_id],
+                slot_minutes.get(doctor_id, DEFAULT_SLOT_MINUTES),
+                [
+                    (date.fromisoformat(effective_from), version_hours,
+                     merged(breaks[doctor_id][effective_from]))
+                    for effective_from, version_hours in hours[doctor_id].items()
+                    if effective_from is not None
+                ]
+            )
+            for doctor_id in doctor_ids
+        }
+
+    @staticmethod
+    def _weekday(doctor_id, day_name):
+        """Weekday of a stored day name; rows with names that are not days are skipped"""
+        weekday = weekday_number(day_name)
+        if weekday is None:
+            logger.warning(f"Ignoring schedule row for doctor {doctor_id} with unknown day {day_name!r}")
+        return weekday
+
+    @property
+    def has_schedule(self):
+        """Whether any working hours have been configured"""
+        return (bool(self.hours) or any(hours for _, hours, _ in self.versions)
+                or any(self.overrides.values()))
+
+    def weekly_schedule(self, day):
+        """Get the (hours, breaks) weekly schedule in effect on a date"""
+        for effective_from, hours, breaks in reversed(self.versions):
+            if effective_from <= day:
+                return hours, breaks
+        return self.hours, self.breaks
+
+    def working_hours(self, day):
+        """Get (start, end) minutes worked on a date, or None when off"""
+        if day in self.leave:
+            return None
+        if day in self.overrides:
+            return self.overrides[day]
+        return self.weekly_schedule(day)[0].get(day.weekday())
+
+    def grid_anchor(self, day):
+        """Get the minute slot starts are aligned to on a date: the start of work"""
+        hours = self.working_hours(day)
+        return hours[0] if hours else 0
+
+    def breaks_on(self, day):
+        """Get the merged break intervals for a date"""
+        return self.weekly_schedule(day)[1].get(day.weekday(), [])
+
+    def is_working(self, day):
+        """Whether the doctor works on a date.
+
+        Doctors with no schedule configured at all keep the historical
+        Monday-Friday default.
+        """
+        if not self.has_schedule:
+            return day not in self.leave and day.weekday() < 5
+        return self.working_hours(day) is not None
+
+
+class CalendarCache:
+    """Process-wide cache of compiled DoctorCalendar objects.
+
+    Calendars are loaded on first use and dropped by the schedule service
+    whenever it writes schedules, breaks, leave or overrides, so lookups
+    need no database round trip. Entries older than max_age seconds are
+    reloaded to pick up writes made by other processes.
+    """
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, db_config, max_age=60.0):
+        self.db_config = db_config
+        self.max_age = max_age
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @classmethod
+    def for_config(cls, db_config, **kwargs):
+        """Get the process-wide cache for a database file"""
+        key = os.path.abspath(db_config.db_path)
+        pool = db_config.pool
+        with cls._registry_lock:
+            entry = cls._registry.get(key)
+            if entry is None or entry[0] is not pool:
+                entry = (pool, cls(db_config, **kwargs))
+                cls._registry[key] = entry
+            return entry[1]
+
+    def get(self, doctor_id):
+        """Get a doctor's calendar, loading it if missing or expired"""
+        entry = self._entries.get(doctor_id)
+        if entry is not None and time.monotonic() - entry[1] < self.max_age:
+            return entry[0]
+
+        with self._lock:
+            generation = self._generation
+        with self.db_config.connection() as conn:
+            calendar = DoctorCalendar.load(conn, doctor_id)
+        with self._lock:
+            # Only cache if no invalidation raced with the load
+            if generation == self._generation:
+                self._entries[doctor_id] = (calendar, time.monotonic())
+        return calendar
+
+    def get_many(self, doctor_ids):
+        """Get {doctor_id: calendar}, loading every missing or expired one in a single batch"""
+        now = time.monotonic()
+        calendars, missing = {}, []
+        for doctor_id in doctor_ids:
+            entry = self._entries.get(doctor_id)
+            if entry is not None and now - entry[1] < self.max_age:
+                calendars[doctor_id] = entry[0]
+            else:
+                missing.append(doctor_id)
+        if not missing:
+            return calendars
+
+        with self._lock:
+            generation = self._generation
+        with self.db_config.connection() as conn:
+            loaded = DoctorCalendar.load_many(conn, missing)
+        with self._lock:
+            if generation == self._generation:
+                loaded_at = time.monotonic()
+                for doctor_id, calendar in loaded.items():
+                    self._entries[doctor_id] = (calendar, loaded_at)
+        calendars.update(loaded)
+        return calendars
+
+    def invalidate(self, doctor_id=None):
+        """Drop one doctor's calendar, or every calendar when called without arguments"""
+        with self._lock:
+            self._generation += 1
+            if doctor_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(doctor_id, None)
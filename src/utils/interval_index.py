@@ -0,0 +1,159 @@
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+
+class DoctorDayIntervals:
+    """Active appointments of one doctor-day as parallel arrays sorted by start"""
+    __slots__ = ('starts', 'ends', 'ids', 'max_length')
+
+    def __init__(self, rows=()):
+        self.starts = []
+        self.ends = []
+        self.ids = []
+        self.max_length = 0
+        for appointment_id, start, end in sorted(rows, key=lambda row: (row[1], row[0])):
+            self.starts.append(start)
+            self.ends.append(end)
+            self.ids.append(appointment_id)
+            self.max_length = max(self.max_length, end - start)
+
+    def overlapping(self, start, end):
+        """Get IDs of intervals overlapping [start, end)"""
+        # Anything starting at or before start - max_length has already ended
+        low = bisect_right(self.starts, start - self.max_length)
+        high = bisect_left(self.starts, end)
+        return [
+            self.ids[i] for i in range(low, high)
+            if self.ends[i] > start
+        ]
+
+    def add(self, appointment_id, start, end):
+        position = bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.ids.insert(position, appointment_id)
+        self.max_length = max(self.max_length, end - start)
+
+    def remove(self, appointment_id):
+        if appointment_id in self.ids:
+            position = self.ids.index(appointment_id)
+            del self.starts[position], self.ends[position], self.ids[position]
+
+    def intervals(self):
+        """Get (start, end) pairs in start order"""
+        return list(zip(self.starts, self.ends))
+
+
+class IntervalIndex:
+    """In-process LRU cache of per-doctor-day appointment intervals.
+
+    Entries are loaded on first touch and kept current by the services
+    through add(), remove() and invalidate(), registered with
+    DatabaseConfig.after_commit() where a write may join an outer
+    transaction; code writing appointments directly must call
+    invalidate() itself. Commits made by other
+    connections (other threads' pooled connections or other processes)
+    are detected through PRAGMA data_version, which drops the cache.
+    """
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, db_config, capacity=1024):
+        self.db_config = db_config
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        # Keyed by connection object, not id(), which can be reused after a
+        # close; bounded by the pool size since the index dies with its pool
+        self._data_versions = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_config(cls, db_config, **kwargs):
+        """Get the process-wide index for a database file.
+
+        The index lives as long as the file's connection pool, so every
+        DatabaseManager on the same file shares one cache.
+        """
+        key = os.path.abspath(db_config.db_path)
+        pool = db_config.pool
+        with cls._registry_lock:
+            entry = cls._registry.get(key)
+            if entry is None or entry[0] is not pool:
+                entry = (pool, cls(db_config, **kwargs))
+                cls._registry[key] = entry
+            return entry[1]
+
+    def _check_data_version(self, conn):
+        """Drop cached entries if another connection has committed since last check"""
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        previous = self._data_versions.get(conn)
+        if previous != version:
+            self._data_versions[conn] = version
+            self.invalidate()
+
+    def _get(self, doctor_id, appointment_date_str):
+        key = (doctor_id, appointment_date_str)
+        with self.db_config.connection() as conn:
+            with self._lock:
+                self._check_data_version(conn)
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                self.misses += 1
+                generation = self._generation
+
+            rows = conn.execute('''
+                SELECT appointment_id, start_minute, end_minute
+                FROM appointments
+                WHERE doctor_id = ? AND appointment_date = ? AND status != 'cancelled'
+            ''', (doctor_id, appointment_date_str)).fetchall()
+
+        entry = DoctorDayIntervals(rows)
+        with self._lock:
+            # Only cache if no mutation raced with the load
+            if generation == self._generation:
+                self._entries[key] = entry
+                if len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def conflicts(self, doctor_id, appointment_date_str, start_minute, end_minute):
+        """Get IDs of active appointments overlapping the given minutes"""
+        return self._get(doctor_id, appointment_date_str).overlapping(start_minute, end_minute)
+
+    def busy_intervals(self, doctor_id, appointment_date_str):
+        """Get the doctor-day's active (start, end) intervals in start order"""
+        return self._get(doctor_id, appointment_date_str).intervals()
+
+    def add(self, doctor_id, appointment_date_str, appointment_id, start_minute, end_minute):
+        """Record a newly booked appointment"""
+        with self._lock:
+            self._generation += 1
+            entry = self._entries.get((doctor_id, appointment_date_str))
+            if entry is not None:
+                entry.add(appointment_id, start_minute, end_minute)
+
+    def remove(self, doctor_id, appointment_date_str, appointment_id):
+        """Forget an appointment that was cancelled"""
+        with self._lock:
+            self._generation += 1
+            entry = self._entries.get((doctor_id, appointment_date_str))
+            if entry is not None:
+                entry.remove(appointment_id)
+
+    def invalidate(self, doctor_id=None, appointment_date_str=None):
+        """Drop one doctor-day, or everything when called without arguments"""
+        with self._lock:
+            self._generation += 1
+            if doctor_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop((doctor_id, appointment_date_str), None)
@@ -0,0 +1,98 @@
+from bisect import bisect_right
+
+
+def merge_intervals(intervals):
+    """Merge (start, end) intervals into a sorted list of disjoint intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def free_intervals(window_start, window_end, busy):
+    """Get the gaps of [window_start, window_end) not covered by busy intervals.
+
+    busy must be sorted and disjoint, as returned by merge_intervals().
+    """
+    gaps = []
+    current = window_start
+    for busy_start, busy_end in busy:
+        if busy_end <= current:
+            continue
+        if busy_start >= window_end:
+            break
+        if busy_start > current:
+            gaps.append((current, busy_start))
+        current = max(current, busy_end)
+    if current < window_end:
+        gaps.append((current, window_end))
+    return gaps
+
+
+def fit_starts(free, duration, step=1, anchor=0):
+    """Yield every start on the step grid (anchored at anchor) where
+    [start, start + duration) lies inside one free interval."""
+    for gap_start, gap_end in free:
+        start = gap_start + (anchor - gap_start) % step
+        while start + duration <= gap_end:
+            yield start
+            start += step
+
+
+def first_fit(free, duration, step=1, anchor=0):
+    """Get the first grid start of a free interval that fits duration, or None"""
+    return next(fit_starts(free, duration, step, anchor), None)
+
+
+class FreeList:
+    """Sorted disjoint free intervals supporting nearest-fit search and carving"""
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self, free=()):
+        self.starts = [start for start, _ in free]
+        self.ends = [end for _, end in free]
+
+    def nearest_fit(self, preferred, duration, earliest, latest, step=1, anchor=0):
+        """Get the start closest to preferred for a [start, start + duration) in
+        [earliest, latest) that fits in one free interval, or None.
+
+        Starts lie on the step grid anchored at anchor; ties go to the earlier start.
+        """
+        preferred = min(max(preferred, earliest), latest - duration)
+        best, best_distance = None, None
+        pivot = bisect_right(self.starts, preferred) - 1
+
+        # Intervals starting at or before preferred: latest feasible grid start
+        for i in range(pivot, -1, -1):
+            if self.ends[i] <= earliest:
+                break
+            start = min(preferred, self.ends[i] - duration, latest - duration)
+            start -= (start - anchor) % step
+            if start >= max(self.starts[i], earliest):
+                best, best_distance = start, preferred - start
+                break
+
+        # Intervals from the one holding preferred on: earliest feasible grid start
+        for i in range(max(pivot, 0), len(self.starts)):
+            start = max(self.starts[i], earliest, preferred)
+            start += (anchor - start) % step
+            if start + duration > latest:
+                break
+            if best_distance is not None and start - preferred >= best_distance:
+                break
+            if start + duration <= self.ends[i]:
+                best, best_distance = start, start - preferred
+                break
+        return best
+
+    def take(self, start, end):
+        """Remove [start, end) from the free interval that contains it"""
+        i = bisect_right(self.starts, start) - 1
+        gap_start, gap_end = self.starts[i], self.ends[i]
+        pieces = [piece for piece in ((gap_start, start), (end, gap_end)) if piece[0] < piece[1]]
+        self.starts[i:i + 1] = [piece[0] for piece in pieces]
+        self.ends[i:i + 1] = [piece[1] for piece in pieces]
@@ -0,0 +1,80 @@
+from collections import namedtuple
+from datetime import date, time
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value):
+    """Convert an ISO date string to a shared date object"""
+    return date.fromisoformat(value)
+
+
+@lru_cache(maxsize=2048)
+def parse_time(value):
+    """Convert an 'HH:MM[:SS]' string to a shared time object"""
+    return time.fromisoformat(value)
+
+
+class RowMapper:
+    """sqlite3 row factory that hydrates rows into model instances.
+
+    The model class provides _from_db(), returning a blank instance, and
+    optionally CONVERTERS mapping column names to value converters.
+    Columns matching a slot or settable property are assigned; others are
+    ignored. Without a model class, rows become named tuples keyed by
+    column name.
+    """
+
+    def __init__(self, model_cls=None, **context):
+        self.model_cls = model_cls
+        self.context = context
+        self._plans = {}
+
+    def __call__(self, cursor, row):
+        names = tuple(column[0] for column in cursor.description)
+        plan = self._plans.get(names)
+        if plan is None:
+            plan = self._plans[names] = self._build_plan(names)
+
+        if self.model_cls is None:
+            return plan._make(row)
+
+        instance = self.model_cls._from_db(**self.context)
+        for index, name, convert in plan:
+            value = row[index]
+            if convert is not None and value is not None:
+                value = convert(value)
+            setattr(instance, name, value)
+        return instance
+
+    def _build_plan(self, names):
+        if self.model_cls is None:
+            return namedtuple('Row', names, rename=True)
+
+        fields = set()
+        for klass in self.model_cls.__mro__:
+            fields.update(getattr(klass, '__slots__', ()))
+            fields.update(
+                name for name, attr in vars(klass).items()
+                if isinstance(attr, property) and attr.fset is not None
+            )
+        converters = getattr(self.model_cls, 'CONVERTERS', {})
+        return [
+            (index, name, converters.get(name))
+            for index, name in enumerate(names)
+            if name in fields
+        ]
+
+    def fetchone(self, cursor):
+        """Fetch the next row of an executed cursor through this mapper"""
+        cursor.row_factory = self
+        return cursor.fetchone()
+
+    def fetchall(self, cursor):
+        """Fetch all remaining rows of an executed cursor through this mapper"""
+        cursor.row_factory = self
+        return cursor.fetchall()
+
+
+# Aggregate and report rows
+named_rows = RowMapper()
@@ -0,0 +1,56 @@
+from src.utils.time_utils import MINUTES_PER_DAY
+
+
+def day_bitmap(hours, busy, slot_minutes):
+    """Encode a doctor-day as an int: bit i set when slot [i * slot_minutes,
+    (i + 1) * slot_minutes) lies inside working hours and overlaps no busy interval."""
+    if hours is None:
+        return 0
+    first = -(-hours[0] // slot_minutes)
+    last = hours[1] // slot_minutes
+    if last <= first:
+        return 0
+    bits = ((1 << (last - first)) - 1) << first
+
+    for start, end in busy:
+        low = start // slot_minutes
+        high = -(-end // slot_minutes)
+        if high > low:
+            bits &= ~(((1 << (high - low)) - 1) << low)
+    return bits
+
+
+def grid_bitmap(anchor, step, slot_minutes, limit=MINUTES_PER_DAY):
+    """Encode a start-time grid as an int: bit i set when i * slot_minutes lies on
+    anchor + k * step and before limit. slot_minutes must divide anchor and step."""
+    bits = 0
+    for minute in range(anchor % step, limit, step):
+        bits |= 1 << (minute // slot_minutes)
+    return bits
+
+
+def run_starts(bits, length):
+    """Get a bitmap of the positions that begin a run of length consecutive set bits"""
+    # Doubling: after each step bit i means bits i..i+covered-1 are all set
+    covered = 1
+    while covered < length:
+        shift = min(covered, length - covered)
+        bits &= bits >> shift
+        covered += shift
+    return bits
+
+
+def first_run(bits, length):
+    """Get the index of the first run of length set bits, or None"""
+    starts = run_starts(bits, length)
+    if not starts:
+        return None
+    return (starts & -starts).bit_length() - 1
+
+
+def iter_set_bits(bits):
+    """Yield the indexes of set bits in ascending order"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
@@ -0,0 +1,30 @@
+from datetime import time
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minutes(value):
+    """Convert a time or 'HH:MM[:SS]' string to minutes after midnight"""
+    if isinstance(value, str):
+        value = time.fromisoformat(value)
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(minutes):
+    """Convert minutes after midnight back to a time (wrapping past midnight)"""
+    minutes %= MINUTES_PER_DAY
+    return time(minutes // 60, minutes % 60)
+
+
+def time_str(value):
+    """Convert a time, time string or minute count to 'HH:MM'"""
+    if isinstance(value, int):
+        value = from_minutes(value)
+    elif isinstance(value, str):
+        value = time.fromisoformat(value)
+    return value.isoformat(timespec='minutes')
+
+
+def date_str(value):
+    """Convert a date (or date string) to ISO format"""
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
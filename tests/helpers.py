@@ -0,0 +1,29 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.database_config import DatabaseConfig
+from src.utils.database_manager import DatabaseManager
+
+class DatabaseTestCase(unittest.TestCase):
+    """Test case with its own database file in a throwaway directory.
+
+    setUp() provides db_path, db_config and (unless create_manager is
+    False) a DatabaseManager, which migrates the schema. The pool is
+    closed and the directory removed after any subclass tearDown().
+    """
+
+    create_manager = True
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.db_path = os.path.join(self.temp_dir, 'test.db')
+        self.db_config = DatabaseConfig(self.db_path)
+        self.addCleanup(self.db_config.close_pool)
+        if self.create_manager:
+            self.db_manager = DatabaseManager(self.db_config)
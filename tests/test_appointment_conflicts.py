@@ -6,15 +6,14 @@ from datetime import datetime, date, time, timedelta
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.utils.database_manager import DatabaseManager
+from tests.helpers import DatabaseTestCase
 from src.services.appointment_service import AppointmentService
 
-class TestAppointmentConflicts(unittest.TestCase):
+class TestAppointmentConflicts(DatabaseTestCase):
     def setUp(self):
         """Set up test database and services"""
-        # Use test database
-        self.db_manager = DatabaseManager()
-        self.appointment_service = AppointmentService()
+        super().setUp()
+        self.appointment_service = AppointmentService(self.db_manager)
         
         # Add test doctor
         self.doctor_id = self.db_manager.add_doctor(
@@ -29,19 +28,6 @@ class TestAppointmentConflicts(unittest.TestCase):
         # Test date (tomorrow)
         self.test_date = date.today() + timedelta(days=1)
     
-    def tearDown(self):
-        """Clean up test data"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        
-        # Clean up test data
-        cursor.execute('DELETE FROM appointments WHERE patient_id = ?', (self.patient_id,))
-        cursor.execute('DELETE FROM patients WHERE patient_id = ?', (self.patient_id,))
-        cursor.execute('DELETE FROM doctors WHERE doctor_id = ?', (self.doctor_id,))
-        
-        conn.commit()
-        conn.close()
-    
     def test_no_conflict_different_times(self):
         """Test that appointments at different times don't conflict"""
         # Book first appointment
@@ -92,26 +78,17 @@ class TestAppointmentConflicts(unittest.TestCase):
             "Dr. Test Specialist 2", "Neurology", "test2@hospital.com", "555-0002"
         )
         
-        try:
-            # Book appointment with first doctor
-            appointment_id1, message1 = self.db_manager.add_appointment(
-                self.patient_id, self.doctor_id, self.test_date, time(9, 0)
-            )
-            self.assertIsNotNone(appointment_id1, "First appointment should be created")
-            
-            # Book appointment with second doctor at same time (should not conflict)
-            appointment_id2, message2 = self.db_manager.add_appointment(
-                self.patient_id, doctor_id2, self.test_date, time(9, 0)
-            )
-            self.assertIsNotNone(appointment_id2, "Appointment with different doctor should not conflict")
-            
-        finally:
-            # Clean up second doctor
-            conn = self.db_manager.db_config.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM doctors WHERE doctor_id = ?', (doctor_id2,))
-            conn.commit()
-            conn.close()
+        # Book appointment with first doctor
+        appointment_id1, message1 = self.db_manager.add_appointment(
+            self.patient_id, self.doctor_id, self.test_date, time(9, 0)
+        )
+        self.assertIsNotNone(appointment_id1, "First appointment should be created")
+        
+        # Book appointment with second doctor at same time (should not conflict)
+        appointment_id2, message2 = self.db_manager.add_appointment(
+            self.patient_id, doctor_id2, self.test_date, time(9, 0)
+        )
+        self.assertIsNotNone(appointment_id2, "Appointment with different doctor should not conflict")
     
     def test_no_conflict_different_dates(self):
         """Test that appointments on different dates don't conflict"""
@@ -130,11 +107,11 @@ class TestAppointmentConflicts(unittest.TestCase):
         )
         self.assertIsNotNone(appointment_id2, "Appointment on different date should not conflict")
 
-class TestAppointmentService(unittest.TestCase):
+class TestAppointmentService(DatabaseTestCase):
     def setUp(self):
         """Set up test data for service tests"""
-        self.service = AppointmentService()
-        self.db_manager = DatabaseManager()
+        super().setUp()
+        self.service = AppointmentService(self.db_manager)
         
         # Add test data
         self.patient_id = self.db_manager.add_patient(
@@ -146,16 +123,6 @@ class TestAppointmentService(unittest.TestCase):
         )
         self.test_date = date.today() + timedelta(days=1)
     
-    def tearDown(self):
-        """Clean up test data"""
-        conn = self.db_manager.db_config.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM appointments WHERE patient_id = ?', (self.patient_id,))
-        cursor.execute('DELETE FROM patients WHERE patient_id = ?', (self.patient_id,))
-        cursor.execute('DELETE FROM doctors WHERE doctor_id = ?', (self.doctor_id,))
-        conn.commit()
-        conn.close()
-    
     def test_emergency_appointment_booking(self):
         """Test emergency appointment booking"""
         appointment_id, message = self.service.book_emergency_appointment(
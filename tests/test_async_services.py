@@ -0,0 +1,126 @@
+import unittest
+import sys
+import os
+import asyncio
+import time as timer
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.utils.database_manager import DatabaseManager
+from src.services.schedule_service import ScheduleService
+from src.services.waitlist_service import WaitlistService
+from src.services.async_services import (
+    AsyncAppointmentService, AsyncScheduleService, DatabaseExecutor
+)
+
+class TestAsyncServices(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.appointment_service = AsyncAppointmentService(self.db_manager)
+        self.schedule_service = AsyncScheduleService(self.db_manager)
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Async", "Cardiology", "async@hospital.com", "555-0700"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_ASYNC", "Async Patient", "async@patient.com", "555-0701", date(1990, 1, 1)
+        )
+        self.test_date = date.today() + timedelta(days=1)
+        while self.test_date.weekday() >= 5:
+            self.test_date += timedelta(days=1)
+        ScheduleService(self.db_manager).set_doctor_schedule(
+            self.doctor_id, self.test_date.strftime('%A'), time(9, 0), time(11, 0)
+        )
+
+    def tearDown(self):
+        self.appointment_service.executor.shutdown()
+
+    def test_book_list_cancel_roundtrip(self):
+        """Test that the async facade matches the blocking services"""
+        async def scenario():
+            appointment_id, _ = await self.appointment_service.book_appointment(
+                self.patient_id, self.doctor_id, self.test_date, time(9, 0)
+            )
+            slots = await self.schedule_service.get_doctor_availability(
+                self.doctor_id, self.test_date
+            )
+            appointments = await self.appointment_service.get_patient_appointments(self.patient_id)
+            cancelled = await self.appointment_service.cancel_appointment(appointment_id)
+            return appointment_id, slots, appointments, cancelled
+
+        appointment_id, slots, appointments, cancelled = asyncio.run(scenario())
+
+        self.assertIsNotNone(appointment_id)
+        self.assertEqual(slots, [time(9, 30), time(10, 0), time(10, 30)])
+        self.assertEqual([appt.appointment_id for appt in appointments], [appointment_id])
+        self.assertTrue(cancelled)
+
+    def test_durations_and_injected_waitlist(self):
+        """Test that visit lengths and a waitlist pass through to the blocking services"""
+        waitlist = WaitlistService(self.db_manager)
+        service = AsyncAppointmentService(self.db_manager, waitlist=waitlist)
+        waitlist_id = waitlist.add_to_waitlist(
+            self.patient_id, self.test_date, self.test_date, doctor_id=self.doctor_id
+        )
+
+        async def scenario():
+            appointment_id, _ = await service.book_appointment(
+                self.patient_id, self.doctor_id, self.test_date, time(9, 0), visit_type='new_patient'
+            )
+            hour_slots = await self.schedule_service.get_doctor_availability(
+                self.doctor_id, self.test_date, duration_minutes=60
+            )
+            await service.cancel_appointment(appointment_id)
+            return appointment_id, hour_slots
+
+        appointment_id, hour_slots = asyncio.run(scenario())
+
+        appointments = {appt.appointment_id: appt
+                        for appt in self.db_manager.get_doctor_appointments(self.doctor_id, self.test_date)}
+        self.assertEqual(appointments[appointment_id].duration_minutes, 60)
+        self.assertEqual(hour_slots, [time(10, 0)])
+        self.assertEqual(waitlist.get_entry(waitlist_id)['status'], 'booked')
+
+    def test_facades_share_one_executor(self):
+        """Test that facades on one database file share a pool-sized executor"""
+        other = AsyncAppointmentService(DatabaseManager(self.db_config))
+        self.assertIs(self.schedule_service.executor, self.appointment_service.executor)
+        self.assertIs(other.executor, self.appointment_service.executor)
+
+        self.appointment_service.executor.shutdown()
+        replacement = AsyncScheduleService(self.db_manager).executor
+        self.assertIsNot(replacement, self.appointment_service.executor)
+        replacement.shutdown()
+
+    def test_cancellation_interrupts_running_query(self):
+        """Test that cancelling a call interrupts its SQLite statement"""
+        def slow_query():
+            with self.db_config.connection() as conn:
+                return conn.execute('''
+                    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n)
+                    SELECT COUNT(*) FROM n
+                ''').fetchone()
+
+        # A single worker must be freed by the interrupt to serve the next call
+        executor = DatabaseExecutor(self.db_config, max_workers=1)
+        service = AsyncAppointmentService(self.db_manager, executor=executor)
+
+        async def scenario():
+            task = asyncio.ensure_future(executor.run(slow_query))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            started = timer.perf_counter()
+            await service.get_patient_appointments(self.patient_id)
+            return timer.perf_counter() - started
+
+        try:
+            self.assertLess(asyncio.run(scenario()), 5)
+        finally:
+            executor.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
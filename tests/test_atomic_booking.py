@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+import threading
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.utils.database_manager import BookingResult
+
+class TestAtomicBooking(DatabaseTestCase):
+    def setUp(self):
+        """Set up an isolated database with one doctor and patient"""
+        super().setUp()
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Atomic", "Cardiology", "atomic@hospital.com", "555-0300"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_ATOMIC", "Atomic Patient", "atomic@patient.com", "555-0301", date(1990, 1, 1)
+        )
+        self.test_date = date.today() + timedelta(days=1)
+
+    def test_booking_returns_structured_result(self):
+        """Test that a successful booking reports its ID and status"""
+        result = self.db_manager.book_appointment_slot(
+            self.patient_id, self.doctor_id, self.test_date, time(9, 0)
+        )
+        self.assertTrue(result.booked)
+        self.assertEqual(result.status, BookingResult.BOOKED)
+        self.assertIsNotNone(result.appointment_id)
+        self.assertEqual(result.conflicts, [])
+
+    def test_overlap_with_different_start_reports_conflict(self):
+        """Test that an overlap with a different start time is rejected"""
+        first = self.db_manager.book_appointment_slot(
+            self.patient_id, self.doctor_id, self.test_date, time(9, 0), 60
+        )
+        second = self.db_manager.book_appointment_slot(
+            self.patient_id, self.doctor_id, self.test_date, time(9, 45)
+        )
+        self.assertEqual(second.status, BookingResult.CONFLICT)
+        self.assertEqual(second.conflicts, [first.appointment_id])
+
+    def test_adjacent_slots_do_not_conflict(self):
+        """Test that back-to-back appointments are both accepted"""
+        first = self.db_manager.book_appointment_slot(
+            self.patient_id, self.doctor_id, self.test_date, time(9, 0)
+        )
+        second = self.db_manager.book_appointment_slot(
+            self.patient_id, self.doctor_id, self.test_date, time(9, 30)
+        )
+        self.assertTrue(first.booked)
+        self.assertTrue(second.booked)
+
+    def test_cancelled_slot_can_be_rebooked(self):
+        """Test that slot uniqueness ignores cancelled appointments"""
+        first = self.db_manager.book_appointment_slot(
+            self.patient_id, self.doctor_id, self.test_date, time(9, 0)
+        )
+        with self.db_config.transaction() as conn:
+            conn.execute(
+                "UPDATE appointments SET status = 'cancelled' WHERE appointment_id = ?",
+                (first.appointment_id,)
+            )
+
+        second = self.db_manager.book_appointment_slot(
+            self.patient_id, self.doctor_id, self.test_date, time(9, 0)
+        )
+        self.assertTrue(second.booked)
+
+    def test_concurrent_overlapping_bookings_admit_one(self):
+        """Test that racing workers cannot double-book overlapping slots"""
+        start_times = [time(10, 0), time(10, 10), time(10, 20), time(10, 5), time(10, 15)]
+        results = []
+        barrier = threading.Barrier(len(start_times))
+
+        def book(start):
+            barrier.wait()
+            results.append(self.db_manager.book_appointment_slot(
+                self.patient_id, self.doctor_id, self.test_date, start
+            ))
+
+        workers = [threading.Thread(target=book, args=(start,)) for start in start_times]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(sum(1 for result in results if result.booked), 1)
+
+if __name__ == '__main__':
+    unittest.main()
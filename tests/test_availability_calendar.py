@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.services.schedule_service import ScheduleService
+
+class TestAvailabilityCalendar(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.service = ScheduleService(self.db_manager)
+
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_GRID", "Grid Patient", "grid@patient.com", "555-1801", date(1990, 1, 1)
+        )
+        self.doctor_ids = []
+        for i in range(8):
+            doctor_id = self.db_manager.add_doctor(
+                f"Dr. Grid {i}", "Neurology", f"grid{i}@hospital.com", "555-1800"
+            )
+            for day in ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'):
+                self.service.set_doctor_schedule(doctor_id, day, time(9, 0), time(13, 0))
+                self.service.add_doctor_break(doctor_id, day, time(11, 0), time(11, 30))
+            self.doctor_ids.append(doctor_id)
+
+        self.start = date.today() + timedelta(days=1)
+        self.end = self.start + timedelta(days=13)
+        for offset, doctor_id in enumerate(self.doctor_ids):
+            day = self.start + timedelta(days=offset)
+            self.db_manager.add_appointment(self.patient_id, doctor_id, day, time(9, 30), 30)
+
+    def test_matches_per_doctor_availability(self):
+        """Test that the bulk grid equals per-doctor, per-day availability"""
+        grid = list(self.service.get_availability_calendar(self.doctor_ids, self.start, self.end))
+
+        self.assertEqual(len(grid), len(self.doctor_ids) * 10)
+        for doctor_id, day, slots in grid:
+            self.assertLess(day.weekday(), 5)
+            self.assertEqual(slots, self.service.get_doctor_availability(doctor_id, day))
+
+    def test_leave_day_skipped(self):
+        """Test that leave removes the doctor's day from the grid"""
+        leave_day = next(self.start + timedelta(days=offset) for offset in range(7)
+                         if (self.start + timedelta(days=offset)).weekday() < 5)
+        self.service.mark_doctor_leave(self.doctor_ids[0], leave_day)
+
+        days = [day for doctor_id, day, _ in self.service.get_availability_calendar(
+            self.doctor_ids[:1], self.start, self.end)]
+        self.assertNotIn(leave_day, days)
+        self.assertEqual(len(days), 9)
+
+    def test_fixed_statement_count(self):
+        """Test that the query count does not grow with doctors or days"""
+        self.db_manager.calendars.invalidate()
+        statements = []
+        with self.db_config.connection() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                for _ in self.service.get_availability_calendar(self.doctor_ids, self.start, self.end):
+                    pass
+            finally:
+                conn.set_trace_callback(None)
+
+        selects = [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+        self.assertLessEqual(len(selects), 6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.services.appointment_service import AppointmentService
+from src.services.schedule_service import ScheduleService
+
+class TestAvailabilityStore(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store = self.db_manager.availability
+        self.schedule_service = ScheduleService(self.db_manager)
+        self.appointment_service = AppointmentService(self.db_manager)
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Store", "Cardiology", "store@hospital.com", "555-1900"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_STORE", "Store Patient", "store@patient.com", "555-1901", date(1990, 1, 1)
+        )
+        for day in ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'):
+            self.schedule_service.set_doctor_schedule(self.doctor_id, day, time(9, 0), time(17, 0))
+        self.test_date = date.today() + timedelta(days=1)
+        while self.test_date.weekday() >= 5:
+            self.test_date += timedelta(days=1)
+        self.store.rebuild(horizon_days=14)
+
+    def _stored(self, day):
+        with self.db_config.connection() as conn:
+            return self.store.free_intervals(conn, self.doctor_id, day)
+
+    def test_rebuild_materializes_working_days(self):
+        """Test that rebuild stores working hours for working days only"""
+        self.assertEqual(self._stored(self.test_date), [(540, 1020)])
+        saturday = self.test_date + timedelta(days=(5 - self.test_date.weekday()) % 7)
+        self.assertEqual(self._stored(saturday), [])
+        self.assertIsNone(self._stored(date.today() + timedelta(days=30)))
+        self.assertEqual(self.store.verify(), [])
+
+    def test_booking_and_cancel_update_in_place(self):
+        """Test that booking and cancelling keep the table consistent"""
+        appointment_id, _ = self.db_manager.add_appointment(
+            self.patient_id, self.doctor_id, self.test_date, time(10, 0), 45
+        )
+        self.assertEqual(self._stored(self.test_date), [(540, 600), (645, 1020)])
+
+        self.appointment_service.cancel_appointment(appointment_id)
+        self.assertEqual(self._stored(self.test_date), [(540, 1020)])
+        self.assertEqual(self.store.verify(), [])
+
+    def test_schedule_break_and_leave_changes(self):
+        """Test that schedule writes refresh every affected date"""
+        day = self.test_date.strftime('%A')
+        self.schedule_service.add_doctor_break(self.doctor_id, day, time(12, 0), time(13, 0))
+        self.assertEqual(self._stored(self.test_date), [(540, 720), (780, 1020)])
+
+        self.schedule_service.set_doctor_schedule(self.doctor_id, day, time(8, 0), time(12, 30))
+        self.assertEqual(self._stored(self.test_date + timedelta(days=7)), [(480, 720)])
+
+        self.schedule_service.mark_doctor_leave(self.doctor_id, self.test_date)
+        self.assertEqual(self._stored(self.test_date), [])
+        self.assertEqual(self.store.verify(), [])
+
+    def test_refresh_reads_schedule_on_writer_connection(self):
+        """Test that a booking refreshes from schedule rows even when the calendar cache is stale"""
+        self.db_manager.calendars.get(self.doctor_id)
+        # Another process shortens the day; this process's cache still holds 9-17
+        with self.db_config.transaction() as conn:
+            conn.execute('''
+                UPDATE doctor_schedules SET end_time = '12:00' WHERE doctor_id = ? AND day_of_week = ?
+            ''', (self.doctor_id, self.test_date.strftime('%A')))
+
+        self.db_manager.add_appointment(self.patient_id, self.doctor_id, self.test_date, time(10, 0))
+        self.assertEqual(self._stored(self.test_date), [(540, 600), (630, 720)])
+
+    def test_rolled_back_write_leaves_table_unchanged(self):
+        """Test that the refresh shares the writer's transaction"""
+        with self.assertRaises(RuntimeError):
+            with self.db_config.transaction(immediate=True):
+                self.db_manager.book_appointment_slot(
+                    self.patient_id, self.doctor_id, self.test_date, time(9, 0)
+                )
+                raise RuntimeError("abort")
+        self.assertEqual(self._stored(self.test_date), [(540, 1020)])
+
+    def test_reads_match_computed_availability(self):
+        """Test that stored-interval reads equal the computed slots"""
+        self.db_manager.add_appointment(self.patient_id, self.doctor_id, self.test_date, time(9, 30), 30)
+        slots = self.schedule_service.get_doctor_availability(self.doctor_id, self.test_date)
+        self.assertEqual(slots, self.schedule_service._generate_available_slots(540, 1020, [], [(570, 600)]))
+
+    def test_verify_detects_drift_and_roll(self):
+        """Test that out-of-band writes are reported and roll advances the horizon"""
+        with self.db_config.transaction() as conn:
+            conn.execute('DELETE FROM doctor_free_intervals WHERE free_date = ?', (self.test_date.isoformat(),))
+        self.assertEqual(len(self.store.verify()), 1)
+
+        self.store.roll(today=date.today() + timedelta(days=3))
+        with self.db_config.connection() as conn:
+            start, end = self.store.horizon(conn)
+        self.assertEqual(end, (date.today() + timedelta(days=16)).isoformat())
+        self.assertEqual(len(self.store.verify()), 1 if self.test_date.isoformat() >= start else 0)
+
+if __name__ == '__main__':
+    unittest.main()
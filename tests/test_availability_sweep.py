@@ -0,0 +1,57 @@
+import unittest
+import sys
+import os
+import random
+import types
+from datetime import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.time_utils import from_minutes
+from src.services.schedule_service import ScheduleService
+
+def brute_force_slots(start_minute, end_minute, busy, duration, step):
+    """Every grid start whose visit overlaps no busy interval"""
+    return [
+        from_minutes(start)
+        for start in range(start_minute, end_minute - duration + 1, step)
+        if not any(busy_start < start + duration and busy_end > start for busy_start, busy_end in busy)
+    ]
+
+class TestAvailabilitySweep(unittest.TestCase):
+    def setUp(self):
+        # The sweep needs no database
+        self.service = ScheduleService.__new__(ScheduleService)
+
+    def test_is_lazy_generator(self):
+        """Test that slots are produced on demand"""
+        slots = self.service.iter_available_slots(540, 1020, [(720, 780)], [])
+        self.assertIsInstance(slots, types.GeneratorType)
+        self.assertEqual(next(slots), time(9, 0))
+
+    def test_overlapping_and_out_of_hours_busy(self):
+        """Test overlapping busy intervals and ones outside working hours"""
+        slots = self.service._generate_available_slots(
+            540, 720, [(480, 550), (600, 660)], [(590, 620), (700, 800)]
+        )
+        self.assertEqual(slots, [time(11, 0)])
+
+    def test_matches_brute_force(self):
+        """Test the sweep against a per-slot overlap check on random days"""
+        rng = random.Random(11)
+        for _ in range(300):
+            start, end = rng.choice((0, 480, 540)), rng.choice((720, 1020, 1440))
+            breaks = sorted((s, s + rng.choice((15, 30, 60)))
+                            for s in rng.sample(range(0, 1400, 5), rng.randrange(3)))
+            appointments = sorted((s, s + rng.choice((10, 15, 30, 45)))
+                                  for s in rng.sample(range(0, 1400, 5), rng.randrange(40)))
+            duration = rng.choice((15, 30, 60))
+            step = rng.choice((5, 15, 30, None))
+
+            self.assertEqual(
+                self.service._generate_available_slots(start, end, breaks, appointments, duration, step),
+                brute_force_slots(start, end, breaks + appointments, duration, step or duration)
+            )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.utils.intervals import FreeList
+from src.services.batch_scheduler import BatchScheduler, BookingRequest
+from src.services.schedule_service import ScheduleService
+
+class TestFreeList(unittest.TestCase):
+    def test_nearest_fit_and_take(self):
+        """Test nearest-fit search on both sides of the preferred time"""
+        free = FreeList([(540, 600), (630, 720)])
+        self.assertEqual(free.nearest_fit(560, 30, 540, 720), 560)
+        self.assertEqual(free.nearest_fit(590, 30, 540, 720), 570)
+        self.assertEqual(free.nearest_fit(610, 30, 540, 720), 630)
+        self.assertIsNone(free.nearest_fit(610, 30, 600, 650))
+
+        self.assertEqual(free.nearest_fit(590, 30, 540, 720, 30, 540), 570)
+        self.assertEqual(free.nearest_fit(605, 30, 540, 720, 30, 540), 630)
+        self.assertEqual(free.nearest_fit(563, 20, 540, 720, 15, 540), 570)
+        self.assertIsNone(free.nearest_fit(610, 30, 600, 650, 30, 540))
+
+        free.take(560, 590)
+        self.assertEqual(list(zip(free.starts, free.ends)), [(540, 560), (590, 600), (630, 720)])
+
+class TestBatchScheduler(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.scheduler = BatchScheduler(self.db_manager)
+        schedule_service = ScheduleService(self.db_manager)
+
+        self.test_date = date.today() + timedelta(days=1)
+        while self.test_date.weekday() >= 5:
+            self.test_date += timedelta(days=1)
+        day = self.test_date.strftime('%A')
+
+        self.first_id = self.db_manager.add_doctor(
+            "Dr. Batch", "Cardiology", "batch@hospital.com", "555-1400"
+        )
+        self.second_id = self.db_manager.add_doctor(
+            "Dr. Queue", "Cardiology", "queue@hospital.com", "555-1401"
+        )
+        for doctor_id in (self.first_id, self.second_id):
+            schedule_service.set_doctor_schedule(doctor_id, day, time(9, 0), time(10, 0))
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_BATCH", "Batch Patient", "batch@patient.com", "555-1402", date(1990, 1, 1)
+        )
+
+    def request(self, doctor_id=None, specialization=None, preferred=time(9, 0)):
+        return BookingRequest(
+            self.patient_id, self.test_date, time(9, 0), time(10, 0),
+            doctor_id=doctor_id, specialization=specialization, preferred_time=preferred
+        )
+
+    def test_constrained_requests_placed_first(self):
+        """Test that flexible requests yield to doctor-specific ones"""
+        requests = [
+            self.request(specialization="Cardiology"),
+            self.request(specialization="Cardiology"),
+            self.request(doctor_id=self.first_id),
+            self.request(doctor_id=self.first_id),
+        ]
+        placements = self.scheduler.schedule(requests)
+
+        self.assertTrue(all(placement.appointment_id for placement in placements))
+        self.assertEqual(
+            sorted((p.doctor_id, p.time_slot) for p in placements),
+            sorted([(self.first_id, time(9, 0)), (self.first_id, time(9, 30)),
+                    (self.second_id, time(9, 0)), (self.second_id, time(9, 30))])
+        )
+        booked = self.db_manager.get_doctor_appointments(self.second_id, self.test_date)
+        self.assertEqual(len(booked), 2)
+
+    def test_existing_bookings_and_overflow(self):
+        """Test that stored bookings are avoided and overflow is reported"""
+        self.db_manager.add_appointment(self.patient_id, self.first_id, self.test_date, time(9, 0))
+        placements = self.scheduler.schedule([
+            self.request(doctor_id=self.first_id, preferred=time(9, 10)),
+            self.request(doctor_id=self.first_id),
+        ])
+
+        self.assertEqual(placements[0].time_slot, time(9, 30))
+        self.assertEqual(placements[0].deviation_minutes, 20)
+        self.assertIsNone(placements[1].appointment_id)
+        self.assertTrue(self.db_manager._has_appointment_conflict(
+            self.first_id, self.test_date, time(9, 30), 30
+        ))
+
+if __name__ == '__main__':
+    unittest.main()
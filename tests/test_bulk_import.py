@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.utils.database_manager import BookingResult
+
+class TestBulkImport(DatabaseTestCase):
+    def setUp(self):
+        """Set up an isolated database with two doctors and a patient"""
+        super().setUp()
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Bulk", "Cardiology", "bulk@hospital.com", "555-0400"
+        )
+        self.other_doctor_id = self.db_manager.add_doctor(
+            "Dr. Other", "Neurology", "other@hospital.com", "555-0401"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_BULK", "Bulk Patient", "bulk@patient.com", "555-0402", date(1990, 1, 1)
+        )
+        self.test_date = date.today() + timedelta(days=1)
+
+    def test_results_follow_input_order(self):
+        """Test that each row gets a result in input order"""
+        rows = [
+            (self.patient_id, self.doctor_id, self.test_date, time(11, 0)),
+            (self.patient_id, self.doctor_id, self.test_date, time(9, 0)),
+            (self.patient_id, self.other_doctor_id, self.test_date, time(9, 0)),
+        ]
+        results = self.db_manager.add_appointments_bulk(rows)
+
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(result.booked for result in results))
+        booked = self.db_manager.get_doctor_appointments(self.doctor_id, self.test_date)
+        self.assertEqual(
+            {appt.appointment_id: appt.time_slot for appt in booked},
+            {results[0].appointment_id: time(11, 0), results[1].appointment_id: time(9, 0)}
+        )
+
+    def test_intra_batch_overlap_rejected(self):
+        """Test that overlapping rows within one batch admit only one"""
+        rows = [
+            (self.patient_id, self.doctor_id, self.test_date, time(9, 15)),
+            (self.patient_id, self.doctor_id, self.test_date, time(9, 0), 60),
+        ]
+        results = self.db_manager.add_appointments_bulk(rows)
+
+        self.assertEqual(results[0].status, BookingResult.CONFLICT)
+        self.assertTrue(results[1].booked)
+        self.assertEqual(results[0].conflicts, [results[1].appointment_id])
+
+    def test_overlap_with_existing_booking_rejected(self):
+        """Test that rows overlapping stored bookings are rejected"""
+        existing_id, _ = self.db_manager.add_appointment(
+            self.patient_id, self.doctor_id, self.test_date, time(10, 0)
+        )
+        rows = [
+            (self.patient_id, self.doctor_id, self.test_date, time(9, 45)),
+            (self.patient_id, self.doctor_id, self.test_date, time(10, 30)),
+        ]
+        results = self.db_manager.add_appointments_bulk(rows)
+
+        self.assertEqual(results[0].conflicts, [existing_id])
+        self.assertTrue(results[1].booked)
+
+    def test_invalid_rows_and_chunking(self):
+        """Test that bad rows are reported without affecting other chunks"""
+        rows = [
+            (self.patient_id, self.doctor_id, self.test_date, 'not a time'),
+            (self.patient_id, self.doctor_id, self.test_date, time(9, 0)),
+            (self.patient_id, self.doctor_id, self.test_date, time(9, 0)),
+            (self.patient_id, self.doctor_id, self.test_date, time(9, 30)),
+        ]
+        results = self.db_manager.add_appointments_bulk(iter(rows), chunk_size=2)
+
+        self.assertEqual(
+            [result.status for result in results],
+            [BookingResult.ERROR, BookingResult.BOOKED,
+             BookingResult.CONFLICT, BookingResult.BOOKED]
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.database_config import DatabaseConfig, ConnectionPool, PoolTimeoutError
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        """Create a pool over a throwaway database file"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'pool_test.db')
+        self.pool = ConnectionPool(self.db_path, size=2, timeout=0.2)
+
+        with self.pool.transaction() as conn:
+            conn.execute('CREATE TABLE items (item_id INTEGER PRIMARY KEY, name TEXT)')
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_pragmas_applied_once_per_connection(self):
+        """Test that pooled connections use WAL and the configured busy timeout"""
+        with self.pool.connection() as conn:
+            self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+            self.assertEqual(conn.execute('PRAGMA busy_timeout').fetchone()[0], 5000)
+
+    def test_same_thread_reuses_connection(self):
+        """Test that nested and repeated checkouts on one thread share a connection"""
+        with self.pool.connection() as outer:
+            with self.pool.connection() as inner:
+                self.assertIs(outer, inner)
+
+        with self.pool.connection() as again:
+            self.assertIs(outer, again)
+
+    def test_pool_size_is_bounded(self):
+        """Test that checkouts beyond the pool size time out"""
+        held = threading.Event()
+        done = threading.Event()
+
+        def hold_connection():
+            with self.pool.connection():
+                held.set()
+                done.wait()
+
+        workers = [threading.Thread(target=hold_connection) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+            held.wait()
+            held.clear()
+
+        try:
+            with self.assertRaises(PoolTimeoutError):
+                self.pool.acquire()
+        finally:
+            done.set()
+            for worker in workers:
+                worker.join()
+
+    def test_transaction_rolls_back_on_error(self):
+        """Test that a failing transaction leaves no partial writes"""
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.pool.transaction() as conn:
+                conn.execute("INSERT INTO items (item_id, name) VALUES (1, 'first')")
+                conn.execute("INSERT INTO items (item_id, name) VALUES (1, 'duplicate')")
+
+        with self.pool.connection() as conn:
+            count = conn.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_nested_transaction_joins_outer(self):
+        """Test that an inner transaction commits only with the outer one"""
+        with self.assertRaises(RuntimeError):
+            with self.pool.transaction() as conn:
+                with self.pool.transaction() as inner:
+                    inner.execute("INSERT INTO items (name) VALUES ('nested')")
+                raise RuntimeError("abort outer transaction")
+
+        with self.pool.connection() as conn:
+            count = conn.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_after_commit_waits_for_outermost_transaction(self):
+        """Test that commit hooks run after the outer commit and rollback hooks on rollback"""
+        events = []
+        self.pool.after_commit(lambda: events.append('immediate'))
+        with self.pool.transaction():
+            with self.pool.transaction():
+                self.pool.after_commit(lambda: events.append('committed'), lambda: events.append('x'))
+            self.assertEqual(events, ['immediate'])
+        self.assertEqual(events, ['immediate', 'committed'])
+
+        with self.assertRaises(RuntimeError):
+            with self.pool.transaction():
+                self.pool.after_commit(lambda: events.append('x'), lambda: events.append('rolled back'))
+                raise RuntimeError("abort")
+        self.assertEqual(events, ['immediate', 'committed', 'rolled back'])
+
+    def test_configs_share_pool_per_file(self):
+        """Test that configs for the same file share one pool"""
+        first = DatabaseConfig(self.db_path)
+        second = DatabaseConfig(self.db_path)
+        try:
+            self.assertIs(first.pool, second.pool)
+        finally:
+            first.close_pool()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.services.appointment_service import AppointmentService
+from src.services.schedule_service import ScheduleService
+
+class TestDoctorCalendar(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.appointment_service = AppointmentService(self.db_manager)
+        self.schedule_service = ScheduleService(self.db_manager)
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Calendar", "Cardiology", "calendar@hospital.com", "555-1200"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_CALENDAR", "Calendar Patient", "calendar@patient.com", "555-1201", date(1990, 1, 1)
+        )
+        self.monday = date.today() + timedelta(days=7 - date.today().weekday())
+
+    def is_available(self, day):
+        return self.appointment_service._is_doctor_available(self.doctor_id, day)
+
+    def test_unscheduled_doctor_keeps_weekday_default(self):
+        """Test that doctors without a schedule work Monday to Friday"""
+        self.assertTrue(self.is_available(self.monday))
+        self.assertFalse(self.is_available(self.monday + timedelta(days=5)))
+
+    def test_schedule_and_leave_invalidate_cache(self):
+        """Test that schedule writes are reflected in booking"""
+        self.assertTrue(self.is_available(self.monday + timedelta(days=1)))
+
+        self.schedule_service.set_doctor_schedule(self.doctor_id, "Monday", time(9, 0), time(12, 0))
+        self.assertFalse(self.is_available(self.monday + timedelta(days=1)))
+        self.assertTrue(self.is_available(self.monday))
+
+        self.schedule_service.mark_doctor_leave(self.doctor_id, self.monday, "Conference")
+        appointment_id, message = self.appointment_service.book_appointment(
+            self.patient_id, self.doctor_id, self.monday, time(9, 0)
+        )
+        self.assertIsNone(appointment_id)
+        self.assertEqual(message, "Doctor is not available on this date")
+
+    def test_date_overrides(self):
+        """Test that overrides open or close individual dates"""
+        saturday = self.monday + timedelta(days=5)
+        self.schedule_service.set_doctor_schedule(self.doctor_id, "Monday", time(9, 0), time(12, 0))
+        self.schedule_service.set_date_override(self.doctor_id, saturday, time(10, 0), time(11, 0))
+        self.schedule_service.set_date_override(self.doctor_id, self.monday)
+
+        self.assertTrue(self.is_available(saturday))
+        self.assertFalse(self.is_available(self.monday))
+
+        appointment_id, _ = self.appointment_service.book_appointment(
+            self.patient_id, self.doctor_id, saturday, time(9, 0)
+        )
+        slots = {appt.time_slot for appt in self.appointment_service.get_patient_appointments(self.patient_id)
+                 if appt.appointment_id == appointment_id}
+        self.assertEqual(slots, {time(10, 0)})
+
+    def test_availability_honours_leave_and_overrides(self):
+        """Test that listed availability matches booking on leave and closed days"""
+        self.schedule_service.set_doctor_schedule(self.doctor_id, "Monday", time(9, 0), time(12, 0))
+        next_monday = self.monday + timedelta(days=7)
+        self.schedule_service.mark_doctor_leave(self.doctor_id, self.monday, "Conference")
+        self.schedule_service.set_date_override(self.doctor_id, next_monday)
+
+        for day in (self.monday, next_monday):
+            self.assertFalse(self.is_available(day))
+            self.assertEqual(self.schedule_service.get_doctor_availability(self.doctor_id, day), [])
+        self.assertEqual(
+            len(self.schedule_service.get_doctor_availability(self.doctor_id, self.monday + timedelta(days=14))),
+            6
+        )
+
+    def test_hot_path_skips_database(self):
+        """Test that a warm calendar answers without touching the database"""
+        self.schedule_service.set_doctor_schedule(self.doctor_id, "Monday", time(9, 0), time(12, 0))
+        self.is_available(self.monday)
+
+        with mock.patch.object(self.db_config, 'connection', side_effect=AssertionError):
+            self.assertTrue(self.is_available(self.monday))
+
+    def test_legacy_day_names(self):
+        """Test that stored day names in another case load and unknown ones are skipped"""
+        with self.db_config.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO doctor_schedules (doctor_id, day_of_week, start_time, end_time)
+                VALUES (?, ?, '09:00', '12:00')
+            ''', [(self.doctor_id, 'monday'), (self.doctor_id, 'Someday')])
+
+        with self.assertLogs('src.utils.doctor_calendar', 'WARNING'):
+            self.assertTrue(self.is_available(self.monday))
+        self.assertFalse(self.is_available(self.monday + timedelta(days=1)))
+        appointment_id, message = self.appointment_service.book_appointment(
+            self.patient_id, self.doctor_id, self.monday, time(9, 0)
+        )
+        self.assertIsNotNone(appointment_id, message)
+
+        # Rewriting the day replaces the legacy row with the canonical spelling
+        self.schedule_service.set_doctor_schedule(self.doctor_id, "MONDAY", time(10, 0), time(11, 0))
+        with self.db_config.connection() as conn:
+            rows = conn.execute('''
+                SELECT day_of_week, start_time FROM doctor_schedules
+                WHERE doctor_id = ? AND day_of_week != 'Someday'
+            ''', (self.doctor_id,)).fetchall()
+        self.assertEqual(rows, [('Monday', '10:00')])
+
+    def test_unknown_day_name_rejected(self):
+        """Test that schedule writes reject names that are not days"""
+        with self.assertRaises(ValueError):
+            self.schedule_service.set_doctor_schedule(self.doctor_id, "Mon", time(9, 0), time(12, 0))
+        with self.assertRaises(ValueError):
+            self.schedule_service.add_doctor_break(self.doctor_id, "Funday", time(12, 0), time(13, 0))
+
+if __name__ == '__main__':
+    unittest.main()
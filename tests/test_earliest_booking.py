@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+from datetime import date, datetime, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.services.appointment_service import AppointmentService
+from src.services.schedule_service import ScheduleService
+
+class TestEarliestBooking(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.service = AppointmentService(self.db_manager)
+        schedule_service = ScheduleService(self.db_manager)
+
+        self.test_date = date.today() + timedelta(days=1)
+        while self.test_date.weekday() >= 5:
+            self.test_date += timedelta(days=1)
+        day = self.test_date.strftime('%A')
+
+        self.first_id = self.db_manager.add_doctor(
+            "Dr. First", "Cardiology", "first@hospital.com", "555-1000"
+        )
+        self.second_id = self.db_manager.add_doctor(
+            "Dr. Second", "Cardiology", "second@hospital.com", "555-1001"
+        )
+        self.neuro_id = self.db_manager.add_doctor(
+            "Dr. Neuro", "Neurology", "neuro@hospital.com", "555-1002"
+        )
+        schedule_service.set_doctor_schedule(self.first_id, day, time(9, 0), time(10, 0))
+        schedule_service.set_doctor_schedule(self.second_id, day, time(8, 30), time(12, 0))
+        schedule_service.set_doctor_schedule(self.neuro_id, day, time(7, 0), time(12, 0))
+
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_EARLY", "Early Patient", "early@patient.com", "555-1003", date(1990, 1, 1)
+        )
+        self.after = datetime.combine(self.test_date, time(0, 0))
+
+    def booked_slot(self, appointment_id):
+        appointments = self.service.get_patient_appointments(self.patient_id)
+        appointment = next(appt for appt in appointments if appt.appointment_id == appointment_id)
+        return appointment.doctor_id, appointment.appointment_date, appointment.time_slot
+
+    def test_picks_earliest_doctor_in_specialization(self):
+        """Test that the globally earliest slot is booked"""
+        appointment_id, _ = self.service.book_earliest_by_specialization(
+            self.patient_id, "Cardiology", self.after, horizon_days=7
+        )
+        self.assertEqual(
+            self.booked_slot(appointment_id), (self.second_id, self.test_date, time(8, 30))
+        )
+
+    def test_moves_to_next_candidate_when_slot_taken(self):
+        """Test that taken slots push the search to the next earliest doctor"""
+        self.db_manager.add_appointment(
+            self.patient_id, self.second_id, self.test_date, time(8, 30), 60
+        )
+        appointment_id, _ = self.service.book_earliest_by_specialization(
+            self.patient_id, "Cardiology", self.after, horizon_days=7
+        )
+        self.assertEqual(
+            self.booked_slot(appointment_id), (self.first_id, self.test_date, time(9, 0))
+        )
+
+    def test_recovers_from_lost_race(self):
+        """Test that a stale free slot falls back instead of failing"""
+        # Warm the cache, then book behind its back on the same connection
+        self.db_manager._has_appointment_conflict(self.second_id, self.test_date, time(8, 30), 30)
+        with self.db_config.transaction() as conn:
+            conn.execute('''
+                INSERT INTO appointments (patient_id, doctor_id, appointment_date, time_slot)
+                VALUES (?, ?, ?, '08:30')
+            ''', (self.patient_id, self.second_id, self.test_date.isoformat()))
+
+        appointment_id, _ = self.service.book_earliest_by_specialization(
+            self.patient_id, "Cardiology", self.after, horizon_days=7
+        )
+        self.assertEqual(
+            self.booked_slot(appointment_id), (self.first_id, self.test_date, time(9, 0))
+        )
+
+    def test_rounds_after_up_to_slot_grid(self):
+        """Test that an off-grid search start books the next grid slot"""
+        appointment_id, _ = self.service.book_earliest_by_specialization(
+            self.patient_id, "Cardiology", datetime.combine(self.test_date, time(9, 7)),
+            horizon_days=7
+        )
+        self.assertEqual(
+            self.booked_slot(appointment_id), (self.first_id, self.test_date, time(9, 30))
+        )
+
+    def test_no_doctors_in_specialization(self):
+        """Test the message when nobody can be booked"""
+        appointment_id, message = self.service.book_earliest_by_specialization(
+            self.patient_id, "Dermatology", self.after, horizon_days=7
+        )
+        self.assertIsNone(appointment_id)
+        self.assertIn("Dermatology", message)
+
+if __name__ == '__main__':
+    unittest.main()
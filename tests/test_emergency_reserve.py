@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+from datetime import date, datetime, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.utils.database_manager import BookingResult
+from src.services.emergency_reserve import EmergencyReserve
+from src.services.appointment_service import AppointmentService
+
+class TestEmergencyReserve(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.reserve = EmergencyReserve(self.db_manager)
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Reserve", "Emergency Medicine", "reserve@hospital.com", "555-1300"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_RESERVE", "Reserve Patient", "reserve@patient.com", "555-1301", date(1990, 1, 1)
+        )
+        self.test_date = date.today() + timedelta(days=1)
+        while self.test_date.weekday() >= 5:
+            self.test_date += timedelta(days=1)
+        self.morning = datetime.combine(self.test_date, time(8, 0))
+
+    def test_reserve_blocks_regular_booking(self):
+        """Test that held reserve slots are unavailable to regular bookings"""
+        self.assertEqual(self.reserve.replenish(self.test_date), 2)
+
+        result = self.db_manager.book_appointment_slot(
+            self.patient_id, self.doctor_id, self.test_date, time(10, 0)
+        )
+        self.assertEqual(result.status, BookingResult.CONFLICT)
+        self.assertEqual(self.reserve.replenish(self.test_date), 2)
+
+    def test_allocate_pops_earliest_and_tracks_metrics(self):
+        """Test that allocation claims reserves in start order"""
+        self.reserve.replenish(self.test_date)
+
+        first = self.reserve.allocate(self.patient_id, "Emergency Medicine", now=self.morning)
+        second = self.reserve.allocate(self.patient_id, "Emergency Medicine", now=self.morning)
+        third = self.reserve.allocate(self.patient_id, "Emergency Medicine", now=self.morning)
+
+        self.assertTrue(first.booked and second.booked)
+        self.assertFalse(third.booked)
+        booked = self.db_manager.get_doctor_appointments(self.doctor_id, self.test_date)
+        self.assertEqual(
+            [(appt.time_slot, appt.status.value) for appt in booked],
+            [(time(10, 0), 'emergency'), (time(15, 0), 'emergency')]
+        )
+        metrics = self.reserve.metrics()
+        self.assertEqual((metrics['hits'], metrics['misses'], metrics['held']), (2, 1, 0))
+        self.assertAlmostEqual(metrics['hit_rate'], 66.67)
+
+    def test_release_returns_capacity_to_regular_booking(self):
+        """Test that unclaimed reserves are released at the cut-off"""
+        self.reserve.replenish(self.test_date)
+
+        released = self.reserve.release_expired(now=datetime.combine(self.test_date, time(9, 50)))
+        self.assertEqual(released, 1)
+        result = self.db_manager.book_appointment_slot(
+            self.patient_id, self.doctor_id, self.test_date, time(10, 0)
+        )
+        self.assertTrue(result.booked)
+        self.assertEqual(self.reserve.metrics()['held'], 1)
+
+    def test_service_uses_attached_reserve(self):
+        """Test that specialization emergency booking draws on the reserve first"""
+        today = date.today()
+        reserve_at = datetime.now() + timedelta(hours=1)
+        if today.weekday() >= 5 or reserve_at.date() != today:
+            self.skipTest("Reserve needs a working day with an hour left")
+        reserve = EmergencyReserve(
+            self.db_manager, reserve_times=(reserve_at.time().replace(second=0, microsecond=0),)
+        )
+        reserve.replenish(today)
+        service = AppointmentService(self.db_manager, emergency_reserve=reserve)
+
+        appointment_id, message = service.book_emergency_by_specialization(
+            self.patient_id, "Emergency Medicine"
+        )
+        self.assertIsNotNone(appointment_id)
+        self.assertEqual(message, "Emergency reserve slot allocated")
+        self.assertEqual(reserve.metrics()['hits'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+from itertools import islice
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.services.schedule_service import ScheduleService
+
+class TestHorizonSearch(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.schedule_service = ScheduleService(self.db_manager)
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Horizon", "Cardiology", "horizon@hospital.com", "555-1100"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_HORIZON", "Horizon Patient", "horizon@patient.com", "555-1101", date(1990, 1, 1)
+        )
+
+        # Next Monday, with Monday and Wednesday clinics
+        self.monday = date.today() + timedelta(days=7 - date.today().weekday())
+        self.schedule_service.set_doctor_schedule(self.doctor_id, "Monday", time(9, 0), time(10, 0))
+        self.schedule_service.set_doctor_schedule(self.doctor_id, "Wednesday", time(14, 0), time(15, 0))
+        self.schedule_service.add_doctor_break(self.doctor_id, "Wednesday", time(14, 0), time(14, 30))
+
+    def test_openings_follow_weekly_template(self):
+        """Test that openings span days using hours, breaks and bookings"""
+        self.db_manager.add_appointment(self.patient_id, self.doctor_id, self.monday, time(9, 0))
+        wednesday = self.monday + timedelta(days=2)
+
+        openings = list(islice(self.schedule_service.find_openings(self.doctor_id, self.monday), 3))
+        self.assertEqual(openings, [
+            (self.monday, time(9, 30)),
+            (wednesday, time(14, 30)),
+            (self.monday + timedelta(days=7), time(9, 0)),
+        ])
+
+    def test_leave_days_are_skipped(self):
+        """Test that leave removes a whole day from the horizon"""
+        self.schedule_service.mark_doctor_leave(self.doctor_id, self.monday, "Conference")
+
+        first = next(self.schedule_service.find_openings(self.doctor_id, self.monday))
+        self.assertEqual(first, (self.monday + timedelta(days=2), time(14, 30)))
+
+    def test_horizon_limits_search(self):
+        """Test that nothing is yielded past the horizon"""
+        openings = list(self.schedule_service.find_openings(
+            self.doctor_id, self.monday, horizon_days=1
+        ))
+        self.assertEqual(openings, [(self.monday, time(9, 0)), (self.monday, time(9, 30))])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+import sqlite3
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.utils.database_manager import DatabaseManager
+from src.utils.interval_index import DoctorDayIntervals
+from src.utils.time_utils import date_str
+from src.services.appointment_service import AppointmentService
+
+class TestDoctorDayIntervals(unittest.TestCase):
+    def test_overlapping_uses_half_open_intervals(self):
+        """Test overlap queries against sorted intervals"""
+        intervals = DoctorDayIntervals([(2, 600, 630), (1, 540, 600), (3, 660, 720)])
+
+        self.assertEqual(intervals.overlapping(570, 615), [1, 2])
+        self.assertEqual(intervals.overlapping(630, 660), [])
+        self.assertEqual(intervals.overlapping(700, 701), [3])
+
+        intervals.add(4, 630, 660)
+        intervals.remove(1)
+        self.assertEqual(intervals.overlapping(540, 720), [2, 4, 3])
+
+class TestIntervalIndex(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.service = AppointmentService(self.db_manager)
+        self.index = self.db_manager.interval_index
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Index", "Cardiology", "index@hospital.com", "555-0600"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_INDEX", "Index Patient", "index@patient.com", "555-0601", date(1990, 1, 1)
+        )
+        self.test_date = date.today() + timedelta(days=1)
+
+    def has_conflict(self, start):
+        return self.db_manager._has_appointment_conflict(
+            self.doctor_id, self.test_date, start, 30
+        )
+
+    def test_managers_share_one_index(self):
+        """Test that managers on the same file see each other's bookings"""
+        other_manager = DatabaseManager(self.db_config)
+        self.assertIs(other_manager.interval_index, self.index)
+
+        self.assertFalse(self.has_conflict(time(9, 0)))
+        other_manager.add_appointment(self.patient_id, self.doctor_id, self.test_date, time(9, 0))
+        self.assertTrue(self.has_conflict(time(9, 0)))
+
+    def test_cancel_frees_cached_interval(self):
+        """Test that cancelling through the service updates the index"""
+        appointment_id, _ = self.db_manager.add_appointment(
+            self.patient_id, self.doctor_id, self.test_date, time(10, 0)
+        )
+        self.assertTrue(self.has_conflict(time(10, 0)))
+
+        self.service.cancel_appointment(appointment_id)
+        hits = self.index.hits
+        self.assertFalse(self.has_conflict(time(10, 0)))
+        self.assertEqual(self.index.hits, hits + 1)
+
+    def test_rolled_back_outer_transaction_leaves_no_interval(self):
+        """Test that a booking joined to a rolled-back transaction does not stay cached"""
+        self.assertFalse(self.has_conflict(time(9, 0)))
+
+        with self.assertRaises(RuntimeError):
+            with self.db_config.transaction(immediate=True):
+                result = self.db_manager.book_appointment_slot(
+                    self.patient_id, self.doctor_id, self.test_date, time(9, 0)
+                )
+                self.assertTrue(result.booked)
+                raise RuntimeError("abort outer transaction")
+
+        self.assertFalse(self.has_conflict(time(9, 0)))
+
+    def test_external_write_detected_by_data_version(self):
+        """Test that commits from another connection invalidate the cache"""
+        self.assertFalse(self.has_conflict(time(11, 0)))
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            INSERT INTO appointments (patient_id, doctor_id, appointment_date, time_slot)
+            VALUES (?, ?, ?, '11:00')
+        ''', (self.patient_id, self.doctor_id, date_str(self.test_date)))
+        conn.commit()
+        conn.close()
+
+        self.assertTrue(self.has_conflict(time(11, 0)))
+
+if __name__ == '__main__':
+    unittest.main()
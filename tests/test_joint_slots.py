@@ -0,0 +1,108 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.utils.slot_bitmap import day_bitmap, grid_bitmap, first_run, run_starts, iter_set_bits
+from src.services.schedule_service import ScheduleService
+
+class TestSlotBitmap(unittest.TestCase):
+    def test_day_bitmap(self):
+        """Test that working hours set bits and busy intervals clear overlapped slots"""
+        bits = day_bitmap((540, 720), [(600, 615), (690, 760)], 30)
+        self.assertEqual(list(iter_set_bits(bits)), [18, 19, 21, 22])
+        self.assertEqual(day_bitmap(None, [], 30), 0)
+
+    def test_grid_bitmap(self):
+        """Test that grid starts are marked at a finer unit"""
+        bits = grid_bitmap(550, 30, 10, limit=660)
+        self.assertEqual(list(iter_set_bits(bits)), list(range(1, 66, 3)))
+
+    def test_runs(self):
+        """Test finding runs of consecutive free slots"""
+        bits = 0b1111_0111_0011
+        self.assertEqual(first_run(bits, 1), 0)
+        self.assertEqual(first_run(bits, 3), 4)
+        self.assertEqual(list(iter_set_bits(run_starts(bits, 3))), [4, 8, 9])
+        self.assertIsNone(first_run(bits, 5))
+
+class TestJointSlots(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.service = ScheduleService(self.db_manager)
+
+        self.doctor_ids = [
+            self.db_manager.add_doctor(f"Dr. Joint {i}", "Oncology", f"joint{i}@hospital.com", "555-1700")
+            for i in range(3)
+        ]
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_JOINT", "Joint Patient", "joint@patient.com", "555-1701", date(1990, 1, 1)
+        )
+        self.test_date = date.today() + timedelta(days=1)
+        day = self.test_date.strftime('%A')
+        for doctor_id in self.doctor_ids:
+            self.service.set_doctor_schedule(doctor_id, day, time(9, 0), time(12, 0))
+
+    def test_intersects_bookings_and_breaks(self):
+        """Test that only times free for every doctor are returned"""
+        day = self.test_date.strftime('%A')
+        self.db_manager.add_appointment(self.patient_id, self.doctor_ids[0], self.test_date, time(9, 0), 60)
+        self.db_manager.add_appointment(self.patient_id, self.doctor_ids[1], self.test_date, time(11, 0), 30)
+        self.service.add_doctor_break(self.doctor_ids[2], day, time(10, 30), time(11, 0))
+
+        slots = self.service.find_joint_slots(self.doctor_ids, (self.test_date, self.test_date), 30)
+        self.assertEqual(slots, [(self.test_date, time(10, 0)), (self.test_date, time(11, 30))])
+        self.assertEqual(
+            self.service.find_joint_slots(self.doctor_ids, (self.test_date, self.test_date), 60), []
+        )
+
+    def test_leave_removes_day_and_limit(self):
+        """Test that one doctor's leave blocks the day and limit stops early"""
+        next_day = self.test_date + timedelta(days=1)
+        for doctor_id in self.doctor_ids:
+            self.service.set_date_override(doctor_id, next_day, time(9, 0), time(10, 0))
+        self.service.set_date_override(self.doctor_ids[1], self.test_date)
+
+        slots = self.service.find_joint_slots(self.doctor_ids, (self.test_date, next_day), 30)
+        self.assertEqual(slots, [(next_day, time(9, 0)), (next_day, time(9, 30))])
+        self.assertEqual(len(self.service.find_joint_slots(
+            self.doctor_ids[:1], (self.test_date, next_day), 30, limit=2
+        )), 2)
+
+    def test_mixed_granularity_stays_on_every_grid(self):
+        """Test that a 15-minute doctor and a 30-minute doctor only meet on shared grid starts"""
+        self.service.set_slot_granularity(self.doctor_ids[0], 15)
+        self.db_manager.add_appointment(self.patient_id, self.doctor_ids[0], self.test_date, time(9, 0), 15)
+
+        slots = self.service.find_joint_slots(self.doctor_ids[:2], (self.test_date, self.test_date), 45)
+        self.assertEqual(slots[0], (self.test_date, time(9, 30)))
+
+    def test_starts_follow_each_doctors_anchor(self):
+        """Test that a schedule starting at 9:10 yields starts on its own grid"""
+        day = self.test_date.strftime('%A')
+        self.service.set_doctor_schedule(self.doctor_ids[0], day, time(9, 10), time(11, 10))
+        self.service.set_doctor_schedule(self.doctor_ids[1], day, time(9, 10), time(11, 10))
+
+        slots = self.service.find_joint_slots(self.doctor_ids[:2], (self.test_date, self.test_date), 30)
+        self.assertEqual([slot for _, slot in slots], [time(9, 10), time(9, 40), time(10, 10), time(10, 40)])
+
+        # Against a 9:00-anchored doctor there is no start on both grids
+        self.assertEqual(self.service.find_joint_slots(
+            self.doctor_ids[1:], (self.test_date, self.test_date), 30
+        ), [])
+
+    def test_unscheduled_doctor_has_no_joint_slots(self):
+        """Test that a doctor without a schedule is unavailable, as in get_doctor_availability()"""
+        unscheduled = self.db_manager.add_doctor(
+            "Dr. Joint Unscheduled", "Oncology", "joint-none@hospital.com", "555-1702"
+        )
+        self.assertEqual(self.service.get_doctor_availability(unscheduled, self.test_date), [])
+        self.assertEqual(self.service.find_joint_slots(
+            [self.doctor_ids[0], unscheduled], (self.test_date, self.test_date), 30
+        ), [])
+
+if __name__ == '__main__':
+    unittest.main()
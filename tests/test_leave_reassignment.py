@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.services.schedule_service import ScheduleService
+from src.utils.doctor_calendar import DAY_NAMES
+
+class TestLeaveReassignment(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.schedule_service = ScheduleService(self.db_manager)
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Away", "Cardiology", "away@hospital.com", "555-2000"
+        )
+        self.peer_id = self.db_manager.add_doctor(
+            "Dr. Cover", "Cardiology", "cover@hospital.com", "555-2001"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_LEAVE", "Leave Patient", "leave@patient.com", "555-2002", date(1990, 1, 1)
+        )
+        for doctor_id in (self.doctor_id, self.peer_id):
+            for day in DAY_NAMES:
+                self.schedule_service.set_doctor_schedule(doctor_id, day, time(9, 0), time(17, 0))
+        self.test_date = date.today() + timedelta(days=1)
+        self.db_manager.availability.rebuild(horizon_days=14)
+
+    def _book(self, doctor_id, day, slot, duration=30):
+        appointment_id, _ = self.db_manager.add_appointment(
+            self.patient_id, doctor_id, day, slot, duration
+        )
+        return appointment_id
+
+    def _appointment(self, appointment_id):
+        with self.db_config.connection() as conn:
+            return conn.execute('''
+                SELECT doctor_id, appointment_date, time_slot, status FROM appointments
+                WHERE appointment_id = ?
+            ''', (appointment_id,)).fetchone()
+
+    def test_moves_to_same_doctor_after_leave(self):
+        """Test that displaced appointments go to the doctor's first day back"""
+        first = self._book(self.doctor_id, self.test_date, time(10, 0))
+        second = self._book(self.doctor_id, self.test_date + timedelta(days=1), time(11, 0))
+        end_date = self.test_date + timedelta(days=1)
+
+        report = self.schedule_service.mark_leave_range(self.doctor_id, self.test_date, end_date)
+
+        self.assertEqual(report.leave_days, 2)
+        self.assertEqual(len(report.reassigned), 2)
+        day_back = (end_date + timedelta(days=1)).isoformat()
+        self.assertEqual(self._appointment(first), (self.doctor_id, day_back, '10:00', 'scheduled'))
+        self.assertEqual(self._appointment(second), (self.doctor_id, day_back, '11:00', 'scheduled'))
+        self.assertFalse(self.db_manager.calendars.get(self.doctor_id).is_working(self.test_date))
+        self.assertEqual(self.db_manager.availability.verify(), [])
+        self.assertTrue(self.db_manager._has_appointment_conflict(
+            self.doctor_id, day_back, time(10, 0), 30
+        ))
+
+    def test_falls_back_to_peer_on_the_same_day(self):
+        """Test that a peer takes the appointment when the doctor has no room"""
+        appointment_id = self._book(self.doctor_id, self.test_date, time(10, 0))
+        self._book(self.peer_id, self.test_date, time(10, 0))
+
+        report = self.schedule_service.mark_leave_range(
+            self.doctor_id, self.test_date, self.test_date, search_days=0
+        )
+
+        self.assertEqual(report.reassigned[0].doctor_id, self.peer_id)
+        self.assertEqual(
+            self._appointment(appointment_id),
+            (self.peer_id, self.test_date.isoformat(), '09:30', 'scheduled')
+        )
+        self.assertEqual(self.db_manager.availability.verify(), [])
+
+    def test_prefer_peers(self):
+        """Test that prefer_peers keeps the original date with another doctor"""
+        appointment_id = self._book(self.doctor_id, self.test_date, time(14, 0))
+
+        self.schedule_service.mark_leave_range(
+            self.doctor_id, self.test_date, self.test_date, prefer_peers=True
+        )
+
+        self.assertEqual(
+            self._appointment(appointment_id),
+            (self.peer_id, self.test_date.isoformat(), '14:00', 'scheduled')
+        )
+
+    def test_unplaceable_appointments_are_cancelled_and_reported(self):
+        """Test that appointments with nowhere to go are cancelled"""
+        for start in range(9, 17):
+            self._book(self.peer_id, self.test_date, time(start, 0), 60)
+        appointment_id = self._book(self.doctor_id, self.test_date, time(10, 0))
+        progress = []
+
+        report = self.schedule_service.mark_leave_range(
+            self.doctor_id, self.test_date, self.test_date, search_days=0,
+            progress=lambda done, total, entry: progress.append((done, total, entry.appointment_id))
+        )
+
+        self.assertEqual(progress, [(1, 1, appointment_id)])
+        self.assertEqual([entry.appointment_id for entry in report.cancelled], [appointment_id])
+        self.assertEqual(self._appointment(appointment_id)[3], 'cancelled')
+        self.assertIn("CANCELLED", report.summary())
+        self.assertFalse(self.db_manager._has_appointment_conflict(
+            self.doctor_id, self.test_date, time(10, 0), 30
+        ))
+
+    def test_existing_leave_days_are_kept(self):
+        """Test that overlapping an existing leave day only adds the new days"""
+        self.assertTrue(self.schedule_service.mark_doctor_leave(self.doctor_id, self.test_date))
+        self.assertFalse(self.schedule_service.mark_doctor_leave(self.doctor_id, self.test_date))
+
+        report = self.schedule_service.mark_leave_range(
+            self.doctor_id, self.test_date, self.test_date + timedelta(days=2)
+        )
+        self.assertEqual(report.leave_days, 2)
+        self.assertEqual(report.reassignments, [])
+
+if __name__ == '__main__':
+    unittest.main()
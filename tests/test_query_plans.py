@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import ast
+import re
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+# Packages whose SQL is checked, recursively
+SQL_SOURCES = ['src']
+
+# Statements that intentionally read a whole table, keyed by a fragment of
+# their SQL and the table (or alias) the plan is allowed to scan
+FULL_SCAN_ALLOWED = {
+    ('SELECT doctor_id, name FROM doctors', 'doctors'),
+    ('SELECT doctor_id FROM doctors', 'doctors'),
+    ('FROM doctors d\n', 'd'),
+    ('SELECT visit_type, duration_minutes FROM visit_types', 'visit_types'),
+    ('FROM json_each(?)', 'json_each'),
+    ('ORDER BY doctor_id, free_date, start_minute', 'doctor_free_intervals'),
+}
+
+SCAN_PATTERN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+
+
+def _source_files():
+    for source in SQL_SOURCES:
+        for directory, subdirectories, names in os.walk(os.path.join(PROJECT_ROOT, source)):
+            subdirectories.sort()
+            for name in sorted(names):
+                if name.endswith('.py'):
+                    yield os.path.join(directory, name)
+
+
+def collect_sql_statements():
+    """Find literal SQL passed to execute()/executemany() in the checked modules"""
+    statements = []
+    for path in _source_files():
+        with open(path) as source:
+            tree = ast.parse(source.read(), filename=path)
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+                continue
+            if node.func.attr not in ('execute', 'executemany') or not node.args:
+                continue
+            first = node.args[0]
+            if isinstance(first, ast.Constant) and isinstance(first.value, str):
+                sql = first.value.strip()
+                if sql.split(None, 1)[0].upper() in ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH'):
+                    statements.append((os.path.relpath(path, PROJECT_ROOT), node.lineno, sql))
+    return statements
+
+
+class TestQueryPlans(DatabaseTestCase):
+    def test_statements_are_collected(self):
+        """Test that the SQL collector finds the service queries"""
+        self.assertGreater(len(collect_sql_statements()), 20)
+
+    def test_no_unexpected_full_table_scans(self):
+        """Test that every service query is answered through an index"""
+        failures = []
+        with self.db_config.connection() as conn:
+            for path, lineno, sql in collect_sql_statements():
+                params = (None,) * sql.count('?')
+                plan = conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+                for row in plan:
+                    match = SCAN_PATTERN.match(row[-1])
+                    if not match:
+                        continue
+                    table = match.group(1)
+                    allowed = any(
+                        fragment in sql and table == scanned
+                        for fragment, scanned in FULL_SCAN_ALLOWED
+                    )
+                    if not allowed:
+                        failures.append(f"{path}:{lineno}: {row[-1]}")
+
+        self.assertEqual(failures, [], "Queries fell back to full scans:\n" + "\n".join(failures))
+
+if __name__ == '__main__':
+    unittest.main()
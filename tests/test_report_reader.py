@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import sqlite3
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from config.database_config import DatabaseConfig, ReportReader
+from src.utils.database_manager import DatabaseManager
+from src.services.analytics_service import AnalyticsService
+
+class TestReportReader(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Report", "Cardiology", "report@hospital.com", "555-0800"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_REPORT", "Report Patient", "report@patient.com", "555-0801", date(1990, 1, 1)
+        )
+        self.test_date = date.today()
+
+    def book(self, hour):
+        appointment_id, _ = self.db_manager.add_appointment(
+            self.patient_id, self.doctor_id, self.test_date, time(hour, 0)
+        )
+        return appointment_id
+
+    def total_appointments(self, analytics):
+        return analytics.get_patient_flow_metrics(
+            self.test_date - timedelta(days=1), self.test_date
+        )['total_appointments']
+
+    def test_wal_reader_does_not_block_writers(self):
+        """Test that a report reads one consistent state while bookings proceed"""
+        analytics = AnalyticsService(self.db_manager)
+        self.book(9)
+
+        with self.db_config.report_connection():
+            self.assertEqual(self.total_appointments(analytics), 1)
+            self.assertIsNotNone(self.book(10))
+            self.assertEqual(self.total_appointments(analytics), 1)
+
+        self.assertEqual(self.total_appointments(analytics), 2)
+
+    def test_snapshot_mode_reads_copy_and_reports_age(self):
+        """Test that snapshot mode serves a backup copy until refreshed"""
+        config = DatabaseConfig(self.db_path, report_mode='snapshot', snapshot_max_age=3600)
+        analytics = AnalyticsService(DatabaseManager(config))
+        self.book(9)
+
+        self.assertEqual(self.total_appointments(analytics), 1)
+        self.book(10)
+        self.assertEqual(self.total_appointments(analytics), 1)
+        self.assertGreater(analytics.get_snapshot_age(), 0)
+
+        config.report_reader.refresh()
+        self.assertEqual(self.total_appointments(analytics), 2)
+
+        report = analytics.generate_performance_report(self.test_date)
+        self.assertIn('snapshot_age_seconds', report)
+        config.report_reader.close()
+
+    def test_replaced_snapshots_are_closed(self):
+        """Test that refresh and close release old snapshot copies once unread"""
+        reader = ReportReader(self.db_path, mode='snapshot')
+        reader.refresh()
+        first = reader._snapshot[0]
+        reader.refresh()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            first.execute('SELECT 1')
+
+        with reader.connection() as conn:
+            reader.refresh()
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM doctors').fetchone(), (1,))
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute('SELECT 1')
+
+        current = reader._snapshot[0]
+        reader.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            current.execute('SELECT 1')
+
+    def test_unknown_mode_rejected(self):
+        """Test that report modes are validated"""
+        with self.assertRaises(ValueError):
+            ReportReader(self.db_path, mode='replica')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.services.appointment_service import AppointmentService
+from src.models import Appointment, AppointmentStatus, Doctor, Patient
+from src.models.appointment import _NOT_LOADED
+
+class TestRowMapping(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.service = AppointmentService(self.db_manager)
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Mapper", "Cardiology", "mapper@hospital.com", "555-0500"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_MAPPER", "Mapper Patient", "mapper@patient.com", "555-0501", date(1990, 1, 1)
+        )
+        self.test_date = date.today() + timedelta(days=1)
+
+    def test_patient_and_doctor_hydrated(self):
+        """Test that lookups return populated model instances"""
+        patient = self.db_manager.get_patient(patient_id=self.patient_id)
+        doctor = self.db_manager.get_doctor(self.doctor_id)
+
+        self.assertIsInstance(patient, Patient)
+        self.assertEqual(patient.mrn, "MRN_MAPPER")
+        self.assertEqual(patient.date_of_birth, date(1990, 1, 1))
+        self.assertIsInstance(doctor, Doctor)
+        self.assertEqual(doctor.name, "Dr. Mapper")
+        self.assertFalse(hasattr(patient, '__dict__'))
+
+    def test_appointment_details_load_lazily(self):
+        """Test that medical details are fetched only when accessed"""
+        appointment_id, _ = self.db_manager.add_appointment(
+            self.patient_id, self.doctor_id, self.test_date, time(9, 0)
+        )
+        self.service.complete_appointment(appointment_id, "Flu", "Rest", "Follow up in a week")
+
+        appointments = self.service.get_patient_appointments(self.patient_id)
+        self.assertEqual(len(appointments), 1)
+        appointment = appointments[0]
+
+        self.assertIsInstance(appointment, Appointment)
+        self.assertEqual(appointment.status, AppointmentStatus.COMPLETED)
+        self.assertEqual(appointment.time_slot, time(9, 0))
+        self.assertEqual(appointment.doctor_name, "Dr. Mapper")
+        self.assertIs(appointment._details, _NOT_LOADED)
+        self.assertEqual(
+            (appointment.diagnosis, appointment.prescription, appointment.notes),
+            ("Flu", "Rest", "Follow up in a week")
+        )
+
+if __name__ == '__main__':
+    unittest.main()
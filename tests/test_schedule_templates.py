@@ -0,0 +1,142 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.services.schedule_service import ScheduleService
+from src.services.analytics_service import AnalyticsService
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday')
+
+class TestScheduleTemplates(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.schedule_service = ScheduleService(self.db_manager)
+
+        self.doctor_ids = [
+            self.db_manager.add_doctor(
+                f"Dr. Rota {i}", "Cardiology", f"rota{i}@hospital.com", f"555-21{i:02d}"
+            )
+            for i in range(3)
+        ]
+        for doctor_id in self.doctor_ids:
+            for day in WEEKDAYS:
+                self.schedule_service.set_doctor_schedule(doctor_id, day, time(9, 0), time(17, 0))
+
+        self.schedule_service.save_schedule_template(
+            'early', {day: (time(7, 0), time(15, 0)) for day in WEEKDAYS},
+            {'Monday': [(time(11, 0), time(11, 30))]}
+        )
+        self.monday = date.today() + timedelta(days=7 - date.today().weekday())
+        self.db_manager.availability.rebuild(horizon_days=21)
+
+    def test_template_round_trip(self):
+        """Test that a saved template reads back and can be replaced"""
+        template = self.schedule_service.get_schedule_template('early')
+        self.assertEqual(template.hours['Monday'], ('07:00', '15:00'))
+        self.assertEqual(template.breaks, {'Monday': [('11:00', '11:30')]})
+
+        self.schedule_service.save_schedule_template('early', {'Saturday': (time(8, 0), time(12, 0))})
+        template = self.schedule_service.get_schedule_template('early')
+        self.assertEqual(template.hours, {'Saturday': ('08:00', '12:00')})
+        self.assertEqual(template.breaks, {})
+        self.assertIsNone(self.schedule_service.get_schedule_template('missing'))
+
+        with self.assertRaises(ValueError):
+            self.schedule_service.save_schedule_template('bad', {'Funday': (time(9, 0), time(10, 0))})
+
+    def test_apply_template_is_date_effective(self):
+        """Test that a template changes schedules only from its effective date"""
+        effective_from = self.monday + timedelta(days=7)
+        applied = self.schedule_service.apply_template('early', self.doctor_ids, effective_from)
+        self.assertEqual(applied, 3)
+
+        for doctor_id in self.doctor_ids:
+            calendar = self.db_manager.calendars.get(doctor_id)
+            self.assertEqual(calendar.working_hours(self.monday), (540, 1020))
+            self.assertEqual(calendar.working_hours(effective_from), (420, 900))
+            self.assertEqual(calendar.breaks_on(effective_from), [(660, 690)])
+            self.assertEqual(calendar.breaks_on(self.monday), [])
+
+        slots = self.schedule_service.get_doctor_availability(self.doctor_ids[0], effective_from)
+        self.assertEqual(slots[0], time(7, 0))
+        self.assertNotIn(time(11, 0), slots)
+        self.assertEqual(self.schedule_service.get_doctor_availability(
+            self.doctor_ids[0], self.monday
+        )[0], time(9, 0))
+        self.assertEqual(self.db_manager.availability.verify(), [])
+
+    def test_availability_outside_horizon_uses_version(self):
+        """Test that the unmaterialized path picks the version in effect"""
+        far_monday = self.monday + timedelta(weeks=8)
+        self.schedule_service.apply_template('early', self.doctor_ids[:1], far_monday)
+
+        self.assertEqual(self.schedule_service.get_doctor_availability(
+            self.doctor_ids[0], far_monday - timedelta(weeks=1)
+        )[0], time(9, 0))
+        slots = self.schedule_service.get_doctor_availability(self.doctor_ids[0], far_monday)
+        self.assertEqual(slots[0], time(7, 0))
+        self.assertNotIn(time(11, 0), slots)
+
+    def test_reapply_and_later_versions(self):
+        """Test that reapplying replaces a version and edits target the chosen version"""
+        self.schedule_service.save_schedule_template(
+            'late', {day: (time(12, 0), time(20, 0)) for day in WEEKDAYS}
+        )
+        first = self.monday + timedelta(days=7)
+        second = self.monday + timedelta(days=14)
+        doctor_id = self.doctor_ids[0]
+
+        self.schedule_service.apply_template('early', [doctor_id], first)
+        self.schedule_service.apply_template('late', [doctor_id], second)
+        self.schedule_service.apply_template('late', [doctor_id], first)
+        # Without effective_from the version in effect today changes, until the later ones start
+        with self.assertLogs('src.services.schedule_service', 'WARNING'):
+            self.schedule_service.set_doctor_schedule(doctor_id, 'Monday', time(11, 0), time(15, 0))
+        with self.assertRaises(ValueError):
+            self.schedule_service.set_doctor_schedule(
+                doctor_id, 'Monday', time(10, 0), time(16, 0), effective_from=self.monday
+            )
+        self.schedule_service.set_doctor_schedule(
+            doctor_id, 'Monday', time(10, 0), time(16, 0), effective_from=first
+        )
+
+        calendar = self.db_manager.calendars.get(doctor_id)
+        self.assertEqual(calendar.working_hours(self.monday), (660, 900))
+        self.assertEqual(calendar.working_hours(first), (600, 960))
+        self.assertEqual(calendar.working_hours(first + timedelta(days=1)), (720, 1200))
+        self.assertEqual(calendar.breaks_on(first), [])
+        self.assertEqual(calendar.working_hours(second), (720, 1200))
+        self.assertEqual(self.db_manager.availability.verify(), [])
+
+    def test_schedule_edit_targets_version_in_effect(self):
+        """Test that a weekly edit after applying a template changes the template's version"""
+        doctor_id = self.doctor_ids[0]
+        self.schedule_service.apply_template('early', [doctor_id], date.today())
+        self.schedule_service.set_doctor_schedule(doctor_id, 'Tuesday', time(13, 0), time(15, 0))
+
+        tuesday = self.monday + timedelta(days=1)
+        for day in (tuesday, tuesday + timedelta(weeks=8)):
+            slots = self.schedule_service.get_doctor_availability(doctor_id, day)
+            self.assertEqual(slots[0], time(13, 0))
+        self.assertEqual(self.db_manager.availability.verify(), [])
+
+    def test_utilization_counts_each_version_once(self):
+        """Test that available hours follow the version in effect each day"""
+        effective_from = self.monday + timedelta(days=7)
+        self.schedule_service.apply_template('early', self.doctor_ids[:1], effective_from)
+        report = AnalyticsService(self.db_manager).get_doctor_utilization(
+            self.doctor_ids[0], self.monday, self.monday + timedelta(days=13)
+        )
+        self.assertEqual(report['total_available_hours'], 80)
+
+    def test_unknown_template(self):
+        """Test that applying an unknown template changes nothing"""
+        with self.assertRaises(ValueError):
+            self.schedule_service.apply_template('missing', self.doctor_ids, self.monday)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import sqlite3
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from config.schema import MIGRATIONS, migrate, get_schema_version, latest_version
+from src.utils.database_manager import DatabaseManager
+from src.services.appointment_service import AppointmentService
+
+class TestSchemaMigrations(DatabaseTestCase):
+    # Tests control when (and from which state) the schema is migrated
+    create_manager = False
+
+    def test_fresh_database_reaches_latest_version(self):
+        """Test that a new database is migrated to the latest version"""
+        self.db_config.initialize_database()
+
+        with self.db_config.connection() as conn:
+            self.assertEqual(get_schema_version(conn), latest_version())
+            tables = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )}
+        self.assertTrue({'patients', 'doctors', 'appointments'} <= tables)
+
+    def test_current_schema_skips_migrations(self):
+        """Test that migrate is a no-op once the schema is current"""
+        self.db_config.initialize_database()
+
+        with self.db_config.connection() as conn:
+            self.assertEqual(migrate(conn), [])
+
+    def test_legacy_database_is_upgraded_in_place(self):
+        """Test that an unversioned database keeps its rows when migrated"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE patients (
+                patient_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                mrn TEXT UNIQUE NOT NULL,
+                name TEXT NOT NULL,
+                email TEXT,
+                phone TEXT,
+                date_of_birth DATE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute("INSERT INTO patients (mrn, name) VALUES ('MRN_LEGACY', 'Legacy Patient')")
+        conn.commit()
+        conn.close()
+
+        db_manager = DatabaseManager(self.db_config)
+
+        self.assertIsNotNone(db_manager.get_patient(mrn='MRN_LEGACY'))
+        with self.db_config.connection() as conn:
+            self.assertEqual(get_schema_version(conn), latest_version())
+
+    def test_minute_columns_backfilled_and_maintained(self):
+        """Test that minute-of-day columns are backfilled and kept in step"""
+        conn = sqlite3.connect(self.db_path)
+        MIGRATIONS[0][2](conn)
+        conn.execute('''
+            INSERT INTO appointments (patient_id, doctor_id, appointment_date, time_slot, duration_minutes)
+            VALUES (1, 1, '2030-01-07', '09:15', 45)
+        ''')
+        conn.execute('PRAGMA user_version = 1')
+        conn.commit()
+        conn.close()
+
+        self.db_config.initialize_database()
+
+        with self.db_config.transaction() as conn:
+            self.assertEqual(
+                conn.execute('SELECT start_minute, end_minute FROM appointments').fetchone(),
+                (555, 600)
+            )
+            conn.execute("UPDATE appointments SET time_slot = '10:00', duration_minutes = 30")
+            self.assertEqual(
+                conn.execute('SELECT start_minute, end_minute FROM appointments').fetchone(),
+                (600, 630)
+            )
+
+    def test_recreated_database_is_migrated_again(self):
+        """Test that a database deleted and recreated at the same path is migrated"""
+        DatabaseManager(self.db_config)
+        self.db_config.close_pool()
+        os.remove(self.db_path)
+
+        db_manager = DatabaseManager(self.db_config)
+
+        self.assertIsNotNone(db_manager.add_doctor("Dr. Again", "Cardiology", "again@hospital.com", "555-0001"))
+
+    def test_services_share_manager(self):
+        """Test that services reuse an injected manager"""
+        db_manager = DatabaseManager(self.db_config)
+        service = AppointmentService(db_manager)
+        self.assertIs(service.db_manager, db_manager)
+
+if __name__ == '__main__':
+    unittest.main()
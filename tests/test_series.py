@@ -0,0 +1,120 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.utils.database_manager import BookingResult
+from src.services.series_service import SeriesService, RecurrenceRule
+from src.services.schedule_service import ScheduleService
+
+class TestSeriesService(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.series = SeriesService(self.db_manager)
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Series", "Physiotherapy", "series@hospital.com", "555-1500"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_SERIES", "Series Patient", "series@patient.com", "555-1501", date(1990, 1, 1)
+        )
+        # First Tuesday at least a week out
+        self.first = date.today() + timedelta(days=7)
+        self.first += timedelta(days=(1 - self.first.weekday()) % 7)
+        self.rule = RecurrenceRule(self.first, count=12)
+
+    def test_rule_expansion(self):
+        """Test count, until and interval handling"""
+        self.assertEqual(len(self.rule.dates()), 12)
+        self.assertEqual(self.rule.dates()[-1], self.first + timedelta(weeks=11))
+        until = RecurrenceRule(self.first, until=self.first + timedelta(days=20), interval_days=14)
+        self.assertEqual(until.dates(), [self.first, self.first + timedelta(days=14)])
+        with self.assertRaises(ValueError):
+            RecurrenceRule(self.first).dates()
+
+    def test_book_series_all_or_nothing(self):
+        """Test that one conflicting occurrence rejects the whole series"""
+        blocker = self.db_manager.book_appointment_slot(
+            self.patient_id, self.doctor_id, self.first + timedelta(weeks=3), time(10, 15)
+        )
+
+        result = self.series.book_series(self.patient_id, self.doctor_id, self.rule, time(10, 0))
+
+        self.assertEqual(result.status, BookingResult.CONFLICT)
+        self.assertEqual(result.conflicts, [(self.first + timedelta(weeks=3), [blocker.appointment_id])])
+        self.assertEqual(self.db_manager.get_doctor_appointments(self.doctor_id, self.first), [])
+
+    def test_book_series_partial(self):
+        """Test that partial booking skips conflicting occurrences and tags the rest"""
+        self.db_manager.book_appointment_slot(
+            self.patient_id, self.doctor_id, self.first + timedelta(weeks=3), time(10, 0)
+        )
+
+        result = self.series.book_series(
+            self.patient_id, self.doctor_id, self.rule, time(10, 0), all_or_nothing=False
+        )
+
+        self.assertTrue(result.booked)
+        self.assertEqual(len(result.appointment_ids), 11)
+        booked = self.series.get_series_appointments(result.series_id)
+        self.assertEqual([appt.appointment_id for appt in booked], result.appointment_ids)
+        self.assertTrue(all(appt.series_id == result.series_id for appt in booked))
+
+    def test_cancel_series_from_date(self):
+        """Test bulk cancellation of the remaining occurrences"""
+        result = self.series.book_series(self.patient_id, self.doctor_id, self.rule, time(10, 0))
+
+        cancelled = self.series.cancel_series(result.series_id, from_date=self.first + timedelta(weeks=6))
+
+        self.assertEqual(cancelled, 6)
+        self.assertEqual(len(self.series.get_series_appointments(result.series_id)), 6)
+        self.assertFalse(self.db_manager._has_appointment_conflict(
+            self.doctor_id, self.first + timedelta(weeks=6), time(10, 0), 30
+        ))
+
+    def test_move_series_by_a_week(self):
+        """Test that shifting onto the series' own later slots succeeds"""
+        result = self.series.book_series(self.patient_id, self.doctor_id, self.rule, time(10, 0))
+
+        moved = self.series.move_series(result.series_id, shift_days=7)
+
+        self.assertTrue(moved.booked)
+        dates = [appt.appointment_date for appt in self.series.get_series_appointments(result.series_id)]
+        self.assertEqual(dates, [day + timedelta(weeks=1) for day in self.rule.dates()])
+        self.assertFalse(self.db_manager._has_appointment_conflict(self.doctor_id, self.first, time(10, 0), 30))
+
+    def test_move_series_conflict_changes_nothing(self):
+        """Test that a move blocked on one date leaves the series in place"""
+        result = self.series.book_series(self.patient_id, self.doctor_id, self.rule, time(10, 0))
+        self.db_manager.book_appointment_slot(
+            self.patient_id, self.doctor_id, self.first + timedelta(weeks=2), time(14, 0)
+        )
+
+        moved = self.series.move_series(result.series_id, time_slot=time(14, 0))
+
+        self.assertEqual(moved.status, BookingResult.CONFLICT)
+        times = {appt.time_slot for appt in self.series.get_series_appointments(result.series_id)}
+        self.assertEqual(times, {time(10, 0)})
+
+    def test_series_respects_hours_and_breaks(self):
+        """Test that occurrences in a break or after hours are rejected like single bookings"""
+        schedule_service = ScheduleService(self.db_manager)
+        schedule_service.set_doctor_schedule(self.doctor_id, 'Tuesday', time(9, 0), time(17, 0))
+        schedule_service.add_doctor_break(self.doctor_id, 'Tuesday', time(12, 0), time(14, 0))
+        rule = RecurrenceRule(self.first, count=3)
+
+        for time_slot in (time(12, 30), time(22, 0), time(16, 45)):
+            result = self.series.book_series(self.patient_id, self.doctor_id, rule, time_slot)
+            self.assertEqual(result.status, BookingResult.CONFLICT)
+            self.assertEqual(result.conflicts, [(day, []) for day in rule.dates()])
+
+        result = self.series.book_series(self.patient_id, self.doctor_id, rule, time(10, 0))
+        self.assertTrue(result.booked)
+        moved = self.series.move_series(result.series_id, time_slot=time(13, 0))
+        self.assertEqual(moved.status, BookingResult.CONFLICT)
+
+if __name__ == '__main__':
+    unittest.main()
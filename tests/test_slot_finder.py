@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.utils.intervals import merge_intervals, free_intervals, first_fit
+from src.services.appointment_service import AppointmentService
+from src.services.schedule_service import ScheduleService
+
+class TestIntervalHelpers(unittest.TestCase):
+    def test_merge_and_free_intervals(self):
+        """Test merging busy intervals and finding the gaps between them"""
+        busy = merge_intervals([(600, 630), (540, 570), (560, 600), (700, 720)])
+        self.assertEqual(busy, [(540, 630), (700, 720)])
+        self.assertEqual(free_intervals(500, 710, busy), [(500, 540), (630, 700)])
+        self.assertEqual(first_fit([(500, 540), (630, 700)], 45), 630)
+        self.assertIsNone(first_fit([(500, 540)], 45))
+
+class TestSlotFinder(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.service = AppointmentService(self.db_manager)
+        schedule_service = ScheduleService(self.db_manager)
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Slot", "Cardiology", "slot@hospital.com", "555-0900"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_SLOT", "Slot Patient", "slot@patient.com", "555-0901", date(1990, 1, 1)
+        )
+        self.test_date = date.today() + timedelta(days=1)
+        day = self.test_date.strftime('%A')
+        schedule_service.set_doctor_schedule(self.doctor_id, day, time(9, 0), time(12, 0))
+        schedule_service.add_doctor_break(self.doctor_id, day, time(10, 30), time(11, 0))
+
+    def test_returns_first_gap_after_uneven_booking(self):
+        """Test that the gap after a non-30-minute booking is entered on the slot grid"""
+        self.db_manager.add_appointment(
+            self.patient_id, self.doctor_id, self.test_date, time(9, 0), 45
+        )
+        slot = self.service._find_available_slot(self.doctor_id, self.test_date, time(9, 0))
+        self.assertEqual(slot, time(10, 0))
+
+        ScheduleService(self.db_manager).set_slot_granularity(self.doctor_id, 15)
+        slot = self.service._find_available_slot(self.doctor_id, self.test_date, time(9, 0))
+        self.assertEqual(slot, time(9, 45))
+
+    def test_long_visit_skips_break_and_respects_hours(self):
+        """Test that longer durations skip gaps that are too short"""
+        slot = self.service._find_available_slot(
+            self.doctor_id, self.test_date, time(10, 0), duration_minutes=60
+        )
+        self.assertEqual(slot, time(11, 0))
+        self.assertIsNone(self.service._find_available_slot(
+            self.doctor_id, self.test_date, time(11, 30), duration_minutes=60
+        ))
+
+    def test_preferred_time_before_hours_starts_at_opening(self):
+        """Test that the search is clipped to working hours"""
+        slot = self.service._find_available_slot(self.doctor_id, self.test_date, time(7, 0))
+        self.assertEqual(slot, time(9, 0))
+
+    def test_emergency_slot_ignores_schedule(self):
+        """Test that emergency search only avoids booked appointments"""
+        self.db_manager.add_appointment(
+            self.patient_id, self.doctor_id, self.test_date, time(10, 0), 30
+        )
+        slot = self.service._find_emergency_slot(self.doctor_id, self.test_date, time(10, 0))
+        self.assertEqual(slot, time(10, 30))
+
+if __name__ == '__main__':
+    unittest.main()
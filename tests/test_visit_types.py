@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+from datetime import date, time, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.utils.intervals import fit_starts, first_fit
+from src.services.appointment_service import AppointmentService
+from src.services.schedule_service import ScheduleService
+
+class TestFitStarts(unittest.TestCase):
+    def test_grid_aligned_fits(self):
+        """Test that fits are aligned to the grid and never cross a gap end"""
+        free = [(540, 600), (615, 700)]
+        self.assertEqual(list(fit_starts(free, 30, 15, 540)), [540, 555, 570, 615, 630, 645, 660])
+        self.assertEqual(list(fit_starts(free, 60, 30, 540)), [540, 630])
+        self.assertEqual(first_fit([(545, 600)], 30, 30, 540), 570)
+
+class TestVisitTypes(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.schedule_service = ScheduleService(self.db_manager)
+        self.service = AppointmentService(self.db_manager)
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Visit", "Cardiology", "visit@hospital.com", "555-1600"
+        )
+        self.patient_id = self.db_manager.add_patient(
+            "MRN_VISIT", "Visit Patient", "visit@patient.com", "555-1601", date(1990, 1, 1)
+        )
+        self.test_date = date.today() + timedelta(days=1)
+        day = self.test_date.strftime('%A')
+        self.schedule_service.set_doctor_schedule(self.doctor_id, day, time(9, 0), time(11, 0))
+
+    def test_seeded_visit_types(self):
+        """Test the default visit types and adding a new one"""
+        visit_types = self.db_manager.get_visit_types()
+        self.assertEqual(
+            (visit_types['new_patient'], visit_types['follow_up'], visit_types['consultation']),
+            (60, 15, 30)
+        )
+        self.db_manager.add_visit_type('dialysis', 240)
+        self.assertEqual(self.db_manager.get_visit_duration('dialysis'), 240)
+        with self.assertRaises(ValueError):
+            self.db_manager.get_visit_duration('unknown')
+
+    def test_default_grid_is_unchanged(self):
+        """Test that availability still lists 30-minute slots by default"""
+        slots = self.schedule_service.get_doctor_availability(self.doctor_id, self.test_date)
+        self.assertEqual(slots, [time(9, 0), time(9, 30), time(10, 0), time(10, 30)])
+
+    def test_finer_grid_packs_follow_ups(self):
+        """Test that a 15-minute grid offers follow-ups around an uneven booking"""
+        self.schedule_service.set_slot_granularity(self.doctor_id, 15)
+        self.db_manager.add_appointment(self.patient_id, self.doctor_id, self.test_date, time(9, 15), 30)
+
+        slots = self.schedule_service.get_doctor_availability(
+            self.doctor_id, self.test_date, visit_type='follow_up'
+        )
+        self.assertEqual(len(slots), 6)
+        self.assertEqual(slots[:2], [time(9, 0), time(9, 45)])
+
+    def test_long_visit_fits_over_merged_free_time(self):
+        """Test that 60-minute visits need a whole free hour on the grid"""
+        self.db_manager.add_appointment(self.patient_id, self.doctor_id, self.test_date, time(9, 30), 30)
+
+        slots = self.schedule_service.get_doctor_availability(
+            self.doctor_id, self.test_date, visit_type='new_patient'
+        )
+        self.assertEqual(slots, [time(10, 0)])
+
+    def test_book_by_visit_type(self):
+        """Test that booking by visit type stores the type's duration"""
+        appointment_id, _ = self.service.book_appointment(
+            self.patient_id, self.doctor_id, self.test_date, time(9, 0), visit_type='new_patient'
+        )
+        self.assertIsNotNone(appointment_id)
+        appointment = self.db_manager.get_doctor_appointments(self.doctor_id, self.test_date)[0]
+        self.assertEqual(appointment.duration_minutes, 60)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import unittest
+import sys
+import os
+import threading
+import time as timer
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import DatabaseTestCase
+from src.services.appointment_service import AppointmentService
+from src.services.schedule_service import ScheduleService
+from src.services.waitlist_service import WaitlistService
+
+class TestWaitlist(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.waitlist = WaitlistService(self.db_manager)
+        self.service = AppointmentService(self.db_manager, waitlist=self.waitlist)
+
+        self.doctor_id = self.db_manager.add_doctor(
+            "Dr. Waitlist", "Cardiology", "waitlist@hospital.com", "555-1400"
+        )
+        self.patient_ids = [
+            self.db_manager.add_patient(
+                f"MRN_WAIT{i}", f"Waiting Patient {i}", f"wait{i}@patient.com", "555-1401", date(1990, 1, 1)
+            )
+            for i in range(3)
+        ]
+        self.test_date = date.today() + timedelta(days=3)
+        self.schedule_service = ScheduleService(self.db_manager)
+        self.schedule_service.set_doctor_schedule(
+            self.doctor_id, self.test_date.strftime('%A'), time(9, 0), time(17, 0)
+        )
+
+    def _book(self, patient_id, slot, duration_minutes=30):
+        result = self.db_manager.book_appointment_slot(
+            patient_id, self.doctor_id, self.test_date, slot, duration_minutes
+        )
+        self.assertTrue(result.booked)
+        return result.appointment_id
+
+    def _active_appointments(self):
+        return [appt for appt in self.db_manager.get_doctor_appointments(self.doctor_id, self.test_date)
+                if appt.status.value != 'cancelled']
+
+    def test_cancel_auto_books_longest_waiting_fit(self):
+        """Test that a cancellation books the oldest waitlist entry that fits the freed slot"""
+        appointment_id = self._book(self.patient_ids[0], time(10, 0))
+        too_long = self.waitlist.add_to_waitlist(
+            self.patient_ids[1], self.test_date, self.test_date, doctor_id=self.doctor_id,
+            duration_minutes=60
+        )
+        fits = self.waitlist.add_to_waitlist(
+            self.patient_ids[2], self.test_date - timedelta(days=1), self.test_date + timedelta(days=1),
+            specialization="Cardiology"
+        )
+
+        self.assertTrue(self.service.cancel_appointment(appointment_id))
+
+        entry = self.waitlist.get_entry(fits)
+        self.assertEqual(entry['status'], 'booked')
+        self.assertEqual(self.waitlist.get_entry(too_long)['status'], 'waiting')
+        booked = self._active_appointments()
+        self.assertEqual([(appt.patient_id, appt.time_slot) for appt in booked],
+                         [(self.patient_ids[2], time(10, 0))])
+        self.assertTrue(self.db_manager._has_appointment_conflict(self.doctor_id, self.test_date, time(10, 0), 30))
+
+    def test_time_window_must_overlap_freed_slot(self):
+        """Test that entries whose time-of-day window misses the slot are skipped"""
+        appointment_id = self._book(self.patient_ids[0], time(10, 0))
+        afternoon = self.waitlist.add_to_waitlist(
+            self.patient_ids[1], self.test_date, self.test_date, doctor_id=self.doctor_id,
+            earliest_time=time(13, 0)
+        )
+
+        self.service.cancel_appointment(appointment_id)
+
+        self.assertEqual(self.waitlist.get_entry(afternoon)['status'], 'waiting')
+        self.assertEqual(self._active_appointments(), [])
+
+    def test_backfill_start_is_on_grid(self):
+        """Test that a waitlist window starting off the grid is booked at the next grid start"""
+        appointment_id = self._book(self.patient_ids[0], time(10, 0), 60)
+        waitlist_id = self.waitlist.add_to_waitlist(
+            self.patient_ids[1], self.test_date, self.test_date, doctor_id=self.doctor_id,
+            earliest_time=time(10, 10)
+        )
+
+        self.service.cancel_appointment(appointment_id)
+
+        self.assertEqual(self.waitlist.get_entry(waitlist_id)['status'], 'booked')
+        self.assertEqual([appt.time_slot for appt in self._active_appointments()], [time(10, 30)])
+
+    def test_backfill_respects_breaks_and_overrides(self):
+        """Test that backfill keeps out of breaks and hours shortened after the original booking"""
+        lunch = self._book(self.patient_ids[0], time(12, 0), 60)
+        morning = self._book(self.patient_ids[0], time(10, 0), 60)
+        self.schedule_service.add_doctor_break(
+            self.doctor_id, self.test_date.strftime('%A'), time(12, 0), time(12, 30)
+        )
+        hour_long = self.waitlist.add_to_waitlist(
+            self.patient_ids[1], self.test_date, self.test_date, specialization="Cardiology",
+            duration_minutes=60
+        )
+        half_hour = self.waitlist.add_to_waitlist(
+            self.patient_ids[2], self.test_date, self.test_date, doctor_id=self.doctor_id
+        )
+
+        self.service.cancel_appointment(lunch)
+        self.assertEqual(self.waitlist.get_entry(hour_long)['status'], 'waiting')
+        self.assertEqual(self.waitlist.get_entry(half_hour)['status'], 'booked')
+        self.assertEqual([appt.time_slot for appt in self._active_appointments()], [time(10, 0), time(12, 30)])
+
+        # The freed hour no longer fits once the day ends at 10:30
+        self.schedule_service.set_date_override(self.doctor_id, self.test_date, time(9, 0), time(10, 30))
+        self.service.cancel_appointment(morning)
+        self.assertEqual(self.waitlist.get_entry(hour_long)['status'], 'waiting')
+
+    def test_offer_mode_and_accept(self):
+        """Test that offer mode records the slot and accept_offer books it"""
+        self.waitlist.auto_book = False
+        appointment_id = self._book(self.patient_ids[0], time(11, 0))
+        waitlist_id = self.waitlist.add_to_waitlist(
+            self.patient_ids[1], self.test_date, self.test_date, doctor_id=self.doctor_id
+        )
+
+        self.service.cancel_appointment(appointment_id)
+        entry = self.waitlist.get_entry(waitlist_id)
+        self.assertEqual((entry['status'], entry['offered_minute']), ('offered', 11 * 60))
+
+        result = self.waitlist.accept_offer(waitlist_id)
+        self.assertTrue(result.booked)
+        self.assertEqual(self.waitlist.get_entry(waitlist_id)['appointment_id'], result.appointment_id)
+        self.assertFalse(self.waitlist.accept_offer(waitlist_id).booked)
+
+    def test_concurrent_accepts_book_once(self):
+        """Test that racing accepts of one offer book it exactly once"""
+        self.waitlist.auto_book = False
+        appointment_id = self._book(self.patient_ids[0], time(11, 0))
+        waitlist_id = self.waitlist.add_to_waitlist(
+            self.patient_ids[1], self.test_date, self.test_date, doctor_id=self.doctor_id
+        )
+        self.service.cancel_appointment(appointment_id)
+
+        # Widen the window between the offer check and the booking
+        book = self.db_manager.book_appointment_slot
+        def slow_book(*args, **kwargs):
+            timer.sleep(0.05)
+            return book(*args, **kwargs)
+
+        barrier = threading.Barrier(4)
+        def accept():
+            barrier.wait()
+            return self.waitlist.accept_offer(waitlist_id)
+        with mock.patch.object(self.db_manager, 'book_appointment_slot', side_effect=slow_book):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(lambda _: accept(), range(4)))
+
+        booked = [result for result in results if result.booked]
+        self.assertEqual(len(booked), 1)
+        entry = self.waitlist.get_entry(waitlist_id)
+        self.assertEqual((entry['status'], entry['appointment_id']), ('booked', booked[0].appointment_id))
+
+    def test_entry_requires_doctor_or_specialization(self):
+        """Test that a waitlist entry must name a doctor or specialization"""
+        with self.assertRaises(ValueError):
+            self.waitlist.add_to_waitlist(self.patient_ids[0], self.test_date, self.test_date)
+
+if __name__ == '__main__':
+    unittest.main()